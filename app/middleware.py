@@ -0,0 +1,174 @@
+"""
+ASGI middleware: request metrics and response compression negotiated from
+Accept-Encoding (brotli when available, else gzip)
+"""
+
+import gzip
+import time
+from typing import Optional, Tuple
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from config import settings
+from app.services.executors import executor_pools
+from app.services.metrics import request_duration, requests_total
+
+try:
+    import brotli
+except ImportError:  # optional dependency
+    brotli = None
+
+# Only text-like bodies shrink; media, archives, raster images and fonts are already compressed.
+# Shared with the static asset store so both compress the same types.
+COMPRESSIBLE_TYPES = ("application/json", "application/x-ndjson", "text/html", "text/plain",
+                      "text/css", "application/javascript", "text/javascript",
+                      "image/svg+xml", "application/manifest+json")
+
+# Bodies at least this large are compressed on a worker thread instead of the event loop
+THREAD_MIN_SIZE = 256 * 1024
+
+def choose_encoding(header: str) -> Optional[str]:
+    """Supported coding with the highest q-value in an Accept-Encoding header; brotli wins ties"""
+    qualities = {}
+    for item in header.split(","):
+        coding, _, params = item.partition(";")
+        quality = 1.0
+        name, _, value = params.strip().partition("=")
+        if name.strip() == "q":
+            try:
+                quality = float(value)
+            except ValueError:
+                quality = 0.0
+        qualities[coding.strip().lower()] = quality
+
+    supported = ("br", "gzip") if brotli is not None else ("gzip",)
+    best, best_quality = None, 0.0
+    for coding in supported:
+        quality = qualities.get(coding, qualities.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = coding, quality
+    return best
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=settings.RESPONSE_BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=settings.RESPONSE_GZIP_LEVEL, mtime=0)
+
+class CompressionMiddleware:
+    """
+    Compresses complete, compressible responses of at least `minimum_size` bytes.
+    Streaming responses (NDJSON, SSE, file downloads) and anything already encoded
+    or partial pass through untouched, so Range requests on files keep working.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = settings.RESPONSE_COMPRESSION_MIN_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or self.minimum_size <= 0:
+            await self.app(scope, receive, send)
+            return
+
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start: Optional[Message] = None
+        passthrough = False
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal start, passthrough
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message["headers"])
+                media_type = headers.get("content-type", "").partition(";")[0].strip().lower()
+                if (media_type not in COMPRESSIBLE_TYPES or "content-encoding" in headers
+                        or message["status"] == 206):
+                    passthrough = True
+                    await send(message)
+                else:
+                    start = message  # held back until the body shows whether to compress
+                return
+
+            if passthrough or message["type"] != "http.response.body":
+                if start is not None:
+                    await send(start)
+                    start = None
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            if start is not None:
+                headers = MutableHeaders(raw=start["headers"])
+                if message.get("more_body", False) or len(body) < self.minimum_size:
+                    passthrough = True
+                else:
+                    if len(body) >= THREAD_MIN_SIZE:
+                        body = await executor_pools.run("serve", compress, body, encoding)
+                    else:
+                        body = compress(body, encoding)
+                    headers["Content-Encoding"] = encoding
+                    headers["Content-Length"] = str(len(body))
+                    message = {**message, "body": body}
+                headers.add_vary_header("Accept-Encoding")
+                await send(start)
+                start = None
+            await send(message)
+
+        await self.app(scope, receive, send_compressed)
+
+def route_labels(scope: Scope) -> Tuple[str, Optional[str], str]:
+    """
+    (route template, latency phase, platform) for a routed request. The platform is the
+    {platform} path parameter or else the router module the endpoint lives in.
+    """
+    route = scope.get("route")
+    path = getattr(route, "path", None)
+    if path is None:
+        return "unmatched", None, ""
+    if scope["path"].startswith("/api/") and not path.startswith("/api/"):
+        # Newer FastAPI reports routes of included routers without their prefix
+        path = "/api" + path
+    phase = None
+    if path.startswith("/api/extract/"):
+        phase = "extract"
+    elif path.startswith(("/api/download/", "/api/stream/")):
+        phase = "download"
+    platform = (scope.get("path_params") or {}).get("platform")
+    if platform is None:
+        platform = getattr(getattr(route, "endpoint", None), "__module__", "").rpartition(".")[2]
+    return path, phase, platform
+
+class MetricsMiddleware:
+    """
+    Counts requests by route and status, and records extract/download latency per platform
+    router, measured until the last body chunk is sent (so it includes serialization,
+    compression and, for streams, the whole transfer).
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route, phase, platform = route_labels(scope)
+            if phase is not None:
+                request_duration.observe(time.perf_counter() - started, phase, platform, route)
+            requests_total.inc(scope["method"], route, str(status))
@@ -2,21 +2,44 @@
 Pydantic models for request/response validation
 """
 
-from typing import List, Optional, Dict, Any
-from pydantic import BaseModel, HttpUrl, Field
+from typing import List, Optional, Dict, Any, Literal
+from pydantic import BaseModel, HttpUrl, Field, model_validator
+
+from config import settings
 
 class ExtractRequest(BaseModel):
     """Request model for metadata extraction"""
     url: HttpUrl = Field(..., description="Video URL to extract metadata from")
 
+class PlaylistExtractRequest(ExtractRequest):
+    """Request model for paginated playlist metadata extraction"""
+    offset: int = Field(default=0, ge=0, description="Number of playlist entries to skip")
+    limit: int = Field(default=settings.PLAYLIST_PAGE_SIZE, ge=1, le=settings.PLAYLIST_MAX_PAGE_SIZE, description="Maximum number of entries to return")
+
+class FormatPreferences(BaseModel):
+    """Declarative format selection, resolved server-side into a concrete format"""
+    max_height: Optional[int] = Field(default=None, ge=1, description="Highest acceptable video height in pixels")
+    codecs: Optional[List[Literal["av1", "vp9", "h264", "h265"]]] = Field(default=None, description="Acceptable video codecs, most preferred first")
+    max_filesize: Optional[int] = Field(default=None, ge=1, description="Size budget in bytes for the downloaded file")
+    container: Optional[Literal["mp4", "webm", "mkv"]] = Field(default=None, description="Output container")
+    mode: Literal["any", "combined", "merge"] = Field(default="any", description="'combined' for a single video+audio stream, 'merge' for separate video and audio streams, 'any' for either")
+
 class DownloadRequest(BaseModel):
     """Request model for video download"""
     url: HttpUrl = Field(..., description="Video URL to download")
-    format_id: str = Field(..., description="Format ID from metadata extraction")
+    format_id: Optional[str] = Field(default=None, description="Format ID from metadata extraction (required unless preferences or audio_only are given)")
+    preferences: Optional[FormatPreferences] = Field(default=None, description="Format preferences to resolve into a format server-side, instead of format_id")
+    extraction_token: Optional[str] = Field(default=None, description="Token from metadata extraction, lets the download reuse the extracted info")
     audio_only: bool = Field(default=False, description="Extract audio only")
     audio_format: Optional[str] = Field(default="mp3", description="Audio format (mp3, aac, m4a, etc.)")
     audio_quality: Optional[str] = Field(default="192", description="Audio bitrate (128, 192, 256, 320)")
 
+    @model_validator(mode="after")
+    def _require_format(self):
+        if not self.format_id and self.preferences is None and not self.audio_only:
+            raise ValueError("Either format_id or preferences is required")
+        return self
+
 class ImageDownloadRequest(BaseModel):
     """Request model for image download"""
     url: HttpUrl = Field(..., description="Post URL to download images from")
@@ -27,15 +50,16 @@ class PlaylistRequest(BaseModel):
     url: HttpUrl = Field(..., description="Playlist URL to process")
     download_all: bool = Field(default=False, description="Download all videos in playlist")
     max_downloads: Optional[int] = Field(default=None, description="Maximum number of videos to download")
-    start_index: Optional[int] = Field(default=1, description="Start downloading from this index")
+    start_index: Optional[int] = Field(default=1, ge=1, description="Start downloading from this index")
     end_index: Optional[int] = Field(default=None, description="Stop downloading at this index")
+    parallelism: Optional[int] = Field(default=None, ge=1, le=settings.PLAYLIST_MAX_PARALLELISM, description="Number of entries to download at once")
 
 class BatchDownloadRequest(BaseModel):
     """Request model for batch downloads"""
     urls: List[HttpUrl] = Field(..., description="List of URLs to download")
     format_preference: Optional[str] = Field(default="best", description="Format preference for all videos")
     audio_only: bool = Field(default=False, description="Extract audio only for all videos")
-    max_concurrent: Optional[int] = Field(default=3, description="Maximum concurrent downloads")
+    max_concurrent: Optional[int] = Field(default=3, description="Maximum concurrent downloads (capped by DOWNLOAD_MAX_PER_REQUEST)")
 
 class VideoFormat(BaseModel):
     """Video format information"""
@@ -86,6 +110,19 @@ class ExtractResponse(BaseModel):
     status: str = Field(..., description="Response status")
     metadata: Optional[VideoMetadata] = Field(None, description="Video metadata")
     message: Optional[str] = Field(None, description="Status message")
+    extraction_token: Optional[str] = Field(None, description="Opaque token to pass to the download endpoint")
+    next_offset: Optional[int] = Field(None, description="Offset of the next playlist page, if more entries follow")
+
+class EntryResult(BaseModel):
+    """Outcome of one URL in a playlist or batch download"""
+    index: int = Field(..., description="Position in the playlist or batch (1-based)")
+    url: str = Field(..., description="Entry URL")
+    status: str = Field(..., description="Entry status: 'ok' or 'error'")
+    file_path: Optional[str] = Field(None, description="Downloaded file path")
+    filename: Optional[str] = Field(None, description="Downloaded filename")
+    file_size: Optional[int] = Field(None, description="File size in bytes")
+    file_id: Optional[str] = Field(None, description="ID for fetching the file from /api/files/{file_id}")
+    error: Optional[str] = Field(None, description="Error message if the entry failed")
 
 class DownloadResponse(BaseModel):
     """Response model for video download"""
@@ -93,12 +130,41 @@ class DownloadResponse(BaseModel):
     file_path: Optional[str] = Field(None, description="Downloaded file path")
     filename: Optional[str] = Field(None, description="Downloaded filename")
     file_size: Optional[int] = Field(None, description="File size in bytes")
+    file_id: Optional[str] = Field(None, description="ID for fetching the file from /api/files/{file_id}")
+    download_url: Optional[str] = Field(None, description="URL serving the downloaded file")
     message: Optional[str] = Field(None, description="Status message")
     download_type: Optional[str] = Field(None, description="Type of download: 'video', 'audio', 'playlist', 'batch'")
+    format_id: Optional[str] = Field(None, description="Format selection that was downloaded")
     files_downloaded: Optional[List[str]] = Field(None, description="List of downloaded files for batch/playlist")
+    file_ids: Optional[List[str]] = Field(None, description="File IDs of downloaded files for batch/playlist")
     total_files: Optional[int] = Field(None, description="Total number of files processed")
     success_count: Optional[int] = Field(None, description="Number of successful downloads")
     error_count: Optional[int] = Field(None, description="Number of failed downloads")
+    results: Optional[List[EntryResult]] = Field(None, description="Per-entry outcomes for batch/playlist")
+
+class JobSubmitResponse(BaseModel):
+    """Response model for an accepted background download job"""
+    status: str = Field(default="accepted", description="Response status")
+    job_id: str = Field(..., description="Job identifier")
+    state: str = Field(..., description="Job state: 'queued', 'running', 'finished', 'failed'")
+    status_url: str = Field(..., description="URL to poll for job status")
+    message: Optional[str] = Field(None, description="Status message")
+
+class JobStatusResponse(BaseModel):
+    """Response model for background download job status"""
+    job_id: str = Field(..., description="Job identifier")
+    kind: str = Field(..., description="Job kind: 'video', 'playlist', 'batch'")
+    state: str = Field(..., description="Job state: 'queued', 'running', 'finished', 'failed'")
+    created_at: float = Field(..., description="Submission time (Unix timestamp)")
+    started_at: Optional[float] = Field(None, description="Start time (Unix timestamp)")
+    finished_at: Optional[float] = Field(None, description="Completion time (Unix timestamp)")
+    downloaded_bytes: int = Field(0, description="Bytes downloaded so far")
+    total_bytes: Optional[int] = Field(None, description="Total bytes expected, if known")
+    progress: Optional[float] = Field(None, description="Completion percentage, if total size is known")
+    speed: Optional[float] = Field(None, description="Current download speed in bytes per second")
+    eta: Optional[int] = Field(None, description="Estimated seconds remaining")
+    result: Optional[DownloadResponse] = Field(None, description="Download result once the job has finished")
+    message: Optional[str] = Field(None, description="Status message")
 
 class ErrorResponse(BaseModel):
     """Error response model"""
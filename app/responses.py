@@ -0,0 +1,109 @@
+"""
+Fast JSON responses and field projection for API models
+"""
+
+import typing
+from typing import Any, Dict, Iterable, Optional, Tuple, Type
+
+from fastapi import HTTPException, Query
+from fastapi.responses import Response
+from pydantic import BaseModel
+from pydantic_core import to_json
+
+from app.models import ExtractResponse
+from app.services.metrics import serialization_duration
+
+class FastJSONResponse(Response):
+    """
+    JSON response serialized by Pydantic's Rust core in one step, without the
+    intermediate jsonable_encoder pass. Pre-serialized bytes are sent as-is.
+    """
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, bytes):
+            return content
+        with serialization_duration.time(type(content).__name__):
+            return to_json(content)
+
+# Fields kept by compact=true: what a client needs to show a video and pick a format
+COMPACT_FIELDS = (
+    "status", "message", "extraction_token", "next_offset",
+    "metadata.id", "metadata.title", "metadata.uploader", "metadata.duration", "metadata.thumbnail",
+    "metadata.webpage_url", "metadata.media_type", "metadata.has_media", "metadata.is_live",
+    "metadata.images", "metadata.playlist_count",
+    "metadata.formats.format_id", "metadata.formats.ext", "metadata.formats.height",
+    "metadata.formats.fps", "metadata.formats.filesize", "metadata.formats.filesize_approx",
+    "metadata.formats.format_type", "metadata.formats.codec_info",
+    "metadata.entries.id", "metadata.entries.title", "metadata.entries.duration",
+    "metadata.entries.thumbnail", "metadata.entries.webpage_url",
+)
+
+def _nested_model(annotation: Any) -> Tuple[Optional[Type[BaseModel]], bool]:
+    """The model inside an annotation such as Optional[List[Model]], and whether it is a list"""
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return annotation, False
+    is_list = typing.get_origin(annotation) in (list, typing.List)
+    for arg in typing.get_args(annotation):
+        model, nested_list = _nested_model(arg)
+        if model is not None:
+            return model, is_list or nested_list
+    return None, False
+
+def build_include(model: Type[BaseModel], paths: Iterable[str]) -> Dict[str, Any]:
+    """
+    Turn dotted field paths ("metadata.formats.format_id") into a Pydantic include
+    mapping, descending into list items where a field holds a list of models.
+    Raises ValueError for a path that names an unknown field.
+    """
+    include: Dict[str, Any] = {}
+    for path in paths:
+        current_model, node = model, include
+        parts = [part for part in path.strip().split(".") if part]
+        for depth, part in enumerate(parts):
+            field = current_model.model_fields.get(part) if current_model else None
+            if field is None:
+                raise ValueError(f"Unknown field: {'.'.join(parts[:depth + 1])}")
+            if depth == len(parts) - 1:
+                node[part] = True
+                break
+            nested, is_list = _nested_model(field.annotation)
+            child = node.get(part)
+            if child is True:
+                break  # already included whole
+            if child is None:
+                child = node[part] = {"__all__": {}} if is_list else {}
+            node = child["__all__"] if is_list else child
+            current_model = nested
+    return include
+
+class Projection:
+    """Which fields of a response model to send, parsed from the fields= and compact= query parameters"""
+
+    def __init__(self, include: Optional[Dict[str, Any]] = None, exclude_none: bool = False):
+        self.include = include
+        self.exclude_none = exclude_none
+
+    def render(self, model: BaseModel) -> FastJSONResponse:
+        """Serialize straight to JSON bytes, keeping only the projected fields"""
+        with serialization_duration.time(type(model).__name__):
+            body = to_json(model, include=self.include, exclude_none=self.exclude_none)
+        return FastJSONResponse(body)
+
+_compact_include = build_include(ExtractResponse, COMPACT_FIELDS)
+
+def extract_projection(
+    fields: Optional[str] = Query(default=None, description="Comma-separated dotted field paths to return, e.g. metadata.title,metadata.formats.format_id"),
+    compact: bool = Query(default=False, description="Return only the fields needed to pick a format, omitting nulls"),
+) -> Projection:
+    """Dependency for extract endpoints"""
+    if fields:
+        try:
+            include = build_include(ExtractResponse, fields.split(","))
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return Projection(include, exclude_none=compact)
+    if compact:
+        return Projection(_compact_include, exclude_none=True)
+    return Projection()
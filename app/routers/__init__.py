@@ -2,6 +2,6 @@
 API Routers Package
 """
 
-from . import youtube, instagram, facebook, twitter
+from . import youtube, instagram, facebook, twitter, jobs, files, stream, metrics, frontend
 
-__all__ = ["youtube", "instagram", "facebook", "twitter"]
+__all__ = ["youtube", "instagram", "facebook", "twitter", "jobs", "files", "stream", "metrics", "frontend"]
@@ -0,0 +1,144 @@
+"""
+Downloaded file serving router with Range and ETag support
+"""
+
+import logging
+import mimetypes
+import os
+import re
+from typing import Optional, Tuple
+from urllib.parse import quote
+
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import Response
+from starlette.types import Scope, Receive, Send
+
+from config import settings
+from app.services.executors import executor_pools
+from app.services.files import file_registry, StoredFile
+from app.services.responses import etag_matches
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+class FileRangeResponse(Response):
+    """
+    Sends one byte range of a file, reading only that range with positional reads on the
+    "serve" pool. There is no zero-copy path under uvicorn: it never offers the ASGI
+    zerocopysend extension, so every byte is copied through Python. The extension is still
+    used when a server does offer it.
+    """
+
+    def __init__(self, entry: StoredFile, start: int, end: int, status_code: int, headers: dict):
+        super().__init__(status_code=status_code, headers=headers)
+        self.entry = entry
+        self.start = start
+        self.length = end - start + 1 if entry.size else 0
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        if scope.get("method") == "HEAD" or self.length == 0:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+            return
+
+        fd = await executor_pools.run("serve", os.open, self.entry.path, os.O_RDONLY)
+        try:
+            if "http.response.zerocopysend" in scope.get("extensions", {}):
+                await send({
+                    "type": "http.response.zerocopysend",
+                    "file": fd,
+                    "offset": self.start,
+                    "count": self.length,
+                    "more_body": False,
+                })
+                return
+
+            offset = self.start
+            remaining = self.length
+            while remaining > 0:
+                chunk = await executor_pools.run("serve", os.pread, fd, min(settings.FILE_CHUNK_SIZE, remaining), offset)
+                if not chunk:
+                    break
+                offset += len(chunk)
+                remaining -= len(chunk)
+                await send({"type": "http.response.body", "body": chunk, "more_body": remaining > 0})
+            if remaining > 0:
+                # File shrank underneath us, terminate the body
+                await send({"type": "http.response.body", "body": b"", "more_body": False})
+        finally:
+            await executor_pools.run("serve", os.close, fd)
+
+def _parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a single-range Range header into inclusive (start, end).
+    Returns None for multi-range or malformed headers (served as a full 200), raises 416 when unsatisfiable.
+    """
+    match = RANGE_RE.match(header.strip())
+    if not match:
+        return None
+
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        # Suffix range: the final N bytes
+        suffix = int(last)
+        if suffix == 0:
+            raise HTTPException(status_code=416, headers={"Content-Range": f"bytes */{size}"})
+        return max(size - suffix, 0), size - 1
+
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        raise HTTPException(status_code=416, headers={"Content-Range": f"bytes */{size}"})
+    return start, end
+
+@router.api_route("/files/{file_id}", methods=["GET", "HEAD"])
+async def serve_file(file_id: str, request: Request):
+    """
+    Serve a downloaded file by ID with Range/206, ETag and If-None-Match support
+    """
+    entry = file_registry.get(file_id)
+    if entry is None:
+        raise HTTPException(status_code=404, detail="File not found")
+
+    try:
+        stat = await executor_pools.run("serve", os.stat, entry.path)
+    except OSError:
+        file_registry.remove(file_id)
+        raise HTTPException(status_code=404, detail="File no longer available")
+    entry.size, entry.mtime_ns = stat.st_size, stat.st_mtime_ns
+    file_registry.touch(file_id)
+
+    headers = {
+        "ETag": entry.etag,
+        "Accept-Ranges": "bytes",
+        "Cache-Control": "private, max-age=0, must-revalidate",
+    }
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and etag_matches(if_none_match, entry.etag):
+        return Response(status_code=304, headers=headers)
+
+    media_type = mimetypes.guess_type(entry.filename)[0] or "application/octet-stream"
+    headers["Content-Type"] = media_type
+    headers["Content-Disposition"] = f"attachment; filename*=UTF-8''{quote(entry.filename)}"
+
+    byte_range = None
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    if range_header and entry.size and (not if_range or if_range.strip() == entry.etag):
+        byte_range = _parse_range(range_header, entry.size)
+
+    if byte_range is None:
+        start, end, status_code = 0, entry.size - 1, 200
+    else:
+        start, end = byte_range
+        status_code = 206
+        headers["Content-Range"] = f"bytes {start}-{end}/{entry.size}"
+
+    headers["Content-Length"] = str(end - start + 1 if entry.size else 0)
+    return FileRangeResponse(entry, start, end, status_code, headers)
@@ -0,0 +1,56 @@
+"""
+Frontend router: the single-page UI and its static assets, served from memory
+"""
+
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import HTMLResponse, Response
+
+from app.middleware import choose_encoding
+from app.services.assets import asset_store
+from app.services.executors import executor_pools
+from app.services.responses import etag_matches
+
+router = APIRouter()
+
+# Asset URLs are not fingerprinted, so browsers revalidate every time and get a 304 while unchanged
+CACHE_CONTROL = "no-cache"
+
+async def _serve(path: str, request: Request) -> Optional[Response]:
+    """The asset's variant for the request's Accept-Encoding, or a 304 when the client's copy is current"""
+    if not asset_store.loaded:
+        # Only when the app runs without its lifespan
+        await executor_pools.run("postprocess", asset_store.load)
+    asset = asset_store.get(path)
+    if asset is None:
+        return None
+
+    encoding, body = asset.variant(choose_encoding(request.headers.get("accept-encoding", "")))
+    headers = {"ETag": asset.etags[encoding], "Cache-Control": CACHE_CONTROL}
+    if len(asset.variants) > 1:
+        headers["Vary"] = "Accept-Encoding"
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and etag_matches(if_none_match, headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+
+    if encoding != "identity":
+        headers["Content-Encoding"] = encoding
+    return Response(content=body, media_type=asset.content_type, headers=headers)
+
+@router.api_route("/", methods=["GET", "HEAD"], response_class=HTMLResponse)
+async def root(request: Request):
+    """Serve the main HTML interface"""
+    response = await _serve("index.html", request)
+    if response is None:
+        raise HTTPException(status_code=404, detail="Frontend interface not found")
+    return response
+
+@router.api_route("/static/{path:path}", methods=["GET", "HEAD"], include_in_schema=False)
+async def static_asset(path: str, request: Request):
+    """Serve a file from the static directory"""
+    response = await _serve(path, request)
+    if response is None:
+        raise HTTPException(status_code=404, detail="Not Found")
+    return response
@@ -3,16 +3,17 @@ Instagram video downloader router
 """
 
 import logging
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException
 from app.models import ExtractRequest, DownloadRequest, ExtractResponse, DownloadResponse
 from app.services.downloader import downloader_service
+from app.responses import Projection, extract_projection
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
 @router.post("/extract/instagram", response_model=ExtractResponse)
-async def extract_instagram_metadata(request: ExtractRequest):
+async def extract_instagram_metadata(request: ExtractRequest, projection: Projection = Depends(extract_projection)):
     """
     Extract Instagram video metadata without downloading
     """
@@ -24,7 +25,7 @@ async def extract_instagram_metadata(request: ExtractRequest):
         if response.status == "error":
             raise HTTPException(status_code=400, detail=response.message)
         
-        return response
+        return projection.render(response)
         
     except Exception as e:
         logger.error(f"Error extracting Instagram metadata: {str(e)}")
@@ -43,7 +44,9 @@ async def download_instagram_video(request: DownloadRequest):
             request.format_id,
             audio_only=request.audio_only,
             audio_format=request.audio_format or "mp3",
-            audio_quality=request.audio_quality or "192"
+            audio_quality=request.audio_quality or "192",
+            extraction_token=request.extraction_token,
+            preferences=request.preferences
         )
         
         if response.status == "error":
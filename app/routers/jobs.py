@@ -0,0 +1,102 @@
+"""
+Background download jobs router
+"""
+
+import json
+import logging
+from fastapi import APIRouter, HTTPException, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+from config import settings
+from app.models import DownloadRequest, PlaylistRequest, BatchDownloadRequest, JobSubmitResponse, JobStatusResponse
+from app.services.downloader import SUPPORTED_PLATFORMS
+from app.services.jobs import job_manager, DownloadJob
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+def _accepted(job: DownloadJob) -> JobSubmitResponse:
+    return JobSubmitResponse(
+        job_id=job.id,
+        state=job.state,
+        status_url=f"/api/jobs/{job.id}",
+        message=f"{job.kind.capitalize()} download queued"
+    )
+
+@router.post("/jobs/download/youtube/playlist", response_model=JobSubmitResponse, status_code=202)
+async def submit_playlist_download(request: PlaylistRequest):
+    """
+    Queue a YouTube playlist download and return its job ID immediately
+    """
+    logger.info(f"Queueing playlist download job: {request.url}")
+    return _accepted(job_manager.submit("playlist", request.model_dump(mode="json")))
+
+@router.post("/jobs/download/batch", response_model=JobSubmitResponse, status_code=202)
+async def submit_batch_download(request: BatchDownloadRequest):
+    """
+    Queue a batch download and return its job ID immediately
+    """
+    logger.info(f"Queueing batch download job for {len(request.urls)} videos")
+    return _accepted(job_manager.submit("batch", request.model_dump(mode="json")))
+
+@router.post("/jobs/download/{platform}", response_model=JobSubmitResponse, status_code=202)
+async def submit_video_download(platform: str, request: DownloadRequest):
+    """
+    Queue a single video download and return its job ID immediately
+    """
+    if platform not in SUPPORTED_PLATFORMS:
+        raise HTTPException(status_code=404, detail=f"Unsupported platform: {platform}")
+
+    logger.info(f"Queueing {platform} download job: {request.url} (format: {request.format_id})")
+    return _accepted(job_manager.submit("video", request.model_dump(mode="json")))
+
+@router.get("/jobs/{job_id}", response_model=JobStatusResponse)
+async def get_job_status(job_id: str):
+    """
+    Report state, progress and result of a download job
+    """
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    return job.to_response()
+
+@router.get("/jobs/{job_id}/events")
+async def stream_job_events(job_id: str):
+    """
+    Stream job progress as Server-Sent Events until the job finishes
+    """
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    async def event_stream():
+        async for event in job.channel.subscribe(heartbeat=settings.PROGRESS_HEARTBEAT):
+            if event is None:
+                yield ": keep-alive\n\n"
+            else:
+                yield f"event: progress\ndata: {json.dumps(event)}\n\n"
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.websocket("/jobs/{job_id}/ws")
+async def job_progress_websocket(websocket: WebSocket, job_id: str):
+    """
+    Push job progress over a WebSocket until the job finishes
+    """
+    job = job_manager.get(job_id)
+    if job is None:
+        await websocket.close(code=4404, reason="Job not found")
+        return
+
+    await websocket.accept()
+    try:
+        async for event in job.channel.subscribe():
+            await websocket.send_json(event)
+        await websocket.close()
+    except WebSocketDisconnect:
+        logger.info(f"Progress WebSocket for job {job_id} disconnected")
@@ -0,0 +1,63 @@
+"""
+Prometheus metrics router
+"""
+
+from fastapi import APIRouter
+from fastapi.responses import Response
+
+from app.services.downloader import downloader_service
+from app.services.jobs import job_manager
+from app.services.metrics import metrics
+from app.services.scheduler import download_scheduler
+from app.services.storage import storage_manager
+from app.services.ydl_pool import ydl_pool
+
+router = APIRouter()
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+def _executors():
+    return {name: stats for name, stats in downloader_service.executors.stats().items() if isinstance(stats, dict)}
+
+def _caches():
+    return {
+        "metadata": downloader_service.metadata_cache.stats(),
+        "extraction": downloader_service.extraction_store.stats(),
+    }
+
+# Service state read at scrape time, so nothing is updated on the request path
+metrics.collector("grabit_executor_workers", "Configured worker threads per executor", "gauge", ("executor",),
+                  lambda: [((name,), stats["max_workers"]) for name, stats in _executors().items()])
+metrics.collector("grabit_executor_active", "Tasks currently running per executor", "gauge", ("executor",),
+                  lambda: [((name,), stats["active"]) for name, stats in _executors().items()])
+metrics.collector("grabit_executor_queued", "Tasks waiting for a free worker per executor", "gauge", ("executor",),
+                  lambda: [((name,), stats["queued"]) for name, stats in _executors().items()])
+metrics.collector("grabit_download_slots_active", "Downloads holding a scheduler slot", "gauge", (),
+                  lambda: [((), download_scheduler.stats()["active"])])
+metrics.collector("grabit_download_slots_queued", "Downloads waiting for a scheduler slot", "gauge", (),
+                  lambda: [((), download_scheduler.stats()["queued"])])
+metrics.collector("grabit_jobs", "Background jobs by state", "gauge", ("state",),
+                  lambda: [((state,), count) for state, count in job_manager.stats()["jobs"].items()])
+metrics.collector("grabit_cache_hits", "Cache lookups served from the cache", "counter", ("cache",),
+                  lambda: [((name,), stats["hits"]) for name, stats in _caches().items()])
+metrics.collector("grabit_cache_misses", "Cache lookups that ran the loader", "counter", ("cache",),
+                  lambda: [((name,), stats["misses"]) for name, stats in _caches().items()])
+metrics.collector("grabit_cache_coalesced", "Cache lookups that joined an in-flight load", "counter", ("cache",),
+                  lambda: [((name,), stats["coalesced"]) for name, stats in _caches().items()])
+metrics.collector("grabit_cache_hit_ratio", "Share of cache lookups not running the loader", "gauge", ("cache",),
+                  lambda: [((name,), stats["hit_ratio"]) for name, stats in _caches().items()])
+metrics.collector("grabit_cache_entries", "Entries held per cache", "gauge", ("cache",),
+                  lambda: [((name,), stats["entries"]) for name, stats in _caches().items()])
+metrics.collector("grabit_cache_bytes", "Estimated bytes held per cache", "gauge", ("cache",),
+                  lambda: [((name,), stats["bytes"]) for name, stats in _caches().items()])
+metrics.collector("grabit_ydl_instances_reused", "YoutubeDL instances served from the pool", "counter", (),
+                  lambda: [((), ydl_pool.reused)])
+metrics.collector("grabit_ydl_instances_created", "YoutubeDL instances created", "counter", (),
+                  lambda: [((), ydl_pool.created)])
+metrics.collector("grabit_storage_used_bytes", "Bytes of tracked files in DOWNLOAD_DIR", "gauge", (),
+                  lambda: [((), storage_manager.used_bytes())])
+
+@router.get("/metrics", include_in_schema=False)
+async def get_metrics():
+    """Metrics in the Prometheus text exposition format"""
+    return Response(content=metrics.render(), media_type=CONTENT_TYPE)
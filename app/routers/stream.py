@@ -0,0 +1,44 @@
+"""
+Pass-through streaming router: relays media to the client without storing it
+"""
+
+import logging
+from urllib.parse import quote
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
+from app.models import DownloadRequest, DownloadResponse
+from app.services.downloader import downloader_service, SUPPORTED_PLATFORMS
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+@router.post("/stream/{platform}")
+async def stream_video(platform: str, request: DownloadRequest):
+    """
+    Stream a combined (single-file) format straight to the client without writing it to disk
+    """
+    if platform not in SUPPORTED_PLATFORMS:
+        raise HTTPException(status_code=404, detail=f"Unsupported platform: {platform}")
+
+    logger.info(f"Streaming {platform} video: {request.url} (format: {request.format_id})")
+
+    result = await downloader_service.stream_video(
+        str(request.url),
+        request.format_id,
+        extraction_token=request.extraction_token,
+        preferences=request.preferences,
+        audio_only=request.audio_only
+    )
+
+    if isinstance(result, DownloadResponse):
+        raise HTTPException(status_code=400, detail=result.message)
+
+    headers = {"Content-Disposition": f"attachment; filename*=UTF-8''{quote(result.filename)}"}
+    if result.content_length is not None:
+        headers["Content-Length"] = str(result.content_length)
+
+    # The relay's own cleanup only runs once iteration starts, the background task covers a response never streamed
+    return StreamingResponse(result.chunks, media_type=result.media_type, headers=headers,
+                             background=BackgroundTask(result.aclose))
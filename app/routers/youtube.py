@@ -2,17 +2,20 @@
 YouTube video downloader router
 """
 
+import json
 import logging
-from fastapi import APIRouter, HTTPException
-from app.models import ExtractRequest, DownloadRequest, PlaylistRequest, BatchDownloadRequest, ExtractResponse, DownloadResponse
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
+from app.models import ExtractRequest, PlaylistExtractRequest, DownloadRequest, PlaylistRequest, BatchDownloadRequest, ExtractResponse, DownloadResponse
 from app.services.downloader import downloader_service
+from app.responses import Projection, extract_projection
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
 @router.post("/extract/youtube", response_model=ExtractResponse)
-async def extract_youtube_metadata(request: ExtractRequest):
+async def extract_youtube_metadata(request: ExtractRequest, projection: Projection = Depends(extract_projection)):
     """
     Extract YouTube video metadata without downloading
     """
@@ -24,7 +27,7 @@ async def extract_youtube_metadata(request: ExtractRequest):
         if response.status == "error":
             raise HTTPException(status_code=400, detail=response.message)
         
-        return response
+        return projection.render(response)
         
     except Exception as e:
         logger.error(f"Error extracting YouTube metadata: {str(e)}")
@@ -43,7 +46,9 @@ async def download_youtube_video(request: DownloadRequest):
             request.format_id,
             audio_only=request.audio_only,
             audio_format=request.audio_format or "mp3",
-            audio_quality=request.audio_quality or "192"
+            audio_quality=request.audio_quality or "192",
+            extraction_token=request.extraction_token,
+            preferences=request.preferences
         )
         
         if response.status == "error":
@@ -56,24 +61,44 @@ async def download_youtube_video(request: DownloadRequest):
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 @router.post("/extract/youtube/playlist", response_model=ExtractResponse)
-async def extract_youtube_playlist(request: ExtractRequest):
+async def extract_youtube_playlist(request: PlaylistExtractRequest, projection: Projection = Depends(extract_projection)):
     """
-    Extract YouTube playlist metadata without downloading videos
+    Extract one page of YouTube playlist metadata without downloading videos
     """
-    logger.info(f"Extracting YouTube playlist metadata for: {request.url}")
+    logger.info(f"Extracting YouTube playlist metadata for: {request.url} (offset: {request.offset}, limit: {request.limit})")
     
     try:
-        response = await downloader_service.extract_playlist_metadata(str(request.url))
+        response = await downloader_service.extract_playlist_metadata(
+            str(request.url),
+            offset=request.offset,
+            limit=request.limit
+        )
         
         if response.status == "error":
             raise HTTPException(status_code=400, detail=response.message)
         
-        return response
+        return projection.render(response)
         
     except Exception as e:
         logger.error(f"Error extracting YouTube playlist metadata: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
+@router.post("/extract/youtube/playlist/stream")
+async def stream_youtube_playlist(request: PlaylistExtractRequest):
+    """
+    Stream YouTube playlist entries as NDJSON, one line per entry as soon as it is extracted.
+    The whole playlist is streamed when limit is not given in the request body.
+    """
+    logger.info(f"Streaming YouTube playlist metadata for: {request.url} (offset: {request.offset})")
+    
+    limit = request.limit if "limit" in request.model_fields_set else None
+    
+    async def ndjson():
+        async for event in downloader_service.stream_playlist_metadata(str(request.url), offset=request.offset, limit=limit):
+            yield json.dumps(event) + "\n"
+    
+    return StreamingResponse(ndjson(), media_type="application/x-ndjson")
+
 @router.post("/download/youtube/playlist", response_model=DownloadResponse)
 async def download_youtube_playlist(request: PlaylistRequest):
     """
@@ -87,7 +112,8 @@ async def download_youtube_playlist(request: PlaylistRequest):
             max_downloads=request.max_downloads,
             start_index=request.start_index or 1,
             end_index=request.end_index,
-            audio_only=False  # Can be extended later to support audio-only playlists
+            audio_only=False,  # Can be extended later to support audio-only playlists
+            parallelism=request.parallelism
         )
         
         if response.status == "error":
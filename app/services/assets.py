@@ -0,0 +1,128 @@
+"""
+Frontend assets held in memory with precompressed variants and strong ETags
+"""
+
+import asyncio
+import gzip
+import hashlib
+import logging
+import mimetypes
+import os
+from typing import Dict, Optional, Tuple
+
+from config import settings
+from app.middleware import COMPRESSIBLE_TYPES
+from app.services.executors import executor_pools
+
+try:
+    import brotli
+except ImportError:  # optional dependency
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+class StaticAsset:
+    """One file's content per content coding, each with its own strong ETag"""
+
+    __slots__ = ('path', 'content_type', 'mtime_ns', 'size', 'variants', 'etags')
+
+    def __init__(self, path: str, content_type: str, mtime_ns: int, body: bytes):
+        self.path = path
+        self.content_type = content_type
+        self.mtime_ns = mtime_ns
+        self.size = len(body)
+        self.variants: Dict[str, bytes] = {"identity": body}
+        if content_type.partition(";")[0] in COMPRESSIBLE_TYPES:
+            # Compressed once per change, so spend the maximum effort
+            compressed = {"gzip": gzip.compress(body, compresslevel=9, mtime=0)}
+            if brotli is not None:
+                compressed["br"] = brotli.compress(body, quality=11)
+            self.variants.update({coding: data for coding, data in compressed.items() if len(data) < len(body)})
+        digest = hashlib.sha256(body).hexdigest()[:20]
+        # Byte-different representations need different strong validators
+        self.etags = {coding: f'"{digest}"' if coding == "identity" else f'"{digest}-{coding}"'
+                      for coding in self.variants}
+
+    def variant(self, encoding: Optional[str]) -> Tuple[str, bytes]:
+        """(content coding, body) for a negotiated encoding, falling back to identity"""
+        if encoding in self.variants:
+            return encoding, self.variants[encoding]
+        return "identity", self.variants["identity"]
+
+class AssetStore:
+    """
+    Loads every file under a directory into memory. Requests are served from the
+    in-memory copies; refresh() re-reads only files whose size or mtime changed.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._assets: Dict[str, StaticAsset] = {}
+        self.loaded = False
+
+    def _scan(self) -> Dict[str, os.stat_result]:
+        found = {}
+        for root, _, names in os.walk(self.directory):
+            for name in names:
+                full_path = os.path.join(root, name)
+                try:
+                    found[os.path.relpath(full_path, self.directory).replace(os.sep, "/")] = os.stat(full_path)
+                except OSError:
+                    continue
+        return found
+
+    def refresh(self) -> int:
+        """Load new and changed files and drop deleted ones, returns the number of changes"""
+        current = self._assets
+        assets: Dict[str, StaticAsset] = {}
+        changes = 0
+        for path, stat in self._scan().items():
+            asset = current.get(path)
+            if asset is None or asset.mtime_ns != stat.st_mtime_ns or asset.size != stat.st_size:
+                try:
+                    with open(os.path.join(self.directory, path), "rb") as f:
+                        body = f.read()
+                except OSError as e:
+                    logger.warning(f"Cannot load static asset {path}: {e}")
+                    continue
+                content_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+                if content_type.startswith("text/") or content_type in ("application/javascript", "application/json"):
+                    content_type += "; charset=utf-8"
+                asset = StaticAsset(path, content_type, stat.st_mtime_ns, body)
+                changes += 1
+            assets[path] = asset
+        changes += len(current.keys() - assets.keys())
+        # Swapped in whole, so requests never see a half-refreshed set
+        self._assets = assets
+        self.loaded = True
+        return changes
+
+    def load(self) -> None:
+        self.refresh()
+        total = sum(sum(len(data) for data in asset.variants.values()) for asset in self._assets.values())
+        logger.info(f"Static assets loaded from {self.directory}: {len(self._assets)} files, {total} bytes in memory")
+
+    def get(self, path: str) -> Optional[StaticAsset]:
+        return self._assets.get(path)
+
+    async def watch(self, interval: float) -> None:
+        """Reload changed files every `interval` seconds, for development"""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                changes = await executor_pools.run("postprocess", self.refresh)
+            except Exception as e:
+                logger.warning(f"Static asset reload failed: {e}")
+                continue
+            if changes:
+                logger.info(f"Reloaded static assets: {changes} changed")
+
+    def stats(self) -> Dict[str, int]:
+        assets = list(self._assets.values())
+        return {
+            "files": len(assets),
+            "bytes": sum(sum(len(data) for data in asset.variants.values()) for asset in assets),
+        }
+
+# Global asset store instance
+asset_store = AssetStore(settings.STATIC_DIR)
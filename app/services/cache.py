@@ -0,0 +1,193 @@
+"""
+In-process TTL + LRU cache with a byte budget and single-flight loading
+"""
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+logger = logging.getLogger(__name__)
+
+# Query parameters that never change what a URL points to
+TRACKING_PARAMS = {
+    'si', 'feature', 'pp', 'fbclid', 'gclid', 'igshid', 'igsh', 'ref', 'ref_src', 'ref_url', 's',
+}
+
+def canonicalize_url(url: str) -> str:
+    """
+    Normalize a media URL so equivalent links share one cache key
+    """
+    parts = urlsplit(url.strip())
+    host = (parts.hostname or '').lower()
+    path = parts.path or '/'
+    query = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+             if k not in TRACKING_PARAMS and not k.startswith('utm_')]
+
+    # Collapse the YouTube host variants onto www.youtube.com
+    if host in ('youtube.com', 'm.youtube.com', 'music.youtube.com'):
+        host = 'www.youtube.com'
+    elif host == 'youtu.be' and path.strip('/'):
+        host = 'www.youtube.com'
+        query.insert(0, ('v', path.strip('/')))
+        path = '/watch'
+    elif host.startswith('www.') and host[4:] in ('instagram.com', 'twitter.com', 'x.com'):
+        host = host[4:]
+    elif host in ('m.facebook.com', 'facebook.com', 'web.facebook.com'):
+        host = 'www.facebook.com'
+
+    if len(path) > 1:
+        path = path.rstrip('/')
+    if parts.port and parts.port not in (80, 443):
+        host = f"{host}:{parts.port}"
+
+    return urlunsplit(('https', host, path, urlencode(sorted(query)), ''))
+
+class _CacheEntry:
+    """A cached value with its expiry time and estimated size"""
+
+    __slots__ = ('value', 'expires_at', 'size')
+
+    def __init__(self, value: Any, expires_at: float, size: int):
+        self.value = value
+        self.expires_at = expires_at
+        self.size = size
+
+class TTLCache:
+    """
+    Async TTL + LRU cache bounded by entry count and estimated byte size.
+    Concurrent loads of the same key share a single in-flight task.
+    on_remove(key, value) is called whenever an entry expires, is evicted or popped.
+    """
+
+    def __init__(self, ttl: float, max_entries: int, max_bytes: int,
+                 sizeof: Optional[Callable[[Any], int]] = None,
+                 on_remove: Optional[Callable[[str, Any], None]] = None):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._sizeof = sizeof or (lambda value: 0)
+        self._on_remove = on_remove
+        self._entries: "OrderedDict[str, _CacheEntry]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Any:
+        """Return the cached value or None, refreshing its LRU position"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires_at <= time.monotonic():
+            self._remove(key)
+            return None
+        self._entries.move_to_end(key)
+        return entry.value
+
+    def lookup(self, key: str, accept: Optional[Callable[[Any], bool]] = None) -> Any:
+        """
+        get() for caches without a loader, counting a hit or a miss.
+        A value that accept() rejects is returned as None and counts as a miss.
+        """
+        value = self.get(key)
+        if value is None or (accept is not None and not accept(value)):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return value
+
+    def put(self, key: str, value: Any, size: Optional[int] = None) -> bool:
+        """Store a value, evicting least recently used entries to stay within budget; False if it was not kept"""
+        if self.max_entries <= 0 or self.ttl <= 0:
+            return False
+        if size is None:
+            try:
+                size = self._sizeof(value)
+            except Exception as e:
+                logger.warning(f"Could not size cache entry for {key}: {e}")
+                return False
+        if size > self.max_bytes:
+            return False
+
+        self._remove(key, notify=False)
+        self._entries[key] = _CacheEntry(value, time.monotonic() + self.ttl, size)
+        self.current_bytes += size
+
+        while len(self._entries) > self.max_entries or self.current_bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+        return key in self._entries
+
+    def pop(self, key: str) -> Any:
+        """Remove and return a cached value"""
+        entry = self._remove(key)
+        return entry.value if entry else None
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.current_bytes = 0
+
+    def _remove(self, key: str, notify: bool = True) -> Optional[_CacheEntry]:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.current_bytes -= entry.size
+            if notify and self._on_remove is not None:
+                self._on_remove(key, entry.value)
+        return entry
+
+    async def get_or_load(self, key: str, loader: Callable[[], Awaitable[Any]],
+                          should_cache: Optional[Callable[[Any], bool]] = None) -> Any:
+        """
+        Return the cached value for key, or run loader once for all concurrent callers.
+        The load runs as its own task so a cancelled caller does not abort it for the others.
+        """
+        value = self.get(key)
+        if value is not None:
+            self.hits += 1
+            return value
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            self.misses += 1
+            task = asyncio.ensure_future(loader())
+            self._inflight[key] = task
+
+            def on_loaded(done: asyncio.Future):
+                self._inflight.pop(key, None)
+                if done.cancelled() or done.exception() is not None:
+                    return
+                result = done.result()
+                if should_cache is None or should_cache(result):
+                    self.put(key, result)
+
+            task.add_done_callback(on_loaded)
+
+        return await asyncio.shield(task)
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters for health/metrics reporting"""
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            "entries": len(self._entries),
+            "bytes": self.current_bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "evictions": self.evictions,
+            "inflight": len(self._inflight),
+            "hit_ratio": round((self.hits + self.coalesced) / lookups, 4) if lookups else 0.0,
+        }
@@ -2,32 +2,109 @@
 Core downloader service using yt-dlp
 """
 
-import os
 import asyncio
+import copy
+import itertools
+import json
 import logging
+import mimetypes
+import os
 import re
-from typing import Dict, Any, Optional, List
+import secrets
+import time
+from contextlib import AsyncExitStack
+from typing import Dict, Any, Optional, List, Callable, Tuple, Union, Iterator, AsyncIterator
 from pathlib import Path
-import yt_dlp
-import requests
+from urllib.parse import urlsplit, parse_qs
+import httpx
 
 from config import settings
-from app.models import VideoMetadata, VideoFormat, ExtractResponse, DownloadResponse
+from app.models import VideoMetadata, ExtractResponse, DownloadResponse, EntryResult, FormatPreferences
+from app.services.cache import TTLCache, canonicalize_url
+from app.services.executors import executor_pools
+from app.services.lazy import yt_dlp
+from app.services.ydl_pool import ydl_pool
+from app.services.files import file_registry
+from app.services.scheduler import download_scheduler
+from app.services.journal import JobEntryTracker
+from app.services import storage
+from app.services.storage import storage_manager
+from app.services.media_index import media_index
+from app.services.http_client import http_client
+from app.services.images import image_downloader
+from app.services.scanner import media_url_scanner
+from app.services.formats import format_selector, build_formats
+from app.services.streaming import MediaStream, iterate_in_thread
+from app.services.metrics import DownloadedBytesHook, url_host, downloaded_bytes, extract_errors, download_errors
 
 logger = logging.getLogger(__name__)
 
+TWEET_ID_RE = re.compile(r'/status(?:es)?/(\d+)')
+
+# Platforms accepted by the /{platform} job and stream endpoints
+SUPPORTED_PLATFORMS = ("youtube", "instagram", "facebook", "twitter")
+
+# yt-dlp extractors of the supported platforms, loaded by warm_up()
+WARMUP_EXTRACTORS = ('Youtube', 'YoutubeTab', 'Twitter', 'Instagram', 'Facebook', 'Generic')
+
+# Friendlier messages for common yt-dlp errors, keyed by the reason _extract_error_reason() gives
+EXTRACT_ERROR_MESSAGES = {
+    "community_post": "YouTube Community posts are not supported. This API only supports video content (regular videos, shorts, playlists). Community posts contain text, images, or polls which cannot be downloaded.",
+    "private": "This video is private and cannot be accessed. Only public, unlisted, or your own private videos can be downloaded.",
+    "members_only": "This content requires channel membership or premium access, which is not supported.",
+    "age_restricted": "Age-restricted content may require authentication. Try with a direct video URL if available.",
+}
+
+def _extract_info(url: str, ydl_opts: Dict[str, Any], sanitize: bool = False) -> Optional[Dict[str, Any]]:
+    """
+    Extract info without downloading.
+    Module level so it can also run in the process pool, where the result must be sanitized to pickle.
+    """
+    with ydl_pool.acquire("extract", ydl_opts) as ydl:
+        info = ydl.extract_info(url, download=False)
+    return yt_dlp.YoutubeDL.sanitize_info(info) if sanitize else info
+
 class VideoDownloaderService:
     """Service for video metadata extraction and downloading"""
     
     def __init__(self):
         self.download_dir = Path(settings.DOWNLOAD_DIR)
-        self.download_dir.mkdir(parents=True, exist_ok=True)
-        # Create subdirectories for organization
-        (self.download_dir / "audio").mkdir(parents=True, exist_ok=True)
-        (self.download_dir / "playlists").mkdir(parents=True, exist_ok=True)
-        (self.download_dir / "playlists" / "audio").mkdir(parents=True, exist_ok=True)
-        (self.download_dir / "batch").mkdir(parents=True, exist_ok=True)
-        (self.download_dir / "batch" / "audio").mkdir(parents=True, exist_ok=True)
+        
+        # Successful extractions keyed by canonical URL
+        self.metadata_cache = TTLCache(
+            ttl=settings.METADATA_CACHE_TTL,
+            max_entries=settings.METADATA_CACHE_MAX_ENTRIES,
+            max_bytes=settings.METADATA_CACHE_MAX_BYTES,
+            sizeof=lambda response: len(response.model_dump_json()),
+        )
+        # Sanitized info dicts keyed by extraction token, reused by the download phase.
+        # A token leaving the store takes the cached response handing it out along.
+        self.extraction_store = TTLCache(
+            ttl=settings.EXTRACTION_TOKEN_TTL,
+            max_entries=settings.EXTRACTION_STORE_MAX_ENTRIES,
+            max_bytes=settings.EXTRACTION_STORE_MAX_BYTES,
+            sizeof=lambda stored: len(json.dumps(stored[1])),
+            on_remove=self._forget_extraction,
+        )
+        self.executors = executor_pools
+    
+    def ensure_directories(self) -> None:
+        """Create the download directory and its subdirectories (called at startup, not import)"""
+        for subdir in ("", "audio", "playlists", "playlists/audio", "batch", "batch/audio"):
+            (self.download_dir / subdir).mkdir(parents=True, exist_ok=True)
+    
+    def warm_up(self) -> None:
+        """
+        Import yt-dlp and preload the extractors of the supported platforms into the
+        extraction pool (blocking, run in the background after startup)
+        """
+        started = time.perf_counter()
+        try:
+            ydl_pool.warm_up("extract", self._get_base_ydl_opts(), WARMUP_EXTRACTORS)
+        except Exception as e:
+            logger.warning(f"yt-dlp warm-up failed: {e}")
+            return
+        logger.info(f"yt-dlp warmed up in {time.perf_counter() - started:.2f}s")
     
     def _get_base_ydl_opts(self) -> Dict[str, Any]:
         """Get base yt-dlp options"""
@@ -42,89 +119,25 @@ class VideoDownloaderService:
             'writeautomaticsub': False,
             'ignoreerrors': False,
             'socket_timeout': settings.DOWNLOAD_TIMEOUT,
+            'continuedl': True,  # Resume existing .part files with HTTP Range requests
         }
     
-    def _classify_format(self, fmt: dict) -> dict:
-        """
-        Classify yt-dlp format based on vcodec and acodec values
-        Returns classification data for enhanced frontend display
-        """
-        vcodec = fmt.get('vcodec')
-        acodec = fmt.get('acodec')
-        height = fmt.get('height') or 0  # Handle None values properly
-        format_note = fmt.get('format_note', '').lower()
-        
-        # Determine format type based on codec presence
-        if vcodec and vcodec != 'none' and acodec and acodec != 'none':
-            format_type = "combined"
-            visual_indicator = "🎬"  # Video + Audio
-        elif vcodec and vcodec != 'none' and (not acodec or acodec == 'none'):
-            format_type = "video-only"
-            visual_indicator = "📹"  # Video only
-        elif acodec and acodec != 'none' and (not vcodec or vcodec == 'none'):
-            format_type = "audio-only"
-            visual_indicator = "🎵"  # Audio only
-        else:
-            format_type = "unknown"
-            visual_indicator = "❓"
-        
-        # Determine quality category based on resolution
-        if height and height >= 1080:
-            format_category = "best"
-        elif height and height >= 720:
-            format_category = "high"
-        elif height and height >= 480:
-            format_category = "medium"
-        elif height and height > 0:
-            format_category = "low"
-        elif format_type == "audio-only":
-            # For audio, use bitrate to determine quality
-            abr = fmt.get('abr') or 0  # Handle None values properly
-            if abr >= 256:
-                format_category = "best"
-            elif abr >= 192:
-                format_category = "high"
-            elif abr >= 128:
-                format_category = "medium"
-            else:
-                format_category = "low"
-        else:
-            format_category = "unknown"
-        
-        # Generate human-readable codec information
-        codec_parts = []
-        if vcodec and vcodec != 'none':
-            if 'av01' in vcodec:
-                codec_parts.append("AV1")
-            elif 'vp9' in vcodec:
-                codec_parts.append("VP9")
-            elif 'h264' in vcodec or 'avc1' in vcodec:
-                codec_parts.append("H.264")
-            elif 'h265' in vcodec or 'hevc' in vcodec:
-                codec_parts.append("H.265")
-            else:
-                codec_parts.append(vcodec.upper()[:8])
-        
-        if acodec and acodec != 'none':
-            if 'opus' in acodec:
-                codec_parts.append("Opus")
-            elif 'aac' in acodec:
-                codec_parts.append("AAC")
-            elif 'mp3' in acodec:
-                codec_parts.append("MP3")
-            elif 'vorbis' in acodec:
-                codec_parts.append("Vorbis")
-            else:
-                codec_parts.append(acodec.upper()[:6])
-        
-        codec_info = " + ".join(codec_parts) if codec_parts else "Unknown"
-        
-        return {
-            "format_type": format_type,
-            "format_category": format_category,
-            "visual_indicator": visual_indicator,
-            "codec_info": codec_info
-        }
+    def _get_download_ydl_opts(self) -> Dict[str, Any]:
+        """Base options plus the MAX_FILESIZE checks, for calls that write to disk"""
+        ydl_opts = self._get_base_ydl_opts()
+        # yt-dlp's own max_filesize check skips files silently, these raise FileTooLargeError instead
+        ydl_opts.update({
+            'match_filter': storage_manager.size_filter,
+            'progress_hooks': [storage_manager.size_guard, DownloadedBytesHook()],
+        })
+        return ydl_opts
+    
+    async def _enforce_storage(self, keep: List[str]) -> None:
+        """Apply the DOWNLOAD_DIR budget after new files were produced, never evicting `keep`"""
+        try:
+            await self.executors.run("postprocess", storage_manager.enforce, keep)
+        except Exception as e:
+            logger.warning(f"Storage budget enforcement failed: {e}")
     
     def _detect_youtube_content_type(self, url: str) -> str:
         """Detect YouTube content type from URL"""
@@ -145,7 +158,145 @@ class VideoDownloaderService:
         else:
             return "unknown"
     
+    def _store_extraction(self, url: str, sanitized_info: Dict[str, Any], size: int) -> Optional[str]:
+        """Store a sanitized info dict and return its extraction token, None when the store cannot keep it"""
+        token = secrets.token_urlsafe(16)
+        if not self.extraction_store.put(token, (canonicalize_url(url), sanitized_info), size=size):
+            return None
+        return token
+    
+    def _forget_extraction(self, token: str, stored: Tuple[str, Dict[str, Any]]) -> None:
+        """Drop the cached metadata response whose token just left the extraction store"""
+        cached = self.metadata_cache.get(stored[0])
+        if cached is not None and cached.extraction_token == token:
+            self.metadata_cache.pop(stored[0])
+    
+    def _build_extract_response(self, url: str, info: Dict[str, Any]) -> Tuple[ExtractResponse, Optional[Tuple[Dict[str, Any], int]]]:
+        """
+        Build the metadata response from a yt-dlp info dict.
+        Also returns the sanitized info dict and its size for the extraction store (None for live streams).
+        """
+        # Check for live streams
+        is_live = info.get('is_live', False) or info.get('live_status') == 'is_live'
+        
+        # Process formats (classified and validated in bulk)
+        formats = build_formats(info.get('formats', []))
+        
+        # Create metadata object
+        metadata = VideoMetadata(
+            id=info.get('id', ''),
+            title=info.get('title', 'Unknown Title'),
+            description=info.get('description'),
+            uploader=info.get('uploader'),
+            upload_date=info.get('upload_date'),
+            duration=info.get('duration'),
+            view_count=info.get('view_count'),
+            like_count=info.get('like_count'),
+            thumbnail=info.get('thumbnail'),
+            webpage_url=info.get('webpage_url', url),
+            formats=formats,
+            media_type="live" if is_live else ("video" if formats else "none"),
+            images=None,
+            has_media=bool(formats),
+            is_live=is_live,
+            playlist_count=None,
+            entries=None
+        )
+        
+        extraction = None
+        if not is_live:
+            sanitized = yt_dlp.YoutubeDL.sanitize_info(info, remove_private_keys=True)
+            extraction = (sanitized, len(json.dumps(sanitized)))
+        
+        response = ExtractResponse(
+            status="ok",
+            metadata=metadata,
+            message="Metadata extracted successfully"
+        )
+        return response, extraction
+    
+    def _format_urls_expire_at(self, info: Dict[str, Any]) -> Optional[float]:
+        """Earliest expiry timestamp embedded in the format URLs, if any"""
+        earliest = None
+        for fmt in info.get('formats') or []:
+            for key in ('url', 'manifest_url'):
+                media_url = fmt.get(key)
+                if not media_url:
+                    continue
+                parts = urlsplit(media_url)
+                expire = parse_qs(parts.query).get('expire', [None])[0]
+                if expire is None:
+                    match = re.search(r'/expire/(\d+)', parts.path)
+                    expire = match.group(1) if match else None
+                if expire and expire.isdigit():
+                    earliest = min(earliest or float(expire), float(expire))
+        return earliest
+    
+    def _get_stored_extraction(self, token: Optional[str], url: str) -> Optional[Dict[str, Any]]:
+        """
+        Resolve an extraction token to its info dict.
+        Returns None when the token is unknown, expired, belongs to another URL or its format URLs went stale.
+        """
+        if not token:
+            return None
+        
+        def usable(stored: Tuple[str, Dict[str, Any]]) -> bool:
+            stored_url, info = stored
+            if stored_url != canonicalize_url(url):
+                logger.warning(f"Extraction token does not match {url}, ignoring it")
+                return False
+            expires_at = self._format_urls_expire_at(info)
+            if expires_at is not None and expires_at <= time.time() + settings.FORMAT_URL_EXPIRY_MARGIN:
+                logger.info(f"Format URLs for {url} are stale, re-extracting")
+                self.extraction_store.pop(token)
+                return False
+            return True
+        
+        stored = self.extraction_store.lookup(token, accept=usable)
+        return stored[1] if stored is not None else None
+    
     async def extract_metadata(self, url: str) -> ExtractResponse:
+        """
+        Extract video metadata without downloading, served from the metadata cache when possible
+        """
+        return await self.metadata_cache.get_or_load(
+            canonicalize_url(url),
+            lambda: self._extract_metadata_uncached(url),
+            should_cache=lambda response: response.status == "ok",
+        )
+    
+    async def _extract_info(self, url: str) -> Optional[Dict[str, Any]]:
+        """Run yt-dlp extraction off the event loop, in worker processes when configured"""
+        ydl_opts = self._get_base_ydl_opts()
+        if self.executors.process_mode:
+            return await self.executors.run_in_process(_extract_info, url, ydl_opts, True)
+        return await self.executors.run("extract", _extract_info, url, ydl_opts)
+    
+    async def _resolve_extraction(self, url: str, token: Optional[str],
+                                  live_message: str) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+        """
+        Info dict to download or relay from: the token's stored extraction, else the one behind the
+        cached metadata, else a fresh extraction bypassing the cache.
+        Returns (info, None), or (None, error message) when extraction fails or the URL is a live stream.
+        """
+        info = self._get_stored_extraction(token, url)
+        if info is not None:
+            return info, None
+        
+        extracted = await self.extract_metadata(url)
+        if extracted.status == "error":
+            return None, extracted.message
+        info = self._get_stored_extraction(extracted.extraction_token, url)
+        if info is None and not (extracted.metadata and extracted.metadata.is_live):
+            # Not kept by the extraction store (too large, or evicted meanwhile)
+            info = await self._extract_info(url)
+            if not info:
+                return None, "Could not extract video information"
+        if info is None or info.get('is_live') or info.get('live_status') == 'is_live':
+            return None, live_message
+        return info, None
+    
+    async def _extract_metadata_uncached(self, url: str) -> ExtractResponse:
         """
         Extract video metadata without downloading
         """
@@ -153,106 +304,53 @@ class VideoDownloaderService:
         if 'youtube.com' in url.lower() or 'youtu.be' in url.lower():
             content_type = self._detect_youtube_content_type(url)
             if content_type == "community_post":
-                return ExtractResponse(status="error", metadata=None, message="YouTube Community posts are not supported. This API only supports video content (regular videos, shorts, playlists). Community posts contain text, images, or polls which cannot be downloaded."
+                return ExtractResponse(status="error", metadata=None, message=EXTRACT_ERROR_MESSAGES["community_post"]
                 )
         
         try:
-            ydl_opts = self._get_base_ydl_opts()
-            
-            def extract_info():
-                with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                    # Extract info without downloading
-                    return ydl.extract_info(url, download=False)
-            
-            # Run in thread pool to avoid blocking
-            loop = asyncio.get_event_loop()
-            info = await loop.run_in_executor(None, extract_info)
+            info = await self._extract_info(url)
             
             if not info:
+                extract_errors.inc("no_info")
                 return ExtractResponse(status="error", metadata=None, message="Could not extract video information"
                 )
             
-            # Check for live streams
-            is_live = info.get('is_live', False) or info.get('live_status') == 'is_live'
-            
-            # Process formats
-            formats = []
-            for fmt in info.get('formats', []):
-                # Enhanced format classification
-                format_classification = self._classify_format(fmt)
-                
-                video_format = VideoFormat(
-                    format_id=fmt.get('format_id', ''),
-                    format_note=fmt.get('format_note'),
-                    ext=fmt.get('ext', 'unknown'),
-                    resolution=fmt.get('resolution'),
-                    height=fmt.get('height'),
-                    width=fmt.get('width'),
-                    fps=fmt.get('fps'),
-                    vcodec=fmt.get('vcodec'),
-                    acodec=fmt.get('acodec'),
-                    filesize=fmt.get('filesize'),
-                    filesize_approx=fmt.get('filesize_approx'),
-                    tbr=fmt.get('tbr'),
-                    vbr=fmt.get('vbr'),
-                    abr=fmt.get('abr'),
-                    quality=fmt.get('quality'),
-                    **format_classification
-                )
-                formats.append(video_format)
+            # Turning formats into models is CPU work, keep it off the event loop too
+            response, extraction = await self.executors.run("postprocess", self._build_extract_response, url, info)
             
-            # Create metadata object
-            metadata = VideoMetadata(
-                id=info.get('id', ''),
-                title=info.get('title', 'Unknown Title'),
-                description=info.get('description'),
-                uploader=info.get('uploader'),
-                upload_date=info.get('upload_date'),
-                duration=info.get('duration'),
-                view_count=info.get('view_count'),
-                like_count=info.get('like_count'),
-                thumbnail=info.get('thumbnail'),
-                webpage_url=info.get('webpage_url', url),
-                formats=formats,
-                media_type="live" if is_live else ("video" if formats else "none"),
-                images=None,
-                has_media=bool(formats),
-                is_live=is_live,
-                playlist_count=None,
-                entries=None
-            )
+            # Keep the info dict so the download phase can skip re-extraction
+            if extraction is not None:
+                response.extraction_token = self._store_extraction(url, *extraction)
             
-            return ExtractResponse(
-                status="ok",
-                metadata=metadata,
-                message="Metadata extracted successfully"
-            )
+            return response
             
         except yt_dlp.DownloadError as e:
             logger.error(f"yt-dlp download error for {url}: {str(e)}")
             
             # Provide more helpful error messages for common YouTube issues
-            error_msg = str(e)
-            if "This channel does not have a" in error_msg and "tab" in error_msg:
-                return ExtractResponse(status="error", metadata=None, message="YouTube Community posts are not supported. This API only supports video content (regular videos, shorts, playlists). Community posts contain text, images, or polls which cannot be downloaded."
-                )
-            elif "Private video" in error_msg or "private" in error_msg.lower():
-                return ExtractResponse(status="error", metadata=None, message="This video is private and cannot be accessed. Only public, unlisted, or your own private videos can be downloaded."
-                )
-            elif "Members-only" in error_msg or "premium" in error_msg.lower():
-                return ExtractResponse(status="error", metadata=None, message="This content requires channel membership or premium access, which is not supported."
-                )
-            elif "Age-restricted" in error_msg:
-                return ExtractResponse(status="error", metadata=None, message="Age-restricted content may require authentication. Try with a direct video URL if available."
-                )
-            else:
-                return ExtractResponse(status="error", metadata=None, message=f"Download error: {str(e)}"
-                )
+            reason = self._extract_error_reason(str(e))
+            extract_errors.inc(reason)
+            message = EXTRACT_ERROR_MESSAGES.get(reason, f"Download error: {str(e)}")
+            return ExtractResponse(status="error", metadata=None, message=message)
         except Exception as e:
+            extract_errors.inc("unexpected")
             logger.error(f"Unexpected error extracting metadata for {url}: {str(e)}")
             return ExtractResponse(status="error", metadata=None, message=f"Unexpected error: {str(e)}"
             )
     
+    @staticmethod
+    def _extract_error_reason(error_msg: str) -> str:
+        """Classify a yt-dlp extraction error, used as its metrics label and to pick its message"""
+        if "This channel does not have a" in error_msg and "tab" in error_msg:
+            return "community_post"
+        if "Private video" in error_msg or "private" in error_msg.lower():
+            return "private"
+        if "Members-only" in error_msg or "premium" in error_msg.lower():
+            return "members_only"
+        if "Age-restricted" in error_msg:
+            return "age_restricted"
+        return "download_error"
+    
     async def extract_twitter_metadata(self, url: str) -> ExtractResponse:
         """
         Extract Twitter/X post metadata, handling posts with videos, images, or no media
@@ -266,7 +364,7 @@ class VideoDownloaderService:
             ydl_opts['writethumbnail'] = True
             
             def extract_info():
-                with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+                with ydl_pool.acquire("twitter-extract", ydl_opts) as ydl:
                     try:
                         # Try to extract video info first
                         return ydl.extract_info(url, download=False)
@@ -287,7 +385,7 @@ class VideoDownloaderService:
                                     'format': 'worst',  # Try to get any available format
                                 })
                                 
-                                with yt_dlp.YoutubeDL(ydl_opts_image) as ydl_img:
+                                with ydl_pool.acquire("twitter-extract-images", ydl_opts_image) as ydl_img:
                                     try:
                                         info = ydl_img.extract_info(url, download=False)
                                         if info:
@@ -321,41 +419,21 @@ class VideoDownloaderService:
                                 pass
                         raise e
             
-            # Run in thread pool to avoid blocking
-            loop = asyncio.get_event_loop()
-            info = await loop.run_in_executor(None, extract_info)
+            # Run in the extraction pool to avoid blocking
+            info = await self.executors.run("extract", extract_info)
             
             if not info:
                 return ExtractResponse(status="error", metadata=None, message="Could not extract post information"
                 )
             
             # Process formats (if any)
-            formats = []
             media_type = "none"
             images = []
             
             # Check for video formats
-            for fmt in info.get('formats', []):
-                if fmt.get('format_id') and fmt.get('ext'):
-                    video_format = VideoFormat(
-                        format_id=fmt.get('format_id', ''),
-                        format_note=fmt.get('format_note'),
-                        ext=fmt.get('ext', 'unknown'),
-                        resolution=fmt.get('resolution'),
-                        height=fmt.get('height'),
-                        width=fmt.get('width'),
-                        fps=fmt.get('fps'),
-                        vcodec=fmt.get('vcodec'),
-                        acodec=fmt.get('acodec'),
-                        filesize=fmt.get('filesize'),
-                        filesize_approx=fmt.get('filesize_approx'),
-                        tbr=fmt.get('tbr'),
-                        vbr=fmt.get('vbr'),
-                        abr=fmt.get('abr'),
-                        quality=fmt.get('quality')
-                    )
-                    formats.append(video_format)
-                    media_type = "video"
+            formats = build_formats([fmt for fmt in info.get('formats', []) if fmt.get('format_id') and fmt.get('ext')])
+            if formats:
+                media_type = "video"
             
             # Check for images from multiple sources
             thumbnails = info.get('thumbnails', [])
@@ -422,72 +500,89 @@ class VideoDownloaderService:
             )
             
         except yt_dlp.DownloadError as e:
+            extract_errors.inc(self._extract_error_reason(str(e)))
             logger.error(f"yt-dlp download error for {url}: {str(e)}")
             return ExtractResponse(status="error", metadata=None, message=f"Could not extract post information: {str(e)}"
             )
         except Exception as e:
+            extract_errors.inc("unexpected")
             logger.error(f"Unexpected error extracting Twitter metadata for {url}: {str(e)}")
             return ExtractResponse(status="error", metadata=None, message=f"Unexpected error: {str(e)}"
             )
     
+    def _images_response(self, image_files: List[str], message: str, error_count: int = 0) -> DownloadResponse:
+        """Response listing exactly the image files of one post"""
+        stored_files = file_registry.register_many(image_files)
+        return DownloadResponse(
+            status="ok",
+            file_path=os.path.commonpath([stored.path for stored in stored_files]) if len(stored_files) > 1 else stored_files[0].path,
+            filename=f"{len(stored_files)} images downloaded",
+            file_size=sum(stored.size for stored in stored_files),
+            message=message,
+            download_type="images",
+            files_downloaded=[stored.path for stored in stored_files],
+            file_ids=[stored.id for stored in stored_files],
+            total_files=len(stored_files) + error_count,
+            success_count=len(stored_files),
+            error_count=error_count
+        )
+    
     async def download_twitter_images(self, url: str) -> DownloadResponse:
         """
-        Download images from Twitter/X post
+        Download images from Twitter/X post.
+        Image URLs are resolved from the post metadata and fetched in parallel at their original size.
+        The response lists only the files this post produced; repeat requests are served from the media index.
         """
         try:
-            ydl_opts = self._get_base_ydl_opts()
-            ydl_opts['skip_download'] = True  # Skip video download
-            ydl_opts['write_all_thumbnails'] = True  # Download all images
-            ydl_opts['writethumbnail'] = True
-            ydl_opts['outtmpl'] = str(self.download_dir / 'images/%(title)s [%(id)s]/%(title)s.%(ext)s')
-            
-            downloaded_files = []
+            tweet_id = TWEET_ID_RE.search(url)
+            tweet_id = tweet_id.group(1) if tweet_id else None
+            if tweet_id:
+                indexed = await self.executors.run("postprocess", media_index.lookup, "twitter", tweet_id)
+                if indexed:
+                    logger.info(f"Serving images for tweet {tweet_id} from the media index")
+                    return await self.executors.run(
+                        "postprocess", self._images_response, indexed, f"{len(indexed)} images already downloaded"
+                    )
             
-            def download_hook(d):
-                if d['status'] == 'finished':
-                    downloaded_files.append(d['filename'])
-                    logger.info(f"Downloaded image: {d['filename']}")
+            extracted = await self.extract_twitter_metadata(url)
+            if extracted.status == "error" or not extracted.metadata:
+                return DownloadResponse(status="error", file_path=None, filename=None, file_size=None, message=extracted.message)
+            
+            image_urls = extracted.metadata.images or []
+            if not image_urls:
+                return DownloadResponse(
+                    status="error",
+                    file_path=None,
+                    filename=None,
+                    file_size=None,
+                    message="No images were found or downloaded from this post"
+                )
             
-            ydl_opts['progress_hooks'] = [download_hook]
+            post_id = tweet_id or extracted.metadata.id
+            image_dir = self.download_dir / 'images' / post_id
+            await self.executors.run("postprocess", image_dir.mkdir, parents=True, exist_ok=True)
+            
+            results = await image_downloader.download(image_urls, image_dir, self.executors)
+            image_files = list(dict.fromkeys(result.path for result in results if result.path))
+            failed = sum(1 for result in results if result.error)
+            
+            if not image_files:
+                return DownloadResponse(
+                    status="error",
+                    file_path=None,
+                    filename=None,
+                    file_size=None,
+                    message=f"Failed to download {failed} images from this post"
+                )
             
-            def download():
-                with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                    try:
-                        ydl.download([url])
-                    except yt_dlp.DownloadError as e:
-                        if "No video could be found" in str(e):
-                            # This is expected for image-only posts, yt-dlp still extracts thumbnails
-                            pass
-                        else:
-                            raise e
-            
-            # Run in thread pool to avoid blocking
-            loop = asyncio.get_event_loop()
-            await loop.run_in_executor(None, download)
-            
-            # Check if any image files were downloaded
-            image_dir = self.download_dir / 'images'
-            if image_dir.exists():
-                image_files = list(image_dir.rglob('*'))
-                image_files = [f for f in image_files if f.is_file() and f.suffix.lower() in ['.jpg', '.jpeg', '.png', '.webp']]
-                
-                if image_files:
-                    total_size = sum(f.stat().st_size for f in image_files)
-                    return DownloadResponse(
-                        status="ok",
-                        file_path=str(image_dir),
-                        filename=f"{len(image_files)} images downloaded",
-                        file_size=total_size,
-                        message=f"Downloaded {len(image_files)} images successfully"
-                    )
-            
-            return DownloadResponse(
-                status="error",
-                file_path=None,
-                filename=None,
-                file_size=None,
-                message="No images were found or downloaded from this post"
-            )
+            if not failed:
+                await self.executors.run("postprocess", media_index.store, "twitter", post_id, image_files)
+            message = f"Downloaded {len(image_files)} images successfully"
+            if failed:
+                message += f", {failed} failed"
+            response = await self.executors.run("postprocess", self._images_response, image_files, message, failed)
+            await self._enforce_storage(response.file_ids)
+            return response
             
         except Exception as e:
             logger.error(f"Unexpected error downloading Twitter images for {url}: {str(e)}")
@@ -504,72 +599,52 @@ class VideoDownloaderService:
         Fallback method to extract Twitter images using web scraping when yt-dlp fails
         """
         try:
-            # Make a request to get the Twitter page HTML
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-            }
-            
-            loop = asyncio.get_event_loop()
-            response = await loop.run_in_executor(
-                None, 
-                lambda: requests.get(url, headers=headers, timeout=10)
-            )
-            
-            if response.status_code != 200:
-                return []
-            
-            html_content = response.text
-            
-            # Look for image URLs in the HTML using regex patterns
-            image_patterns = [
-                r'https://pbs\.twimg\.com/media/[^"]+\.(jpg|jpeg|png|webp)',
-                r'https://ton\.twitter\.com/[^"]+\.(jpg|jpeg|png|webp)', 
-                r'https://video\.twimg\.com/[^"]+\.(jpg|jpeg|png|webp)',
-            ]
-            
-            images = []
-            for pattern in image_patterns:
-                matches = re.findall(pattern, html_content, re.IGNORECASE)
-                for match in matches:
-                    if isinstance(match, tuple):
-                        # Extract the full URL (match[0] would be the URL without extension)
-                        full_match = re.search(pattern, html_content, re.IGNORECASE)
-                        if full_match:
-                            images.append(full_match.group(0))
-                    else:
-                        images.append(match)
-            
-            # Remove duplicates and return high-quality versions
-            unique_images = list(dict.fromkeys(images))
-            
-            # Prefer larger image sizes
-            quality_images = []
-            for img in unique_images:
-                # Convert to larger size if possible
-                if ':small' in img:
-                    img = img.replace(':small', ':large')
-                elif ':medium' in img:
-                    img = img.replace(':medium', ':large')
-                elif '?format=' in img and '&name=' in img:
-                    # For newer Twitter image URLs, try to get the original size
-                    img = re.sub(r'&name=\w+', '&name=orig', img)
-                
-                quality_images.append(img)
+            # Scan the Twitter page HTML as it streams in over the shared keep-alive client
+            async with http_client.client.stream("GET", url, timeout=10) as response:
+                if response.status_code != 200:
+                    return []
+                # pbs.twimg.com URLs come back already upgraded to their original size
+                images = await media_url_scanner.scan_stream(response.aiter_text(), kinds=("image",))
             
-            logger.info(f"Extracted {len(quality_images)} images via fallback method for {url}")
-            return quality_images
+            logger.info(f"Extracted {len(images)} images via fallback method for {url}")
+            return images
             
         except Exception as e:
             logger.error(f"Twitter image fallback extraction failed: {e}")
             return []
     
-    async def download_video(self, url: str, format_id: str, audio_only: bool = False, 
-                           audio_format: str = "mp3", audio_quality: str = "192") -> DownloadResponse:
+    async def download_video(self, url: str, format_id: Optional[str], audio_only: bool = False, 
+                           audio_format: str = "mp3", audio_quality: str = "192",
+                           extraction_token: Optional[str] = None,
+                           progress_hook: Optional[Callable[[Dict[str, Any]], None]] = None,
+                           preferences: Optional[FormatPreferences] = None) -> DownloadResponse:
         """
-        Download video with specific format
+        Download video with specific format, or with the format resolved from preferences.
+        With a valid extraction token the stored info dict is processed directly instead of re-extracting.
         """
         try:
-            ydl_opts = self._get_base_ydl_opts()
+            info = self._get_stored_extraction(extraction_token, url)
+            
+            ydl_opts = self._get_download_ydl_opts()
+            
+            if preferences is not None and not audio_only:
+                if info is None:
+                    # Extract once and download from that info, so resolving costs no extra round trip
+                    info, error = await self._resolve_extraction(
+                        url, None, "Format preferences cannot be resolved for live streams"
+                    )
+                    if info is None:
+                        return DownloadResponse(status="error", message=error)
+                
+                if preferences.mode == "merge" and not format_selector.can_merge:
+                    return DownloadResponse(status="error", message="Merging separate video and audio formats requires ffmpeg, which is not installed")
+                choice = await self.executors.run("postprocess", format_selector.select, info, preferences)
+                if choice is None:
+                    return DownloadResponse(status="error", message="No format matches the requested preferences")
+                format_id = choice.format
+                if choice.merge_output_format:
+                    ydl_opts['merge_output_format'] = choice.merge_output_format
+                logger.info(f"Resolved preferences for {url} to format {format_id}")
             
             if audio_only:
                 ydl_opts.update({
@@ -589,60 +664,210 @@ class VideoDownloaderService:
                     downloaded_files.append(d['filename'])
                     logger.info(f"Downloaded: {d['filename']}")
             
-            ydl_opts['progress_hooks'] = [download_hook]
+            ydl_opts['progress_hooks'].append(download_hook)
+            if progress_hook:
+                ydl_opts['progress_hooks'].append(progress_hook)
             
             def download():
-                with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                    ydl.download([url])
-            
-            # Run in thread pool to avoid blocking
-            loop = asyncio.get_event_loop()
-            await loop.run_in_executor(None, download)
+                with ydl_pool.acquire("audio" if audio_only else "video", ydl_opts) as ydl:
+                    if info is not None:
+                        try:
+                            # process_ie_result mutates the dict, keep the stored copy intact
+                            return ydl.process_ie_result(copy.deepcopy(info), download=True)
+                        except storage.FileTooLargeError:
+                            raise
+                        except yt_dlp.DownloadError as e:
+                            logger.warning(f"Download from stored info failed for {url}, re-extracting: {e}")
+                    return ydl.extract_info(url, download=True)
+            
+            # Run in the download pool to avoid blocking
+            async with download_scheduler.slot(url):
+                result = await self.executors.run("download", download)
             
             if not downloaded_files:
                 return DownloadResponse(status="error", file_path=None, filename=None, file_size=None, message="No files were downloaded"
                 )
             
-            # Get info about the downloaded file
-            file_path = downloaded_files[0]
-            file_stat = os.stat(file_path)
-            filename = os.path.basename(file_path)
+            # Get info about the downloaded file; merged formats finish per stream, so prefer the final path
+            requested = (result or {}).get('requested_downloads') or []
+            file_path = requested[-1].get('filepath') if requested and requested[-1].get('filepath') else downloaded_files[0]
+            stored = await self.executors.run("postprocess", file_registry.register, file_path)
+            if stored is None:
+                return DownloadResponse(status="error", file_path=None, filename=None, file_size=None, message="Downloaded file is missing"
+                )
+            await self._enforce_storage([stored.id])
             
             return DownloadResponse(
                 status="ok",
                 file_path=file_path,
-                filename=filename,
-                file_size=file_stat.st_size,
+                filename=stored.filename,
+                file_size=stored.size,
+                file_id=stored.id,
+                download_url=f"/api/files/{stored.id}",
                 message="Video downloaded successfully" if not audio_only else "Audio extracted successfully",
-                download_type="audio" if audio_only else "video"
+                download_type="audio" if audio_only else "video",
+                format_id=None if audio_only else format_id
             )
             
         except yt_dlp.DownloadError as e:
+            download_errors.inc(type(e).__name__)
             logger.error(f"yt-dlp download error for {url} (format: {format_id}): {str(e)}")
             return DownloadResponse(status="error", file_path=None, filename=None, file_size=None, message=f"Download error: {str(e)}"
             )
         except Exception as e:
+            download_errors.inc(type(e).__name__)
             logger.error(f"Unexpected error downloading {url}: {str(e)}")
             return DownloadResponse(status="error", file_path=None, filename=None, file_size=None, message=f"Unexpected error: {str(e)}"
             )
 
-    async def extract_playlist_metadata(self, url: str) -> ExtractResponse:
+    def _select_single_stream(self, info: Dict[str, Any], format_id: str) -> Dict[str, Any]:
+        """
+        Resolve a format selection against an info dict without downloading.
+        Raises ValueError unless it resolves to one progressive HTTP stream.
+        """
+        with ydl_pool.acquire("stream", {**self._get_base_ydl_opts(), 'format': format_id}) as ydl:
+            selected = ydl.process_ie_result(copy.deepcopy(info), download=False)
+        
+        requested = selected.get('requested_formats')
+        if requested and len(requested) > 1:
+            raise ValueError("Selected format needs merging and cannot be streamed, choose a combined format")
+        fmt = requested[0] if requested else selected
+        if fmt.get('protocol') not in ('http', 'https') or not fmt.get('url'):
+            raise ValueError(f"Format protocol '{fmt.get('protocol')}' cannot be streamed directly")
+        return {**fmt, 'id': selected.get('id'), 'title': selected.get('title')}
+    
+    async def stream_video(self, url: str, format_id: Optional[str],
+                           extraction_token: Optional[str] = None,
+                           preferences: Optional[FormatPreferences] = None,
+                           audio_only: bool = False) -> Union[MediaStream, DownloadResponse]:
         """
-        Extract playlist metadata without downloading videos
+        Relay a single-stream (combined, non-merged) format straight to the client without writing to disk.
+        With audio_only the best audio stream is relayed in its original container, nothing is converted.
+        Memory stays bounded by the chunk buffer; closing the returned stream aborts the upstream transfer
+        and releases its slots, also when the response is never iterated.
+        """
+        try:
+            info, error = await self._resolve_extraction(url, extraction_token, "Live streams cannot be relayed")
+            if info is None:
+                return DownloadResponse(status="error", message=error)
+            
+            if audio_only:
+                format_id = 'bestaudio[protocol^=http]/bestaudio'
+            elif preferences is not None:
+                # Only a single combined stream can be relayed
+                choice = await self.executors.run(
+                    "postprocess", format_selector.select, info, preferences.model_copy(update={"mode": "combined"})
+                )
+                if choice is None:
+                    return DownloadResponse(status="error", message="No combined format matches the requested preferences")
+                format_id = choice.format
+            
+            fmt = await self.executors.run("extract", self._select_single_stream, info, format_id)
+            
+            client = http_client.client
+            request = client.build_request(
+                "GET", fmt['url'], headers=fmt.get('http_headers') or {},
+                timeout=httpx.Timeout(settings.DOWNLOAD_TIMEOUT, connect=settings.HTTP_CONNECT_TIMEOUT)
+            )
+            # Released in reverse order once the relay ends: response, connection slot, scheduler slot
+            resources = AsyncExitStack()
+            try:
+                # A relay is a download too, so it counts against the global and per-host caps
+                await resources.enter_async_context(download_scheduler.slot(url))
+                await resources.enter_async_context(http_client.stream_slots)
+                response = await client.send(request, stream=True)
+                resources.push_async_callback(response.aclose)
+            except BaseException:
+                await resources.aclose()
+                raise
+            if response.is_error:
+                await resources.aclose()
+                return DownloadResponse(status="error", message=f"Upstream returned HTTP {response.status_code}")
+            
+            async def relay() -> AsyncIterator[bytes]:
+                # Body is read on demand, so a slow client applies backpressure upstream
+                relayed = 0
+                try:
+                    async for chunk in response.aiter_bytes(settings.STREAM_CHUNK_SIZE):
+                        relayed += len(chunk)
+                        yield chunk
+                finally:
+                    downloaded_bytes.inc(url_host(fmt['url']), amount=relayed)
+                    await resources.aclose()
+            
+            content_length = response.headers.get('Content-Length')
+            ext = fmt.get('ext') or 'mp4'
+            return MediaStream(
+                filename=f"{fmt.get('title') or 'video'} [{fmt.get('id')}].{ext}",
+                media_type=mimetypes.guess_type(f"file.{ext}")[0] or "application/octet-stream",
+                content_length=int(content_length) if content_length and 'Content-Encoding' not in response.headers else None,
+                chunks=relay(),
+                close=resources.aclose
+            )
+            
+        except ValueError as e:
+            return DownloadResponse(status="error", message=str(e))
+        except yt_dlp.DownloadError as e:
+            logger.error(f"yt-dlp error resolving stream for {url} (format: {format_id}): {str(e)}")
+            return DownloadResponse(status="error", message=f"Download error: {str(e)}")
+        except Exception as e:
+            logger.error(f"Unexpected error streaming {url}: {str(e)}")
+            return DownloadResponse(status="error", message=f"Unexpected error: {str(e)}")
+    
+    def _playlist_entry_metadata(self, entry: Dict[str, Any]) -> VideoMetadata:
+        """Metadata for one flat-extracted playlist entry"""
+        return VideoMetadata(
+            id=entry.get('id', ''),
+            title=entry.get('title', 'Unknown'),
+            description=entry.get('description'),
+            uploader=entry.get('uploader'),
+            upload_date=entry.get('upload_date'),
+            duration=entry.get('duration'),
+            view_count=entry.get('view_count'),
+            thumbnail=entry.get('thumbnail'),
+            webpage_url=entry.get('webpage_url') or entry.get('url') or '',
+            media_type="video"
+        )
+    
+    def _open_playlist(self, ydl: "yt_dlp.YoutubeDL", url: str) -> Optional[Dict[str, Any]]:
+        """
+        Extract a playlist without processing it, so its entries stay a lazy generator.
+        Follows URL results (e.g. channel -> uploads tab) until a playlist is reached.
+        """
+        info = ydl.extract_info(url, download=False, process=False)
+        for _ in range(5):
+            if not info or info.get('_type') not in ('url', 'url_transparent'):
+                break
+            info = ydl.extract_info(info['url'], download=False, process=False, ie_key=info.get('ie_key'))
+        return info
+    
+    @staticmethod
+    def _slice_entries(entries: Any, start: int, end: Optional[int]) -> Iterator[Dict[str, Any]]:
+        """Lazily take entries [start:end] from a list, generator or paged list"""
+        if isinstance(entries, yt_dlp.utils.PagedList):
+            return iter(entries.getslice(start, end))
+        return itertools.islice(entries or [], start, end)
+    
+    async def extract_playlist_metadata(self, url: str, offset: int = 0,
+                                        limit: int = settings.PLAYLIST_PAGE_SIZE) -> ExtractResponse:
+        """
+        Extract one page of playlist metadata without downloading videos.
+        Only the requested page is fetched from the platform; next_offset is set when more entries follow.
         """
         try:
             ydl_opts = self._get_base_ydl_opts()
             ydl_opts.update({
-                'extract_flat': True,  # Don't download videos, just get metadata
-                'playlistend': 50,     # Limit to first 50 videos for metadata extraction
+                'extract_flat': 'in_playlist',  # Don't resolve entries, just list them
+                'lazy_playlist': True,          # Stop paging once playlistend is reached
+                'playliststart': offset + 1,
+                'playlistend': offset + limit,
             })
             
             def extract_info():
-                with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+                with ydl_pool.acquire("playlist-extract", ydl_opts) as ydl:
                     return ydl.extract_info(url, download=False)
             
-            loop = asyncio.get_event_loop()
-            info = await loop.run_in_executor(None, extract_info)
+            info = await self.executors.run("extract", extract_info)
             
             if not info:
                 return ExtractResponse(status="error", metadata=None, message="Could not extract playlist information"
@@ -653,22 +878,14 @@ class VideoDownloaderService:
                 return ExtractResponse(status="error", metadata=None, message="URL does not appear to be a playlist"
                 )
             
-            entries = []
-            for entry in info.get('entries', [])[:50]:  # Limit entries for response size
-                if entry:
-                    entry_metadata = VideoMetadata(
-                        id=entry.get('id', ''),
-                        title=entry.get('title', 'Unknown'),
-                        description=entry.get('description'),
-                        uploader=entry.get('uploader'),
-                        upload_date=entry.get('upload_date'),
-                        duration=entry.get('duration'),
-                        view_count=entry.get('view_count'),
-                        thumbnail=entry.get('thumbnail'),
-                        webpage_url=entry.get('webpage_url', ''),
-                        media_type="video"
-                    )
-                    entries.append(entry_metadata)
+            entries = [self._playlist_entry_metadata(entry) for entry in info.get('entries') or [] if entry]
+            
+            # Prefer the total reported by the platform; a short page means we reached the end
+            playlist_count = info.get('playlist_count')
+            if playlist_count is None and len(entries) < limit:
+                playlist_count = offset + len(entries)
+            
+            has_more = len(entries) == limit and (playlist_count is None or offset + limit < playlist_count)
             
             playlist_metadata = VideoMetadata(
                 id=info.get('id', ''),
@@ -677,14 +894,16 @@ class VideoDownloaderService:
                 uploader=info.get('uploader'),
                 webpage_url=url,
                 media_type="playlist",
-                playlist_count=len(entries),
+                playlist_count=playlist_count,
                 entries=entries
             )
             
+            total = playlist_count if playlist_count is not None else "unknown"
             return ExtractResponse(
                 status="success",
                 metadata=playlist_metadata,
-                message=f"Playlist metadata extracted: {len(entries)} videos found"
+                message=f"Playlist metadata extracted: videos {offset + 1}-{offset + len(entries)} of {total}",
+                next_offset=offset + limit if has_more else None
             )
             
         except Exception as e:
@@ -692,71 +911,213 @@ class VideoDownloaderService:
             return ExtractResponse(status="error", metadata=None, message=f"Playlist extraction failed: {str(e)}"
             )
     
+    async def stream_playlist_metadata(self, url: str, offset: int = 0,
+                                       limit: Optional[int] = None) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Yield a playlist header, then every entry as soon as yt-dlp yields it, then a summary.
+        Errors are reported as a final 'error' event since the response has already started.
+        """
+        ydl_opts = self._get_base_ydl_opts()
+        ydl_opts['extract_flat'] = 'in_playlist'
+        
+        def produce(emit):
+            with ydl_pool.acquire("playlist-stream", ydl_opts) as ydl:
+                info = self._open_playlist(ydl, url)
+                if not info or 'entries' not in info:
+                    raise ValueError("URL does not appear to be a playlist")
+                
+                emit({
+                    "type": "playlist",
+                    "id": info.get('id', ''),
+                    "title": info.get('title', 'Playlist'),
+                    "uploader": info.get('uploader'),
+                    "playlist_count": info.get('playlist_count'),
+                })
+                
+                count = 0
+                # Source position of the last entry read, unavailable (None) entries included
+                last_index = offset
+                end = offset + limit if limit else None
+                for last_index, entry in enumerate(self._slice_entries(info['entries'], offset, end), start=offset + 1):
+                    if not entry:
+                        continue
+                    count += 1
+                    emit({"type": "entry", "index": last_index,
+                          "entry": self._playlist_entry_metadata(entry).model_dump(mode="json")})
+                
+                # A full window means more entries may follow, resuming right after the last one read
+                emit({"type": "end", "count": count,
+                      "next_offset": last_index if end is not None and last_index == end else None})
+        
+        try:
+            async for event in iterate_in_thread(self.executors.get("extract"), produce, settings.STREAM_BUFFER_CHUNKS):
+                yield event
+        except Exception as e:
+            logger.error(f"Error streaming playlist metadata: {str(e)}")
+            yield {"type": "error", "message": f"Playlist extraction failed: {str(e)}"}
+    
+    def _download_entry(self, profile: str, ydl_opts: Dict[str, Any], url: str) -> str:
+        """
+        Download a single URL and return the final file path (after any merging/post-processing).
+        Raises on failure so callers get a per-URL error.
+        """
+        with ydl_pool.acquire(profile, ydl_opts) as ydl:
+            info = ydl.extract_info(url, download=True)
+        
+        downloads = (info or {}).get('requested_downloads') or []
+        if not downloads or not downloads[-1].get('filepath'):
+            raise yt_dlp.DownloadError(f"No file was downloaded for {url}")
+        return downloads[-1]['filepath']
+    
+    async def _download_entries(self, profile: str, entries: List[Tuple[int, str, Dict[str, Any]]],
+                                parallelism: int,
+                                progress_hook: Optional[Callable[[Dict[str, Any]], None]] = None,
+                                entry_tracker: Optional[JobEntryTracker] = None) -> List[EntryResult]:
+        """
+        Download (index, url, ydl_opts) entries with at most `parallelism` running at once for this request.
+        Each download also waits for a slot from the global scheduler.
+        With an entry tracker, entries completed before a restart are skipped and per-URL state is journaled.
+        Returns one outcome per entry in input order.
+        """
+        semaphore = asyncio.Semaphore(max(1, parallelism))
+        
+        async def download_one(index: int, download_url: str, ydl_opts: Dict[str, Any]) -> EntryResult:
+            # Flat playlist entries may carry extractor hints smuggled into the URL fragment
+            url, _ = yt_dlp.utils.unsmuggle_url(download_url)
+            
+            if entry_tracker is not None:
+                previous = entry_tracker.completed(index)
+                stored = None
+                if previous and previous.file_path:
+                    stored = await self.executors.run("postprocess", file_registry.register, previous.file_path)
+                if stored is not None:
+                    return previous.model_copy(update={'file_size': stored.size, 'file_id': stored.id})
+            
+            hooks = list(ydl_opts.get('progress_hooks', []))
+            if progress_hook:
+                hooks.append(progress_hook)
+            if entry_tracker is not None:
+                hooks.append(lambda d: entry_tracker.progress(index, url, d))
+            ydl_opts = {**ydl_opts, 'progress_hooks': hooks}
+            
+            async with semaphore:
+                result = await download_slot(index, url, download_url, ydl_opts)
+            if entry_tracker is not None:
+                entry_tracker.finished(result)
+            return result
+        
+        async def download_slot(index: int, url: str, download_url: str, ydl_opts: Dict[str, Any]) -> EntryResult:
+            try:
+                async with download_scheduler.slot(url):
+                    if entry_tracker is not None:
+                        entry_tracker.started(index, url)
+                    file_path = await self.executors.run("download", self._download_entry, profile, ydl_opts, download_url)
+            except Exception as e:
+                download_errors.inc(type(e).__name__)
+                logger.error(f"Error downloading {url}: {str(e)}")
+                return EntryResult(index=index, url=url, status="error", error=str(e))
+            
+            # Resolving and stat'ing the path touches the disk, keep it off the event loop
+            stored = await self.executors.run("postprocess", file_registry.register, file_path)
+            if stored is None:
+                return EntryResult(index=index, url=url, status="error", error="Downloaded file is missing")
+            return EntryResult(
+                index=index,
+                url=url,
+                status="ok",
+                file_path=file_path,
+                filename=stored.filename,
+                file_size=stored.size,
+                file_id=stored.id
+            )
+        
+        return list(await asyncio.gather(*(download_one(*entry) for entry in entries)))
+    
+    def _summarize_entries(self, results: List[EntryResult], download_type: str, label: str) -> DownloadResponse:
+        """Build a multi-file DownloadResponse from per-entry outcomes"""
+        succeeded = [result for result in results if result.status == "ok"]
+        success_count = len(succeeded)
+        error_count = len(results) - success_count
+        
+        return DownloadResponse(
+            status="success",
+            file_path=None,
+            filename=None,
+            file_size=None,
+            message=f"{label} download completed: {success_count} successful, {error_count} failed",
+            download_type=download_type,
+            files_downloaded=[result.file_path for result in succeeded],
+            file_ids=[result.file_id for result in succeeded],
+            total_files=len(results),
+            success_count=success_count,
+            error_count=error_count,
+            results=results
+        )
+    
     async def download_playlist(self, url: str, max_downloads: Optional[int] = None, 
                               start_index: int = 1, end_index: Optional[int] = None,
-                              audio_only: bool = False) -> DownloadResponse:
+                              audio_only: bool = False,
+                              progress_hook: Optional[Callable[[Dict[str, Any]], None]] = None,
+                              parallelism: Optional[int] = None,
+                              entry_tracker: Optional[JobEntryTracker] = None) -> DownloadResponse:
         """
-        Download videos from a playlist
+        Download videos from a playlist.
+        The entry list is flat-extracted first, then entries are downloaded in parallel with per-entry outcomes.
         """
         try:
             # Create playlist directory
             playlist_dir = self.download_dir / "playlists"
-            playlist_dir.mkdir(parents=True, exist_ok=True)
-            
-            ydl_opts = self._get_base_ydl_opts()
-            ydl_opts.update({
-                'outtmpl': str(playlist_dir / '%(playlist_index)02d - %(title)s [%(id)s].%(ext)s'),
-                'playliststart': start_index,
-            })
+            await self.executors.run("postprocess", playlist_dir.mkdir, parents=True, exist_ok=True)
             
             if end_index:
-                ydl_opts['playlistend'] = end_index
+                end = end_index
             elif max_downloads:
-                ydl_opts['playlistend'] = start_index + max_downloads - 1
-            
+                end = start_index + max_downloads - 1
+            else:
+                end = None
+            
+            list_opts = self._get_base_ydl_opts()
+            list_opts['extract_flat'] = 'in_playlist'
+            
+            def list_entries():
+                with ydl_pool.acquire("playlist-stream", list_opts) as ydl:
+                    info = self._open_playlist(ydl, url)
+                    if not info or 'entries' not in info:
+                        raise ValueError("URL does not appear to be a playlist")
+                    return [
+                        (index, entry.get('webpage_url') or entry.get('url'))
+                        for index, entry in enumerate(self._slice_entries(info['entries'], start_index - 1, end), start=start_index)
+                        if entry and (entry.get('webpage_url') or entry.get('url'))
+                    ]
+            
+            playlist_entries = await self.executors.run("extract", list_entries)
+            
+            ydl_opts = self._get_download_ydl_opts()
+            outtmpl_dir = playlist_dir
             if audio_only:
                 ydl_opts.update({
                     'format': 'bestaudio/best',
                     'extractaudio': True,
                     'audioformat': 'mp3',
-                    'outtmpl': str(playlist_dir / 'audio/%(playlist_index)02d - %(title)s [%(id)s].%(ext)s'),
                 })
+                outtmpl_dir = playlist_dir / 'audio'
             
-            downloaded_files = []
-            success_count = 0
-            error_count = 0
-            
-            def download_hook(d):
-                if d['status'] == 'finished':
-                    downloaded_files.append(d['filename'])
-                    nonlocal success_count
-                    success_count += 1
-                elif d['status'] == 'error':
-                    nonlocal error_count
-                    error_count += 1
-            
-            ydl_opts['progress_hooks'] = [download_hook]
-            
-            def download_playlist():
-                with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                    ydl.download([url])
-            
-            loop = asyncio.get_event_loop()
-            await loop.run_in_executor(None, download_playlist)
+            entries = [
+                (index, entry_url, {**ydl_opts, 'outtmpl': str(outtmpl_dir / f'{index:02d} - %(title)s [%(id)s].%(ext)s')})
+                for index, entry_url in playlist_entries
+            ]
             
-            return DownloadResponse(
-                status="success",
-                file_path=None,
-                filename=None,
-                file_size=None,
-                message=f"Playlist download completed: {success_count} successful, {error_count} failed",
-                download_type="playlist",
-                files_downloaded=downloaded_files,
-                total_files=success_count + error_count,
-                success_count=success_count,
-                error_count=error_count
+            results = await self._download_entries(
+                "audio" if audio_only else "playlist",
+                entries,
+                parallelism or settings.PLAYLIST_PARALLELISM,
+                progress_hook,
+                entry_tracker
             )
             
+            await self._enforce_storage([result.file_id for result in results if result.file_id])
+            return self._summarize_entries(results, "playlist", "Playlist")
+            
         except Exception as e:
             logger.error(f"Error downloading playlist: {str(e)}")
             return DownloadResponse(
@@ -773,78 +1134,37 @@ class VideoDownloaderService:
             )
     
     async def batch_download(self, urls: List[str], format_preference: str = "best",
-                           audio_only: bool = False, max_concurrent: int = 3) -> DownloadResponse:
+                           audio_only: bool = False, max_concurrent: int = 3,
+                           progress_hook: Optional[Callable[[Dict[str, Any]], None]] = None,
+                           entry_tracker: Optional[JobEntryTracker] = None) -> DownloadResponse:
         """
         Download multiple videos concurrently
         """
         try:
             # Create batch directory
             batch_dir = self.download_dir / "batch"
-            batch_dir.mkdir(parents=True, exist_ok=True)
+            await self.executors.run("postprocess", batch_dir.mkdir, parents=True, exist_ok=True)
             
-            downloaded_files = []
-            success_count = 0
-            error_count = 0
+            ydl_opts = self._get_download_ydl_opts()
+            ydl_opts.update({
+                'format': format_preference,
+                'outtmpl': str(batch_dir / '%(title)s [%(id)s].%(ext)s'),
+            })
             
-            semaphore = asyncio.Semaphore(max_concurrent)
+            if audio_only:
+                ydl_opts.update({
+                    'format': 'bestaudio/best',
+                    'extractaudio': True,
+                    'audioformat': 'mp3',
+                    'outtmpl': str(batch_dir / 'audio/%(title)s [%(id)s].%(ext)s'),
+                })
             
-            async def download_single(url: str) -> bool:
-                async with semaphore:
-                    try:
-                        ydl_opts = self._get_base_ydl_opts()
-                        ydl_opts.update({
-                            'format': format_preference,
-                            'outtmpl': str(batch_dir / '%(title)s [%(id)s].%(ext)s'),
-                        })
-                        
-                        if audio_only:
-                            ydl_opts.update({
-                                'format': 'bestaudio/best',
-                                'extractaudio': True,
-                                'audioformat': 'mp3',
-                                'outtmpl': str(batch_dir / 'audio/%(title)s [%(id)s].%(ext)s'),
-                            })
-                        
-                        def download_single_hook(d):
-                            if d['status'] == 'finished':
-                                downloaded_files.append(d['filename'])
-                        
-                        ydl_opts['progress_hooks'] = [download_single_hook]
-                        
-                        def download_video():
-                            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                                ydl.download([url])
-                        
-                        loop = asyncio.get_event_loop()
-                        await loop.run_in_executor(None, download_video)
-                        return True
-                        
-                    except Exception as e:
-                        logger.error(f"Error downloading {url}: {str(e)}")
-                        return False
-            
-            # Process all URLs concurrently
-            tasks = [download_single(url) for url in urls]
-            results = await asyncio.gather(*tasks, return_exceptions=True)
-            
-            for result in results:
-                if result is True:
-                    success_count += 1
-                else:
-                    error_count += 1
+            entries = [(index, url, ydl_opts) for index, url in enumerate(urls, start=1)]
+            parallelism = min(max_concurrent, settings.DOWNLOAD_MAX_PER_REQUEST)
+            results = await self._download_entries("batch", entries, parallelism, progress_hook, entry_tracker)
             
-            return DownloadResponse(
-                status="success",
-                file_path=None,
-                filename=None,
-                file_size=None,
-                message=f"Batch download completed: {success_count} successful, {error_count} failed",
-                download_type="batch",
-                files_downloaded=downloaded_files,
-                total_files=len(urls),
-                success_count=success_count,
-                error_count=error_count
-            )
+            await self._enforce_storage([result.file_id for result in results if result.file_id])
+            return self._summarize_entries(results, "batch", "Batch")
             
         except Exception as e:
             logger.error(f"Error in batch download: {str(e)}")
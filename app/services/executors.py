@@ -0,0 +1,130 @@
+"""
+Named executors for blocking work, sized independently so long downloads
+cannot starve metadata extraction
+"""
+
+import asyncio
+import functools
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, ProcessPoolExecutor
+from typing import Dict, Any, Callable, Optional, Tuple
+
+from config import settings
+from app.services.metrics import executor_queue_wait, executor_run_time
+
+logger = logging.getLogger(__name__)
+
+def _timed_call(submitted: float, func: Callable, *args) -> Tuple[float, Any]:
+    """Run func in a worker process and report how long it waited to start (wall clock, shared across processes)"""
+    wait = time.time() - submitted
+    return wait, func(*args)
+
+class InstrumentedThreadPool(ThreadPoolExecutor):
+    """
+    Thread pool that records how long each task queued for a worker and how long it ran,
+    and counts running tasks. Covers every run_in_executor call made on the pool.
+    """
+
+    def __init__(self, name: str, max_workers: int):
+        super().__init__(max_workers=max_workers, thread_name_prefix=f"grabit-{name}")
+        self.name = name
+        self.active = 0
+        self._active_lock = threading.Lock()
+
+    def submit(self, fn: Callable, /, *args, **kwargs) -> Future:
+        submitted = time.perf_counter()
+
+        def timed():
+            started = time.perf_counter()
+            executor_queue_wait.observe(started - submitted, self.name)
+            with self._active_lock:
+                self.active += 1
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                with self._active_lock:
+                    self.active -= 1
+                executor_run_time.observe(time.perf_counter() - started, self.name)
+
+        return super().submit(timed)
+
+class ExecutorPools:
+    """Lazily created thread pools keyed by workload, plus an optional process pool"""
+
+    def __init__(self, sizes: Optional[Dict[str, int]] = None):
+        self.sizes = sizes or {
+            "extract": settings.EXTRACT_WORKERS,
+            "download": settings.DOWNLOAD_WORKERS,
+            "postprocess": settings.POSTPROCESS_WORKERS,
+            "serve": settings.SERVE_WORKERS,
+        }
+        self._executors: Dict[str, InstrumentedThreadPool] = {}
+        self._process_pool: Optional[ProcessPoolExecutor] = None
+
+    @property
+    def process_mode(self) -> bool:
+        """Whether CPU-heavy extraction should run in worker processes"""
+        return settings.EXECUTOR_BACKEND == "process"
+
+    def get(self, name: str) -> InstrumentedThreadPool:
+        """Return the thread pool for a workload, creating it on first use"""
+        executor = self._executors.get(name)
+        if executor is None:
+            if name not in self.sizes:
+                raise ValueError(f"Unknown executor: {name}")
+            executor = InstrumentedThreadPool(name, self.sizes[name])
+            self._executors[name] = executor
+            logger.info(f"Started '{name}' executor with {self.sizes[name]} threads")
+        return executor
+
+    def get_process_pool(self) -> ProcessPoolExecutor:
+        """Return the process pool, spawned (not forked) so workers never inherit lock state"""
+        if self._process_pool is None:
+            workers = settings.PROCESS_POOL_WORKERS or os.cpu_count() or 1
+            self._process_pool = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+            logger.info(f"Started process pool with {workers} workers")
+        return self._process_pool
+
+    async def run(self, name: str, func: Callable, *args, **kwargs) -> Any:
+        """Run a blocking callable on the named thread pool"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.get(name), functools.partial(func, *args, **kwargs))
+
+    async def run_in_process(self, func: Callable, *args) -> Any:
+        """Run a picklable module-level function in the process pool"""
+        loop = asyncio.get_running_loop()
+        wait, result = await loop.run_in_executor(self.get_process_pool(), _timed_call, time.time(), func, *args)
+        executor_queue_wait.observe(max(0.0, wait), "process")
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        stats = {}
+        for name, size in self.sizes.items():
+            executor = self._executors.get(name)
+            stats[name] = {
+                "max_workers": size,
+                "threads": len(executor._threads) if executor else 0,
+                "active": executor.active if executor else 0,
+                "queued": executor._work_queue.qsize() if executor else 0,
+            }
+        stats["backend"] = settings.EXECUTOR_BACKEND
+        return stats
+
+    def shutdown(self) -> None:
+        """Stop all pools without waiting for running work"""
+        for executor in self._executors.values():
+            executor.shutdown(wait=False, cancel_futures=True)
+        self._executors.clear()
+        if self._process_pool is not None:
+            self._process_pool.shutdown(wait=False, cancel_futures=True)
+            self._process_pool = None
+
+# Global executor pools instance
+executor_pools = ExecutorPools()
@@ -0,0 +1,95 @@
+"""
+Registry of files produced by the downloader service, addressed by opaque IDs
+"""
+
+import logging
+import os
+import secrets
+import threading
+import time
+from typing import Dict, Optional, List
+
+logger = logging.getLogger(__name__)
+
+class StoredFile:
+    """A downloaded file that can be served to clients"""
+
+    __slots__ = ('id', 'path', 'size', 'mtime_ns', 'created_at', 'last_access')
+
+    def __init__(self, file_id: str, path: str, size: int, mtime_ns: int,
+                 last_access: Optional[float] = None):
+        self.id = file_id
+        self.path = path
+        self.size = size
+        self.mtime_ns = mtime_ns
+        self.created_at = time.time()
+        self.last_access = last_access or self.created_at
+
+    @property
+    def etag(self) -> str:
+        """Strong validator derived from size and modification time"""
+        return f'"{self.size:x}-{self.mtime_ns:x}"'
+
+    @property
+    def filename(self) -> str:
+        return os.path.basename(self.path)
+
+class FileRegistry:
+    """
+    Maps random file IDs to paths under DOWNLOAD_DIR so clients never see or guess raw paths.
+    Registering the same path twice returns the existing ID.
+    """
+
+    def __init__(self):
+        self._files: Dict[str, StoredFile] = {}
+        self._ids_by_path: Dict[str, str] = {}
+        # Registration also happens from worker threads (startup scan, eviction)
+        self._lock = threading.Lock()
+
+    def register(self, path: str, last_access: Optional[float] = None) -> Optional[StoredFile]:
+        """Record a file on disk and return its entry, or None if the file is missing"""
+        real_path = os.path.realpath(path)
+        try:
+            stat = os.stat(real_path)
+        except OSError:
+            logger.warning(f"Cannot register missing file: {path}")
+            return None
+
+        with self._lock:
+            file_id = self._ids_by_path.get(real_path)
+            if file_id is None:
+                file_id = secrets.token_urlsafe(16)
+                self._ids_by_path[real_path] = file_id
+
+            entry = StoredFile(file_id, real_path, stat.st_size, stat.st_mtime_ns, last_access)
+            self._files[file_id] = entry
+        return entry
+
+    def register_many(self, paths: List[str]) -> List[StoredFile]:
+        entries = [self.register(path) for path in paths]
+        return [entry for entry in entries if entry is not None]
+
+    def get(self, file_id: str) -> Optional[StoredFile]:
+        return self._files.get(file_id)
+
+    def entries(self) -> List[StoredFile]:
+        with self._lock:
+            return list(self._files.values())
+
+    def touch(self, file_id: str) -> None:
+        entry = self._files.get(file_id)
+        if entry is not None:
+            entry.last_access = time.time()
+
+    def remove(self, file_id: str) -> Optional[StoredFile]:
+        with self._lock:
+            entry = self._files.pop(file_id, None)
+            if entry is not None:
+                self._ids_by_path.pop(entry.path, None)
+        return entry
+
+    def __len__(self) -> int:
+        return len(self._files)
+
+# Global registry instance
+file_registry = FileRegistry()
@@ -0,0 +1,257 @@
+"""
+Format classification, bulk format model building and server-side format selection
+"""
+
+import shutil
+from functools import cached_property, lru_cache
+from types import MappingProxyType
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+from pydantic import TypeAdapter
+
+from app.models import FormatPreferences, VideoFormat
+
+# Codec families as named in preferences, matched against yt-dlp vcodec prefixes
+CODEC_FAMILIES = {
+    'av1': ('av01', 'av1'),
+    'vp9': ('vp09', 'vp9'),
+    'h264': ('avc1', 'avc3', 'h264'),
+    'h265': ('hvc1', 'hev1', 'h265', 'hevc'),
+}
+
+# Stream extensions that can go into each container without re-encoding
+# (video extensions, audio extensions); None accepts anything
+CONTAINER_EXTS = {
+    'mp4': ({'mp4'}, {'m4a', 'mp4'}),
+    'webm': ({'webm'}, {'webm'}),
+    'mkv': (None, None),
+}
+
+AUDIO_EXTS = ('m4a', 'mp3', 'aac', 'opus', 'ogg', 'oga', 'wav', 'flac')
+
+# Protocols whose bytes are the file itself; manifests come after them in ranking
+DIRECT_PROTOCOLS = ('http', 'https')
+
+def codec_family(vcodec: Optional[str]) -> Optional[str]:
+    """Preference name of a yt-dlp vcodec string (e.g. 'avc1.64001F' -> 'h264')"""
+    if not vcodec or vcodec == 'none':
+        return None
+    vcodec = vcodec.lower()
+    for family, prefixes in CODEC_FAMILIES.items():
+        if vcodec.startswith(prefixes):
+            return family
+    return None
+
+def estimate_size(fmt: Dict[str, Any], duration: Optional[float]) -> Optional[float]:
+    """Size in bytes from the reported size, or from the bitrate (kbit/s) and duration"""
+    size = fmt.get('filesize') or fmt.get('filesize_approx')
+    if size:
+        return float(size)
+    bitrate = fmt.get('tbr') or ((fmt.get('vbr') or 0) + (fmt.get('abr') or 0))
+    if bitrate and duration:
+        return bitrate * 125 * duration
+    return None
+
+# Display names for codec strings, first substring match wins
+VIDEO_CODEC_NAMES = (('av01', 'AV1'), ('vp9', 'VP9'), ('h264', 'H.264'), ('avc1', 'H.264'),
+                     ('h265', 'H.265'), ('hevc', 'H.265'))
+AUDIO_CODEC_NAMES = (('opus', 'Opus'), ('aac', 'AAC'), ('mp3', 'MP3'), ('vorbis', 'Vorbis'))
+
+# (has video, has audio) -> format type and its frontend indicator
+FORMAT_TYPES = {
+    (True, True): ("combined", "🎬"),
+    (True, False): ("video-only", "📹"),
+    (False, True): ("audio-only", "🎵"),
+    (False, False): ("unknown", "❓"),
+}
+
+# Quality category thresholds, highest first: minimum height / minimum audio bitrate
+HEIGHT_CATEGORIES = ((1080, "best"), (720, "high"), (480, "medium"), (1, "low"))
+ABR_CATEGORIES = ((256, "best"), (192, "high"), (128, "medium"), (0, "low"))
+
+_formats_adapter = TypeAdapter(List[VideoFormat])
+
+def _codec_name(codec: str, names: Tuple[Tuple[str, str], ...], fallback_length: int) -> str:
+    for needle, name in names:
+        if needle in codec:
+            return name
+    return codec.upper()[:fallback_length]
+
+@lru_cache(maxsize=4096)
+def _classify(vcodec: Optional[str], acodec: Optional[str], height: int, abr: float) -> Mapping[str, str]:
+    has_video = bool(vcodec) and vcodec != 'none'
+    has_audio = bool(acodec) and acodec != 'none'
+    format_type, visual_indicator = FORMAT_TYPES[has_video, has_audio]
+
+    thresholds, value = (HEIGHT_CATEGORIES, height) if height > 0 else (ABR_CATEGORIES, abr)
+    if height > 0 or format_type == "audio-only":
+        format_category = next(name for minimum, name in thresholds if value >= minimum)
+    else:
+        format_category = "unknown"
+
+    codec_parts = []
+    if has_video:
+        codec_parts.append(_codec_name(vcodec, VIDEO_CODEC_NAMES, 8))
+    if has_audio:
+        codec_parts.append(_codec_name(acodec, AUDIO_CODEC_NAMES, 6))
+    return MappingProxyType({
+        "format_type": format_type,
+        "format_category": format_category,
+        "visual_indicator": visual_indicator,
+        "codec_info": " + ".join(codec_parts) or "Unknown",
+    })
+
+def classify_format(fmt: Dict[str, Any]) -> Mapping[str, str]:
+    """
+    Format type, quality category, frontend indicator and codec description of a yt-dlp format.
+    Memoized on (vcodec, acodec, height, abr); abr only matters without a height, so it is
+    left out of the key otherwise to keep the cache small. The result is shared and read-only.
+    """
+    height = fmt.get('height') or 0
+    abr = 0 if height else (fmt.get('abr') or 0)
+    return _classify(fmt.get('vcodec'), fmt.get('acodec'), height, abr)
+
+def build_formats(formats: List[Dict[str, Any]]) -> List[VideoFormat]:
+    """
+    Classified VideoFormat models for a yt-dlp format list, validated in one pass.
+    The format dicts go in whole: the model ignores unknown keys, so validation reads
+    only the fields it needs instead of copying them out one by one first.
+    """
+    return _formats_adapter.validate_python([
+        {'format_id': '', 'ext': 'unknown', **fmt, **classify_format(fmt)}
+        for fmt in formats
+    ])
+
+class FormatChoice:
+    """A resolved selection: the yt-dlp format string and what it will produce"""
+
+    __slots__ = ('format', 'height', 'codec', 'estimated_size', 'merge_output_format')
+
+    def __init__(self, format: str, height: Optional[int], codec: Optional[str],
+                 estimated_size: Optional[float], merge_output_format: Optional[str] = None):
+        self.format = format
+        self.height = height
+        self.codec = codec
+        self.estimated_size = estimated_size
+        self.merge_output_format = merge_output_format
+
+class FormatSelector:
+    """
+    Resolves FormatPreferences against an info dict's format list.
+    Every combined format and every video-only + audio pairing that satisfies the
+    constraints is a candidate; the highest resolution up to max_height wins, then codec
+    preference, then a single download over a merge or manifest, then the smallest size.
+    The size estimate only filters against max_filesize and breaks the final tie.
+    Pairings are only considered when ffmpeg is available to merge them.
+    """
+
+    @cached_property
+    def can_merge(self) -> bool:
+        return shutil.which('ffmpeg') is not None
+
+    def select(self, info: Dict[str, Any], preferences: FormatPreferences) -> Optional[FormatChoice]:
+        """Best candidate for the preferences, or None when nothing satisfies them"""
+        formats = [f for f in info.get('formats') or [] if f.get('format_id')]
+        if not formats and info.get('format_id'):
+            formats = [info]
+        duration = info.get('duration')
+        video_exts, audio_exts = CONTAINER_EXTS.get(preferences.container, (None, None))
+
+        videos, audios = [], []
+        for fmt in formats:
+            has_video, has_audio = self._streams(fmt)
+            if fmt.get('ext') == 'mhtml' or fmt.get('protocol') == 'mhtml':
+                continue  # storyboards
+            if has_video and self._video_acceptable(fmt, preferences, video_exts):
+                videos.append((fmt, has_audio))
+            elif has_audio and not has_video and (audio_exts is None or fmt.get('ext') in audio_exts):
+                audios.append(fmt)
+
+        candidates: List[Tuple[tuple, FormatChoice]] = []
+        for fmt, has_audio in videos:
+            if has_audio:
+                if preferences.mode == 'merge':
+                    continue
+                choice = self._combined(fmt, duration, preferences)
+            else:
+                if preferences.mode == 'combined' or not self.can_merge:
+                    continue
+                choice = self._merged(fmt, audios, duration, preferences)
+            if choice is not None:
+                candidates.append((self._rank(fmt, choice, preferences), choice))
+
+        if not candidates:
+            return None
+        return max(candidates, key=lambda candidate: candidate[0])[1]
+
+    @staticmethod
+    def _streams(fmt: Dict[str, Any]) -> Tuple[bool, bool]:
+        """Whether a format carries video and audio; unknown codecs count as present, like yt-dlp does"""
+        vcodec, acodec = fmt.get('vcodec'), fmt.get('acodec')
+        if vcodec is None and acodec is None and fmt.get('ext') in AUDIO_EXTS:
+            return False, True
+        return vcodec != 'none', acodec != 'none'
+
+    @staticmethod
+    def _video_acceptable(fmt: Dict[str, Any], preferences: FormatPreferences, video_exts) -> bool:
+        height = fmt.get('height')
+        if preferences.max_height and height and height > preferences.max_height:
+            return False
+        if preferences.codecs and codec_family(fmt.get('vcodec')) not in preferences.codecs:
+            return False
+        if video_exts is not None and fmt.get('ext') not in video_exts:
+            return False
+        return True
+
+    @staticmethod
+    def _within_budget(size: Optional[float], preferences: FormatPreferences) -> bool:
+        # Unknown sizes are let through; MAX_FILESIZE still guards the transfer itself
+        return not preferences.max_filesize or size is None or size <= preferences.max_filesize
+
+    def _combined(self, fmt: Dict[str, Any], duration: Optional[float],
+                  preferences: FormatPreferences) -> Optional[FormatChoice]:
+        size = estimate_size(fmt, duration)
+        if not self._within_budget(size, preferences):
+            return None
+        return FormatChoice(fmt['format_id'], fmt.get('height'), codec_family(fmt.get('vcodec')), size)
+
+    def _merged(self, video: Dict[str, Any], audios: List[Dict[str, Any]], duration: Optional[float],
+                preferences: FormatPreferences) -> Optional[FormatChoice]:
+        """Pair a video-only format with the best audio that keeps the total within budget, smaller first among equals"""
+        video_size = estimate_size(video, duration)
+        if not self._within_budget(video_size, preferences):
+            return None
+        sized = [(audio, estimate_size(audio, duration)) for audio in audios]
+        sized.sort(key=lambda pair: (-(pair[0].get('abr') or pair[0].get('tbr') or 0), self._size_key(pair[1])))
+        for audio, audio_size in sized:
+            total = video_size + audio_size if video_size is not None and audio_size is not None else None
+            if self._within_budget(total, preferences):
+                return FormatChoice(
+                    f"{video['format_id']}+{audio['format_id']}", video.get('height'),
+                    codec_family(video.get('vcodec')), total,
+                    merge_output_format=preferences.container,
+                )
+        return None
+
+    @staticmethod
+    def _size_key(size: Optional[float]) -> float:
+        # Unknown sizes sort after every known one
+        return size if size is not None else float('inf')
+
+    def _rank(self, fmt: Dict[str, Any], choice: FormatChoice, preferences: FormatPreferences) -> tuple:
+        """Sort key for candidates, larger is better"""
+        height = choice.height or 0
+        if preferences.max_height:
+            height = min(height, preferences.max_height)
+        codecs = preferences.codecs or []
+        codec_rank = -codecs.index(choice.codec) if choice.codec in codecs else -len(codecs)
+        return (
+            height,
+            codec_rank,
+            '+' not in choice.format,
+            fmt.get('protocol', 'https') in DIRECT_PROTOCOLS,
+            -self._size_key(choice.estimated_size),
+        )
+
+# Global format selector instance
+format_selector = FormatSelector()
@@ -0,0 +1,76 @@
+"""
+Shared async HTTP client for every non-yt-dlp request the service makes
+"""
+
+import asyncio
+import importlib.util
+import logging
+from typing import Dict, Any, Optional
+
+import httpx
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+}
+
+class HTTPClientManager:
+    """
+    Owns one httpx.AsyncClient with keep-alive connection pools per host.
+    Started and closed by the application lifespan; created lazily when used without it.
+    """
+
+    def __init__(self):
+        self._client: Optional[httpx.AsyncClient] = None
+        self.http2 = settings.HTTP2_ENABLED and importlib.util.find_spec("h2") is not None
+        # Relays hold a pooled connection until the client has read the whole body. Queuing for
+        # one here rather than in the pool, which rescans its queue on every release, keeps
+        # hundreds of waiting relays from blocking the event loop.
+        self.stream_slots = asyncio.Semaphore(settings.HTTP_MAX_CONNECTIONS)
+
+    def _create(self) -> httpx.AsyncClient:
+        limits = httpx.Limits(
+            max_connections=settings.HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE,
+            keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY,
+        )
+        timeout = httpx.Timeout(settings.HTTP_TIMEOUT, connect=settings.HTTP_CONNECT_TIMEOUT)
+        logger.info(f"HTTP client started (http2: {self.http2}, max connections: {settings.HTTP_MAX_CONNECTIONS})")
+        return httpx.AsyncClient(
+            http2=self.http2,
+            limits=limits,
+            timeout=timeout,
+            headers=DEFAULT_HEADERS,
+            follow_redirects=True,
+        )
+
+    async def start(self) -> None:
+        if self._client is None:
+            self._client = self._create()
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = self._create()
+        return self._client
+
+    async def close(self) -> None:
+        """Close pooled connections"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def stats(self) -> Dict[str, Any]:
+        stats: Dict[str, Any] = {"http2": self.http2, "started": self._client is not None}
+        pool = getattr(getattr(self._client, "_transport", None), "_pool", None)
+        if pool is not None:
+            connections = list(getattr(pool, "connections", []))
+            stats["connections"] = len(connections)
+            stats["idle_connections"] = sum(1 for connection in connections if connection.is_idle())
+        return stats
+
+# Global client instance
+http_client = HTTPClientManager()
@@ -0,0 +1,160 @@
+"""
+Parallel image download pipeline with original-size URL upgrades and hash dedupe
+"""
+
+import asyncio
+import hashlib
+import logging
+import mimetypes
+import os
+from pathlib import Path
+from typing import List, Optional, Tuple
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+import aiofiles
+
+from config import settings
+from app.services.executors import ExecutorPools
+from app.services.http_client import http_client
+from app.services.media_index import media_index
+from app.services.scheduler import download_scheduler
+from app.services import storage
+from app.services.storage import storage_manager
+from app.services.metrics import downloaded_bytes, url_host
+
+logger = logging.getLogger(__name__)
+
+IMAGE_SIZE_SUFFIXES = (':thumb', ':small', ':medium', ':large', ':orig')
+# pbs.twimg.com paths that accept the name= size parameter
+RESIZABLE_IMAGE_PATHS = ('/media/', '/ext_tw_video_thumb/', '/amplify_video_thumb/', '/tweet_video_thumb/')
+
+def original_image_url(url: str) -> str:
+    """
+    Rewrite a pbs.twimg.com media URL to its original-size variant, so every
+    size of the same image collapses onto one URL:
+    /media/X.jpg:large and /media/X?format=jpg&name=small -> /media/X?format=jpg&name=orig
+    """
+    parts = urlsplit(url)
+    if parts.hostname != 'pbs.twimg.com' or not parts.path.startswith(RESIZABLE_IMAGE_PATHS):
+        return url
+
+    path = parts.path
+    for suffix in IMAGE_SIZE_SUFFIXES:
+        if path.endswith(suffix):
+            path = path[:-len(suffix)]
+            break
+
+    query = dict(parse_qsl(parts.query))
+    stem, ext = os.path.splitext(path)
+    if ext:
+        path = stem
+        query.setdefault('format', ext.lstrip('.'))
+    query['name'] = 'orig'
+    return urlunsplit(('https', parts.netloc, path, urlencode(query), ''))
+
+class ImageResult:
+    """Outcome of one image fetch"""
+
+    __slots__ = ('url', 'path', 'size', 'reused', 'error')
+
+    def __init__(self, url: str, path: Optional[str] = None, size: int = 0,
+                 reused: bool = False, error: Optional[str] = None):
+        self.url = url
+        self.path = path
+        self.size = size
+        self.reused = reused
+        self.error = error
+
+class ImageDownloader:
+    """
+    Fetches a list of image URLs concurrently over the shared HTTP client.
+    Each image is streamed to disk while being hashed; URLs fetched before and
+    images whose content is already stored are not written twice.
+    """
+
+    def __init__(self, concurrency: int = settings.IMAGE_DOWNLOAD_CONCURRENCY):
+        self.concurrency = max(1, concurrency)
+
+    async def download(self, urls: List[str], dest_dir: Path, executors: ExecutorPools) -> List[ImageResult]:
+        """
+        Download images into dest_dir, returning one result per unique original-size URL in order.
+        File writes run on the "download" pool, index lookups and renames on "postprocess".
+        """
+        unique_urls = list(dict.fromkeys(original_image_url(url) for url in urls))
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def fetch(index: int, url: str) -> ImageResult:
+            async with semaphore:
+                try:
+                    return await self._fetch(index, url, dest_dir, executors)
+                except Exception as e:
+                    logger.warning(f"Image download failed for {url}: {e}")
+                    return ImageResult(url, error=str(e))
+
+        return list(await asyncio.gather(*(fetch(i, url) for i, url in enumerate(unique_urls, start=1))))
+
+    @staticmethod
+    def _find_stored(url_hash: str) -> Optional[Tuple[str, int]]:
+        """(path, size) of an image already fetched from this URL"""
+        existing = media_index.find_image_by_url(url_hash)
+        return (existing, os.path.getsize(existing)) if existing else None
+
+    @staticmethod
+    def _commit(part_path: Path, path: Path, url_hash: str, content_hash: str, size: int) -> Tuple[str, bool]:
+        """Keep a finished download unless its content is already stored, returns (path, reused)"""
+        duplicate = media_index.find_image_by_content(content_hash)
+        if duplicate:
+            part_path.unlink(missing_ok=True)
+            media_index.store_image(url_hash, content_hash, duplicate, size)
+            return duplicate, True
+        os.replace(part_path, path)
+        media_index.store_image(url_hash, content_hash, str(path), size)
+        return str(path), False
+
+    async def _fetch(self, index: int, url: str, dest_dir: Path, executors: ExecutorPools) -> ImageResult:
+        url_hash = hashlib.sha256(url.encode()).hexdigest()
+        existing = await executors.run("postprocess", self._find_stored, url_hash)
+        if existing:
+            return ImageResult(url, *existing, reused=True)
+
+        async with download_scheduler.slot(url):
+            async with http_client.client.stream("GET", url) as response:
+                response.raise_for_status()
+                ext = self._extension(url, response.headers.get('Content-Type'))
+                path = dest_dir / f"{index:02d}_{Path(urlsplit(url).path).stem or url_hash[:16]}{ext}"
+                part_path = path.with_name(path.name + '.part')
+
+                digest = hashlib.sha256()
+                size = 0
+                try:
+                    async with aiofiles.open(part_path, 'wb', executor=executors.get("download")) as f:
+                        async for chunk in response.aiter_bytes(settings.STREAM_CHUNK_SIZE):
+                            size += len(chunk)
+                            if storage_manager.max_filesize and size > storage_manager.max_filesize:
+                                raise storage.FileTooLargeError(f"Image is larger than the {settings.MAX_FILESIZE} limit")
+                            digest.update(chunk)
+                            await f.write(chunk)
+                except BaseException:
+                    await executors.run("postprocess", part_path.unlink, missing_ok=True)
+                    raise
+                finally:
+                    downloaded_bytes.inc(url_host(url), amount=size)
+
+        stored_path, reused = await executors.run(
+            "postprocess", self._commit, part_path, path, url_hash, digest.hexdigest(), size
+        )
+        return ImageResult(url, stored_path, size, reused=reused)
+
+    @staticmethod
+    def _extension(url: str, content_type: Optional[str]) -> str:
+        query = dict(parse_qsl(urlsplit(url).query))
+        if query.get('format'):
+            return f".{query['format']}"
+        ext = os.path.splitext(urlsplit(url).path)[1]
+        if ext:
+            return ext
+        guessed = mimetypes.guess_extension((content_type or '').split(';')[0].strip())
+        return guessed or '.jpg'
+
+# Global image downloader instance
+image_downloader = ImageDownloader()
@@ -0,0 +1,286 @@
+"""
+Background download jobs executed by a bounded worker pool
+"""
+
+import asyncio
+import logging
+import time
+import uuid
+from typing import Dict, Any, Optional, Callable, Awaitable, List
+
+from config import settings
+from app.models import DownloadRequest, PlaylistRequest, BatchDownloadRequest, DownloadResponse, JobStatusResponse
+from app.services.downloader import downloader_service
+from app.services.progress import ProgressChannel
+from app.services.journal import job_journal, JobEntryTracker
+from app.services.metrics import job_duration
+
+logger = logging.getLogger(__name__)
+
+JobRunner = Callable[['DownloadJob'], Awaitable[DownloadResponse]]
+
+class DownloadJob:
+    """A queued download and its live progress"""
+
+    def __init__(self, kind: str, payload: Dict[str, Any], job_id: Optional[str] = None,
+                 created_at: Optional[float] = None):
+        self.id = job_id or uuid.uuid4().hex
+        self.kind = kind
+        self.payload = payload
+        self.state = "queued"
+        self.created_at = created_at or time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.result: Optional[DownloadResponse] = None
+        self.message: Optional[str] = "Waiting for a free download worker"
+        # Per-file progress as reported by yt-dlp, keyed by filename
+        self._files: Dict[str, Dict[str, Any]] = {}
+        self.channel = ProgressChannel(lambda: self.to_response().model_dump(mode="json"))
+
+    def progress_hook(self, d: Dict[str, Any]) -> None:
+        """yt-dlp progress hook, called from the download worker thread"""
+        filename = d.get('filename') or d.get('tmpfilename') or ''
+        downloaded = d.get('downloaded_bytes') or 0
+        total = d.get('total_bytes') or d.get('total_bytes_estimate')
+        if d.get('status') == 'finished':
+            # Files that already exist are reported as finished without byte counts
+            total = total or downloaded
+            downloaded = downloaded or total or 0
+        self._files[filename] = {
+            'status': d.get('status'),
+            'downloaded_bytes': downloaded,
+            'total_bytes': total,
+            'speed': d.get('speed') if d.get('status') == 'downloading' else None,
+            'eta': d.get('eta') if d.get('status') == 'downloading' else None,
+        }
+        self.channel.notify_threadsafe(force=d.get('status') != 'downloading')
+
+    @property
+    def downloaded_bytes(self) -> int:
+        return sum(f['downloaded_bytes'] for f in list(self._files.values()))
+
+    @property
+    def total_bytes(self) -> Optional[int]:
+        files = list(self._files.values())
+        if not files or any(not f['total_bytes'] for f in files):
+            return None
+        return int(sum(f['total_bytes'] for f in files))
+
+    @property
+    def speed(self) -> Optional[float]:
+        speeds = [f['speed'] for f in list(self._files.values()) if f['speed']]
+        return sum(speeds) if speeds else None
+
+    @property
+    def eta(self) -> Optional[int]:
+        etas = [f['eta'] for f in list(self._files.values()) if f['eta'] is not None]
+        return int(max(etas)) if etas else None
+
+    def mark_running(self) -> None:
+        self.state = "running"
+        self.started_at = time.time()
+        self.message = "Download in progress"
+        self.channel.notify()
+
+    def mark_done(self, result: DownloadResponse) -> None:
+        self.result = result
+        self.state = "failed" if result.status == "error" else "finished"
+        self.finished_at = time.time()
+        self.message = result.message
+        self.channel.notify()
+
+    def mark_failed(self, message: str) -> None:
+        self.state = "failed"
+        self.finished_at = time.time()
+        self.message = message
+        self.channel.notify()
+
+    @property
+    def is_done(self) -> bool:
+        return self.state in ("finished", "failed")
+
+    def to_response(self) -> JobStatusResponse:
+        downloaded = self.downloaded_bytes
+        total = self.total_bytes
+        progress = None
+        if self.state == "finished":
+            progress = 100.0
+        elif total:
+            progress = round(min(downloaded / total * 100, 100.0), 1)
+
+        return JobStatusResponse(
+            job_id=self.id,
+            kind=self.kind,
+            state=self.state,
+            created_at=self.created_at,
+            started_at=self.started_at,
+            finished_at=self.finished_at,
+            downloaded_bytes=downloaded,
+            total_bytes=total,
+            progress=progress,
+            speed=self.speed,
+            eta=self.eta,
+            result=self.result,
+            message=self.message
+        )
+
+class JobManager:
+    """Queue of download jobs served by a fixed number of async workers"""
+
+    def __init__(self, max_workers: int = settings.MAX_CONCURRENT_DOWNLOADS):
+        self.max_workers = max(1, max_workers)
+        self._runners: Dict[str, JobRunner] = {}
+        self._jobs: Dict[str, DownloadJob] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+
+    def register(self, kind: str, runner: JobRunner) -> None:
+        """Register the coroutine that executes jobs of the given kind"""
+        self._runners[kind] = runner
+
+    async def start(self) -> None:
+        """Start the worker pool on the running event loop and re-queue journaled work"""
+        if not self._workers:
+            self._start_workers()
+        await self.recover()
+    
+    async def recover(self) -> int:
+        """Re-queue jobs the journal recorded as queued or running when the process stopped"""
+        recovered = 0
+        for record in await job_journal.unfinished_jobs():
+            if record["id"] in self._jobs or record["kind"] not in self._runners:
+                continue
+            payload = record["payload"]
+            # Extraction tokens live in memory only and cannot survive a restart
+            payload.pop("extraction_token", None)
+            job = DownloadJob(record["kind"], payload, job_id=record["id"], created_at=record["created_at"])
+            job.message = "Resumed after restart, waiting for a free download worker"
+            job.channel.bind(asyncio.get_running_loop())
+            self._jobs[job.id] = job
+            self._queue.put_nowait(job)
+            recovered += 1
+        if recovered:
+            logger.info(f"Re-queued {recovered} unfinished job(s) from the journal")
+        return recovered
+
+    async def shutdown(self) -> None:
+        """Stop the worker pool; running jobs stay unfinished in the journal and resume on the next start"""
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._queue = None
+
+    def submit(self, kind: str, payload: Dict[str, Any]) -> DownloadJob:
+        """Queue a job and return it immediately"""
+        if kind not in self._runners:
+            raise ValueError(f"Unknown job kind: {kind}")
+        if not self._workers:
+            # Lazily start when running without the application lifespan
+            self._start_workers()
+
+        self._prune()
+        job = DownloadJob(kind, payload)
+        job.channel.bind(asyncio.get_running_loop())
+        self._jobs[job.id] = job
+        job_journal.record_job(job.id, kind, payload, job.created_at)
+        self._queue.put_nowait(job)
+        logger.info(f"Queued {kind} job {job.id} ({self._queue.qsize()} waiting)")
+        return job
+
+    def _start_workers(self) -> None:
+        self._queue = asyncio.Queue()
+        self._workers = [asyncio.create_task(self._worker(i)) for i in range(self.max_workers)]
+        logger.info(f"Download job workers started: {self.max_workers}")
+
+    def get(self, job_id: str) -> Optional[DownloadJob]:
+        return self._jobs.get(job_id)
+
+    def stats(self) -> Dict[str, Any]:
+        states: Dict[str, int] = {}
+        for job in self._jobs.values():
+            states[job.state] = states.get(job.state, 0) + 1
+        return {"workers": self.max_workers, "jobs": states}
+
+    def _prune(self) -> None:
+        """Forget finished jobs older than the retention period"""
+        cutoff = time.time() - settings.JOB_RETENTION
+        expired = [job_id for job_id, job in self._jobs.items()
+                   if job.is_done and job.finished_at and job.finished_at < cutoff]
+        for job_id in expired:
+            del self._jobs[job_id]
+        job_journal.prune(cutoff)
+
+    async def _worker(self, index: int) -> None:
+        while True:
+            job = await self._queue.get()
+            try:
+                await self._run(job)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job: DownloadJob) -> None:
+        job.mark_running()
+        job_journal.update_job(job.id, job.state)
+        logger.info(f"Running {job.kind} job {job.id}")
+        try:
+            try:
+                result = await self._runners[job.kind](job)
+            except asyncio.CancelledError:
+                # Left as running in the journal so the next startup resumes it
+                job.mark_failed("Job cancelled by server shutdown")
+                raise
+            except Exception as e:
+                logger.error(f"Job {job.id} failed: {str(e)}")
+                job.mark_failed(f"Unexpected error: {str(e)}")
+                job_journal.update_job(job.id, job.state, job.message)
+                return
+            job.mark_done(result)
+            job_journal.update_job(job.id, job.state, job.message, result.model_dump(mode="json"))
+            logger.info(f"Job {job.id} {job.state}")
+        finally:
+            if job.finished_at is not None:
+                job_duration.observe(job.finished_at - job.started_at, job.kind, job.state)
+
+async def _run_video_job(job: DownloadJob) -> DownloadResponse:
+    request = DownloadRequest(**job.payload)
+    return await downloader_service.download_video(
+        str(request.url),
+        request.format_id,
+        audio_only=request.audio_only,
+        audio_format=request.audio_format or "mp3",
+        audio_quality=request.audio_quality or "192",
+        extraction_token=request.extraction_token,
+        progress_hook=job.progress_hook,
+        preferences=request.preferences
+    )
+
+async def _run_playlist_job(job: DownloadJob) -> DownloadResponse:
+    request = PlaylistRequest(**job.payload)
+    return await downloader_service.download_playlist(
+        str(request.url),
+        max_downloads=request.max_downloads,
+        start_index=request.start_index or 1,
+        end_index=request.end_index,
+        audio_only=False,
+        progress_hook=job.progress_hook,
+        parallelism=request.parallelism,
+        entry_tracker=await JobEntryTracker.load(job_journal, job.id)
+    )
+
+async def _run_batch_job(job: DownloadJob) -> DownloadResponse:
+    request = BatchDownloadRequest(**job.payload)
+    return await downloader_service.batch_download(
+        [str(url) for url in request.urls],
+        format_preference=request.format_preference or "best",
+        audio_only=request.audio_only,
+        max_concurrent=request.max_concurrent or 3,
+        progress_hook=job.progress_hook,
+        entry_tracker=await JobEntryTracker.load(job_journal, job.id)
+    )
+
+# Global job manager instance
+job_manager = JobManager()
+job_manager.register("video", _run_video_job)
+job_manager.register("playlist", _run_playlist_job)
+job_manager.register("batch", _run_batch_job)
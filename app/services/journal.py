@@ -0,0 +1,220 @@
+"""
+SQLite journal of download jobs so unfinished work survives a restart
+"""
+
+import asyncio
+import json
+import logging
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Dict, Any, Optional, List, Callable
+
+from config import settings
+from app.models import EntryResult
+from app.services.executors import InstrumentedThreadPool
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    state TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    message TEXT,
+    result TEXT
+);
+CREATE TABLE IF NOT EXISTS items (
+    job_id TEXT NOT NULL REFERENCES jobs(id) ON DELETE CASCADE,
+    idx INTEGER NOT NULL,
+    url TEXT NOT NULL,
+    state TEXT NOT NULL,
+    part_path TEXT,
+    result TEXT,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (job_id, idx)
+);
+CREATE INDEX IF NOT EXISTS jobs_state ON jobs(state);
+"""
+
+# Job states that are re-queued on startup
+UNFINISHED_STATES = ("queued", "running")
+
+class JobJournal:
+    """
+    Durable record of jobs and their per-URL items.
+    All statements run in order on one writer thread: writes are queued without waiting,
+    so they never block the event loop or a download worker, and reads are awaited.
+    """
+
+    def __init__(self, path: Optional[str]):
+        self.path = path
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._writer: Optional[InstrumentedThreadPool] = None
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.path)
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA foreign_keys=ON")
+            conn.executescript(SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def _execute(self, sql: str, params: tuple = ()) -> List[tuple]:
+        with self._lock:
+            try:
+                return self._connection().execute(sql, params).fetchall()
+            except sqlite3.Error as e:
+                logger.error(f"Job journal write failed: {e}")
+                return []
+
+    def _submit(self, func: Callable, *args) -> Future:
+        with self._lock:
+            if self._writer is None:
+                self._writer = InstrumentedThreadPool("journal", 1)
+            return self._writer.submit(func, *args)
+
+    def _write(self, sql: str, params: tuple = ()) -> None:
+        """Queue a statement on the writer thread without waiting for it"""
+        if self.enabled:
+            self._submit(self._execute, sql, params)
+
+    async def _read(self, sql: str, params: tuple = ()) -> List[tuple]:
+        """Run a query on the writer thread, after every write queued before it"""
+        if not self.enabled:
+            return []
+        return await asyncio.wrap_future(self._submit(self._execute, sql, params))
+
+    def record_job(self, job_id: str, kind: str, payload: Dict[str, Any], created_at: float) -> None:
+        self._write(
+            "INSERT OR IGNORE INTO jobs (id, kind, payload, state, created_at, updated_at) VALUES (?, ?, ?, 'queued', ?, ?)",
+            (job_id, kind, json.dumps(payload), created_at, time.time())
+        )
+
+    def update_job(self, job_id: str, state: str, message: Optional[str] = None,
+                   result: Optional[Dict[str, Any]] = None) -> None:
+        self._write(
+            "UPDATE jobs SET state = ?, message = ?, result = ?, updated_at = ? WHERE id = ?",
+            (state, message, json.dumps(result) if result is not None else None, time.time(), job_id)
+        )
+
+    def record_item(self, job_id: str, index: int, url: str, state: str,
+                    part_path: Optional[str] = None, result: Optional[EntryResult] = None) -> None:
+        """Upsert one URL of a job; a known .part path is kept unless a new one is given"""
+        self._write(
+            """INSERT INTO items (job_id, idx, url, state, part_path, result, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?)
+               ON CONFLICT (job_id, idx) DO UPDATE SET
+                   state = excluded.state,
+                   part_path = COALESCE(excluded.part_path, items.part_path),
+                   result = excluded.result,
+                   updated_at = excluded.updated_at""",
+            (job_id, index, url, state, part_path, result.model_dump_json() if result else None, time.time())
+        )
+
+    async def unfinished_jobs(self) -> List[Dict[str, Any]]:
+        """Jobs that were queued or running when the process stopped, oldest first"""
+        rows = await self._read(
+            f"SELECT id, kind, payload, created_at FROM jobs WHERE state IN ({', '.join('?' * len(UNFINISHED_STATES))}) ORDER BY created_at",
+            UNFINISHED_STATES
+        )
+        return [{"id": row[0], "kind": row[1], "payload": json.loads(row[2]), "created_at": row[3]} for row in rows]
+
+    async def items(self, job_id: str) -> List[Dict[str, Any]]:
+        rows = await self._read("SELECT idx, url, state, part_path, result FROM items WHERE job_id = ? ORDER BY idx", (job_id,))
+        return [
+            {
+                "index": row[0],
+                "url": row[1],
+                "state": row[2],
+                "part_path": row[3],
+                "result": EntryResult.model_validate_json(row[4]) if row[4] else None,
+            }
+            for row in rows
+        ]
+
+    def prune(self, older_than: float) -> None:
+        """Drop finished jobs last updated before the given timestamp"""
+        self._write(
+            f"DELETE FROM jobs WHERE state NOT IN ({', '.join('?' * len(UNFINISHED_STATES))}) AND updated_at < ?",
+            (*UNFINISHED_STATES, older_than)
+        )
+
+    def close(self) -> None:
+        """Finish the queued writes and close the database"""
+        with self._lock:
+            writer, self._writer = self._writer, None
+        if writer is not None:
+            writer.shutdown(wait=True)
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+class JobEntryTracker:
+    """
+    Records per-URL progress of a playlist/batch job in the journal and
+    remembers which entries already completed before a restart (create it with load()).
+    """
+
+    def __init__(self, journal: JobJournal, job_id: str):
+        self.journal = journal
+        self.job_id = job_id
+        self._completed: Dict[int, EntryResult] = {}
+        self._part_paths: Dict[int, str] = {}
+
+    @classmethod
+    async def load(cls, journal: JobJournal, job_id: str) -> "JobEntryTracker":
+        """Tracker for a job, with the entries journaled before a restart"""
+        tracker = cls(journal, job_id)
+        for item in await journal.items(job_id):
+            if item["state"] == "ok" and item["result"] is not None:
+                tracker._completed[item["index"]] = item["result"]
+            if item["part_path"]:
+                tracker._part_paths[item["index"]] = item["part_path"]
+        return tracker
+
+    def completed(self, index: int) -> Optional[EntryResult]:
+        """Outcome of an entry that finished before a restart, if any"""
+        return self._completed.get(index)
+
+    def started(self, index: int, url: str) -> None:
+        part_path = self._part_paths.get(index)
+        if part_path:
+            # Checked on the writer thread, stat() is a blocking call
+            self.journal._submit(_log_resume, url, part_path)
+        self.journal.record_item(self.job_id, index, url, "running")
+
+    def progress(self, index: int, url: str, d: Dict[str, Any]) -> None:
+        """yt-dlp progress hook for one entry, records the .part file once it is known"""
+        part_path = d.get('tmpfilename')
+        if d.get('status') == 'downloading' and part_path and self._part_paths.get(index) != part_path:
+            self._part_paths[index] = part_path
+            self.journal.record_item(self.job_id, index, url, "running", part_path=part_path)
+
+    def finished(self, result: EntryResult) -> None:
+        self.journal.record_item(self.job_id, result.index, result.url, result.status, result=result)
+
+def _log_resume(url: str, part_path: str) -> None:
+    if Path(part_path).exists():
+        logger.info(f"Resuming {url} from {Path(part_path).stat().st_size} bytes in {part_path}")
+
+def _journal_path() -> Optional[str]:
+    if not settings.JOB_JOURNAL:
+        return None
+    return str(Path(settings.DOWNLOAD_DIR) / settings.JOB_JOURNAL)
+
+# Global journal instance
+job_journal = JobJournal(_journal_path())
@@ -0,0 +1,39 @@
+"""
+Deferred imports for modules that are too slow to load at startup
+"""
+
+import importlib
+import sys
+from types import ModuleType
+from typing import Any, Optional
+
+class LazyModule:
+    """
+    Stands in for a module and imports it on first attribute access, so
+    `yt_dlp.YoutubeDL` keeps working in code that never pays for the import
+    until it actually uses it. Concurrent first accesses are serialized by
+    the import system's own module lock.
+    """
+
+    def __init__(self, name: str):
+        self._name = name
+        self._module: Optional[ModuleType] = None
+
+    @property
+    def loaded(self) -> bool:
+        return self._module is not None or self._name in sys.modules
+
+    def load(self) -> ModuleType:
+        """Import the module now (no-op once imported)"""
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return self._module
+
+    def __getattr__(self, attr: str) -> Any:
+        return getattr(self.load(), attr)
+
+    def __repr__(self) -> str:
+        return f"<lazy module '{self._name}'{' (loaded)' if self.loaded else ''}>"
+
+# yt-dlp and its extractor registry take longer to import than the rest of the app combined
+yt_dlp = LazyModule("yt_dlp")
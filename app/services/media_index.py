@@ -0,0 +1,152 @@
+"""
+Persistent index of stored media by post ID so repeat downloads skip upstream
+"""
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import List, Optional
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS media (
+    platform TEXT NOT NULL,
+    media_id TEXT NOT NULL,
+    path TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (platform, media_id, path)
+);
+CREATE TABLE IF NOT EXISTS images (
+    url_hash TEXT PRIMARY KEY,
+    content_hash TEXT NOT NULL,
+    path TEXT NOT NULL,
+    size INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS images_content_hash ON images(content_hash);
+"""
+
+class MediaIndex:
+    """
+    Maps (platform, post ID) to the files a download produced, and image URL/content
+    hashes to stored files for dedupe.
+    Lookups only stat the files of that post, so they stay O(files in the post).
+    """
+
+    def __init__(self, path: Optional[str]):
+        self.path = path
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def lookup(self, platform: str, media_id: str) -> Optional[List[str]]:
+        """Stored file paths for a post, or None when unknown or any file has since been removed"""
+        if not self.path:
+            return None
+        with self._lock:
+            try:
+                rows = self._connection().execute(
+                    "SELECT path, size FROM media WHERE platform = ? AND media_id = ? ORDER BY path",
+                    (platform, media_id)
+                ).fetchall()
+            except sqlite3.Error as e:
+                logger.error(f"Media index lookup failed: {e}")
+                return None
+        if not rows:
+            return None
+        for path, size in rows:
+            try:
+                if os.stat(path).st_size != size:
+                    return None
+            except OSError:
+                return None
+        return [path for path, _ in rows]
+
+    def store(self, platform: str, media_id: str, paths: List[str]) -> None:
+        """Replace the manifest of a post"""
+        if not self.path:
+            return
+        now = time.time()
+        rows = []
+        for path in paths:
+            try:
+                rows.append((platform, media_id, path, os.stat(path).st_size, now))
+            except OSError:
+                continue
+        with self._lock:
+            try:
+                conn = self._connection()
+                with conn:
+                    conn.execute("BEGIN")
+                    conn.execute("DELETE FROM media WHERE platform = ? AND media_id = ?", (platform, media_id))
+                    conn.executemany("INSERT INTO media (platform, media_id, path, size, created_at) VALUES (?, ?, ?, ?, ?)", rows)
+            except sqlite3.Error as e:
+                logger.error(f"Media index write failed: {e}")
+
+    def _find_image(self, column: str, value: str) -> Optional[str]:
+        if not self.path:
+            return None
+        with self._lock:
+            try:
+                rows = self._connection().execute(
+                    f"SELECT path, size FROM images WHERE {column} = ?", (value,)
+                ).fetchall()
+            except sqlite3.Error as e:
+                logger.error(f"Media index lookup failed: {e}")
+                return None
+        for path, size in rows:
+            try:
+                if os.stat(path).st_size == size:
+                    return path
+            except OSError:
+                continue
+        return None
+
+    def find_image_by_url(self, url_hash: str) -> Optional[str]:
+        """Stored file for an image URL that was fetched before"""
+        return self._find_image("url_hash", url_hash)
+
+    def find_image_by_content(self, content_hash: str) -> Optional[str]:
+        """Stored file with identical content, if any"""
+        return self._find_image("content_hash", content_hash)
+
+    def store_image(self, url_hash: str, content_hash: str, path: str, size: int) -> None:
+        if not self.path:
+            return
+        with self._lock:
+            try:
+                self._connection().execute(
+                    "INSERT OR REPLACE INTO images (url_hash, content_hash, path, size) VALUES (?, ?, ?, ?)",
+                    (url_hash, content_hash, path, size)
+                )
+            except sqlite3.Error as e:
+                logger.error(f"Media index write failed: {e}")
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+def _index_path() -> Optional[str]:
+    if not settings.MEDIA_INDEX:
+        return None
+    return str(Path(settings.DOWNLOAD_DIR) / settings.MEDIA_INDEX)
+
+# Global media index instance
+media_index = MediaIndex(_index_path())
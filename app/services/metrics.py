@@ -0,0 +1,202 @@
+"""
+In-process metrics rendered in the Prometheus text exposition format
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+# Request latencies range from cached extractions (ms) to long downloads (minutes)
+LATENCY_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0)
+# Executor queue waits and serialization should stay far below a second
+FAST_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+Labels = Tuple[str, ...]
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(names: Iterable[str], values: Iterable[str]) -> str:
+    pairs = ",".join(f'{name}="{_escape(str(value))}"' for name, value in zip(names, values))
+    return f"{{{pairs}}}" if pairs else ""
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+class Counter:
+    """Monotonic counter per label set, safe to increment from worker threads"""
+
+    type = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Labels = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._values: Dict[Labels, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def samples(self) -> Iterator[Tuple[str, str, float]]:
+        with self._lock:
+            values = list(self._values.items())
+        for labels, value in values:
+            yield f"{self.name}_total", _format_labels(self.labelnames, labels), value
+
+class Histogram:
+    """Cumulative histogram per label set with fixed upper bounds"""
+
+    type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Labels = (),
+                 buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [count per bucket (+Inf last), sum]
+        self._values: Dict[Labels, Tuple[List[int], List[float]]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels: str) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._values.get(labels)
+            if series is None:
+                series = self._values[labels] = ([0] * (len(self.buckets) + 1), [0.0])
+            series[0][index] += 1
+            series[1][0] += value
+
+    @contextmanager
+    def time(self, *labels: str) -> Iterator[None]:
+        """Observe the duration of the with block"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, *labels)
+
+    def samples(self) -> Iterator[Tuple[str, str, float]]:
+        with self._lock:
+            values = [(labels, list(counts), total[0]) for labels, (counts, total) in self._values.items()]
+        names = self.labelnames + ("le",)
+        for labels, counts, total in values:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                yield f"{self.name}_bucket", _format_labels(names, labels + (_format_value(bound),)), cumulative
+            yield f"{self.name}_sum", _format_labels(self.labelnames, labels), total
+            yield f"{self.name}_count", _format_labels(self.labelnames, labels), cumulative
+
+class Collector:
+    """Gauge or counter whose values are read from a callback at scrape time"""
+
+    def __init__(self, name: str, documentation: str, type: str, labelnames: Labels,
+                 callback: Callable[[], Iterable[Tuple[Labels, float]]]):
+        self.name = name
+        self.documentation = documentation
+        self.type = type
+        self.labelnames = labelnames
+        self.callback = callback
+
+    def samples(self) -> Iterator[Tuple[str, str, float]]:
+        name = f"{self.name}_total" if self.type == "counter" else self.name
+        for labels, value in self.callback():
+            yield name, _format_labels(self.labelnames, labels), value
+
+class MetricsRegistry:
+    """Owns every metric and renders them together for the /metrics endpoint"""
+
+    def __init__(self):
+        self._metrics: Dict[str, Any] = {}
+
+    def _register(self, metric: Any) -> Any:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric already registered: {metric.name}")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Labels = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Labels = (),
+                  buckets: Tuple[float, ...] = LATENCY_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def collector(self, name: str, documentation: str, type: str, labelnames: Labels,
+                  callback: Callable[[], Iterable[Tuple[Labels, float]]]) -> Collector:
+        """Register a gauge ("gauge") or externally kept counter ("counter") read at scrape time"""
+        return self._register(Collector(name, documentation, type, labelnames, callback))
+
+    def render(self) -> str:
+        lines = []
+        for metric in list(self._metrics.values()):
+            try:
+                samples = list(metric.samples())
+            except Exception as e:
+                lines.append(f"# {metric.name} could not be collected: {_escape(str(e))}")
+                continue
+            # Text format 0.0.4 names counter families after their _total sample
+            family = f"{metric.name}_total" if metric.type == "counter" else metric.name
+            lines.append(f"# HELP {family} {_escape(metric.documentation)}")
+            lines.append(f"# TYPE {family} {metric.type}")
+            lines.extend(f"{name}{labels} {_format_value(value)}" for name, labels, value in samples)
+        return "\n".join(lines) + "\n"
+
+def url_host(url: Optional[str]) -> str:
+    """Host label for a media URL"""
+    try:
+        return (urlsplit(url).hostname or "unknown") if url else "unknown"
+    except ValueError:
+        return "unknown"
+
+class DownloadedBytesHook:
+    """
+    yt-dlp progress hook adding the bytes received since the previous call to
+    downloaded_bytes_total for the host serving the format. One instance per download.
+    """
+
+    def __init__(self):
+        self._seen: Dict[str, int] = {}
+
+    def __call__(self, d: Dict[str, Any]) -> None:
+        if d.get('status') not in ('downloading', 'finished'):
+            return
+        # Files yt-dlp finds already on disk report a total_bytes but no downloaded_bytes
+        total = d.get('downloaded_bytes') or 0
+        key = d.get('filename') or ''
+        delta = total - self._seen.get(key, 0)
+        if delta <= 0:
+            return
+        self._seen[key] = total
+        downloaded_bytes.inc(url_host((d.get('info_dict') or {}).get('url')), amount=delta)
+
+# Global metrics registry and the metrics updated across the services
+metrics = MetricsRegistry()
+
+request_duration = metrics.histogram(
+    "grabit_request_duration_seconds", "API request latency until the response is fully sent",
+    ("phase", "platform", "route"))
+requests_total = metrics.counter(
+    "grabit_requests", "API requests by route and status code", ("method", "route", "status"))
+job_duration = metrics.histogram(
+    "grabit_job_duration_seconds", "Background job run time", ("kind", "state"))
+executor_queue_wait = metrics.histogram(
+    "grabit_executor_queue_wait_seconds", "Time a task waited for a free worker", ("executor",), FAST_BUCKETS)
+executor_run_time = metrics.histogram(
+    "grabit_executor_run_seconds", "Time a task ran on a worker", ("executor",), LATENCY_BUCKETS)
+serialization_duration = metrics.histogram(
+    "grabit_serialization_seconds", "Time spent serializing response bodies to JSON", ("model",), FAST_BUCKETS)
+downloaded_bytes = metrics.counter(
+    "grabit_downloaded_bytes", "Media bytes received from upstream hosts", ("host",))
+extract_errors = metrics.counter(
+    "grabit_extract_errors", "Failed metadata extractions by error class", ("reason",))
+download_errors = metrics.counter(
+    "grabit_download_errors", "Failed downloads by exception class", ("error",))
@@ -0,0 +1,88 @@
+"""
+Rate-limited progress fan-out from yt-dlp worker threads to async subscribers
+"""
+
+import asyncio
+import logging
+import time
+from typing import Dict, Any, Callable, AsyncIterator, List, Optional
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+TERMINAL_STATES = ("finished", "failed")
+
+class ProgressChannel:
+    """
+    Broadcasts progress snapshots to subscribers (SSE streams, WebSockets).
+    Worker threads only schedule a notification on the event loop; the snapshot
+    itself is built on the loop, and slow subscribers drop stale snapshots
+    instead of blocking the publisher.
+    """
+
+    def __init__(self, snapshot: Callable[[], Dict[str, Any]], min_interval: Optional[float] = None):
+        self._snapshot = snapshot
+        if min_interval is None:
+            # PROGRESS_UPDATE_HZ=0 turns throttling off
+            hz = settings.PROGRESS_UPDATE_HZ
+            min_interval = 1.0 / hz if hz > 0 else 0.0
+        self.min_interval = min_interval
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._subscribers: List[asyncio.Queue] = []
+        self._last_notify = 0.0
+        self._pending = False
+        self.last_event: Optional[Dict[str, Any]] = None
+
+    def bind(self, loop: asyncio.AbstractEventLoop) -> None:
+        self._loop = loop
+
+    def notify_threadsafe(self, force: bool = False) -> None:
+        """Request a snapshot from any thread, dropped if within the rate limit"""
+        if self._loop is None or self._loop.is_closed():
+            return
+        now = time.monotonic()
+        if not force and (self._pending or now - self._last_notify < self.min_interval):
+            return
+        self._last_notify = now
+        self._pending = True
+        self._loop.call_soon_threadsafe(self._emit)
+
+    def notify(self) -> None:
+        """Emit a snapshot immediately, must be called on the event loop"""
+        self._last_notify = time.monotonic()
+        self._emit()
+
+    def _emit(self) -> None:
+        self._pending = False
+        event = self._snapshot()
+        self.last_event = event
+        for queue in self._subscribers:
+            if queue.full():
+                # Progress events are snapshots, only the newest one matters
+                queue.get_nowait()
+            queue.put_nowait(event)
+
+    async def subscribe(self, heartbeat: Optional[float] = None) -> AsyncIterator[Optional[Dict[str, Any]]]:
+        """
+        Yield snapshots until a terminal state is reached.
+        Yields None every heartbeat seconds without updates so transports can keep the connection alive.
+        """
+        queue: asyncio.Queue = asyncio.Queue(maxsize=settings.PROGRESS_SUBSCRIBER_BUFFER)
+        self._subscribers.append(queue)
+        try:
+            event = self.last_event or self._snapshot()
+            yield event
+            while event.get("state") not in TERMINAL_STATES:
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=heartbeat)
+                except asyncio.TimeoutError:
+                    yield None
+                    continue
+                yield event
+        finally:
+            self._subscribers.remove(queue)
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
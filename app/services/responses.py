@@ -0,0 +1,9 @@
+"""
+Conditional request helpers shared by the routers that send validators
+"""
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """Whether an If-None-Match header matches etag, using the weak comparison it calls for"""
+    etag = etag.removeprefix("W/")
+    tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return "*" in tags or etag in tags
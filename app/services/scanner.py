@@ -0,0 +1,109 @@
+"""
+Single-pass media URL scanner for HTML pages, driven by pluggable host rules
+"""
+
+import html
+import re
+from typing import AsyncIterator, Callable, Dict, Iterable, List, Optional, Sequence
+
+from app.services.images import original_image_url
+
+# Characters that can never be part of a URL embedded in HTML or inline JSON
+_URL_CHARS = r'[^"\'\s<>\\]'
+# "/" as it appears in markup or JSON-escaped ("\/") inside inline scripts
+_SLASH = r'\\?/'
+
+class HostRule:
+    """
+    Describes which URLs on a host are media.
+    `path` is a regex for everything after the host (use {slash} for a path separator);
+    `normalize` rewrites a matched URL, e.g. to its original-size variant.
+    """
+
+    def __init__(self, name: str, host: str, path: str, kind: str = "image",
+                 normalize: Optional[Callable[[str], str]] = None):
+        self.name = name
+        self.host = host
+        self.path = path
+        self.kind = kind
+        self.normalize = normalize
+
+    def pattern(self) -> str:
+        """Regex for the host and path, matched after the shared scheme prefix"""
+        return re.escape(self.host) + self.path.format(slash=_SLASH, chars=_URL_CHARS)
+
+IMAGE_EXT = r'\.(?i:jpe?g|png|webp)'
+
+DEFAULT_RULES: List[HostRule] = [
+    HostRule(
+        "pbs.twimg.com", "pbs.twimg.com",
+        r'{slash}(?:media|ext_tw_video_thumb|amplify_video_thumb|tweet_video_thumb){slash}{chars}+?'
+        r'(?:' + IMAGE_EXT + r'(?::\w+)?(?=["\'\s<>\\&?]|$)|\?format=\w+(?:&(?:amp;)?name=\w+)?)',
+        normalize=original_image_url,
+    ),
+    HostRule("ton.twitter.com", "ton.twitter.com", r'{slash}{chars}+?' + IMAGE_EXT),
+    HostRule("video.twimg.com (image)", "video.twimg.com", r'{slash}{chars}+?' + IMAGE_EXT),
+    HostRule("video.twimg.com", "video.twimg.com", r'{slash}{chars}+?\.(?i:mp4|m3u8)', kind="video"),
+]
+
+class MediaURLScanner:
+    """
+    Finds media URLs in one pass with a single compiled alternation of all host rules.
+    The pattern is case-sensitive and starts with the literal scheme, which lets the
+    regex engine skip ahead to candidate positions instead of trying every character.
+    Works on a whole string or incrementally over a stream of text chunks, keeping
+    only a bounded tail between chunks so the page is never buffered in full.
+    """
+
+    def __init__(self, rules: Sequence[HostRule] = DEFAULT_RULES, max_url_length: int = 2048):
+        self.rules = list(rules)
+        self.max_url_length = max_url_length
+        self._pattern = re.compile(
+            rf'https?:{_SLASH}{_SLASH}(?:'
+            + '|'.join(f'(?P<r{i}>{rule.pattern()})' for i, rule in enumerate(self.rules))
+            + ')'
+        )
+
+    def _resolve(self, match: "re.Match", kinds: Optional[Iterable[str]]) -> Optional[str]:
+        rule = self.rules[int(match.lastgroup[1:])]
+        if kinds is not None and rule.kind not in kinds:
+            return None
+        url = html.unescape(match.group(0).replace('\\/', '/'))
+        return rule.normalize(url) if rule.normalize else url
+
+    def scan(self, text: str, kinds: Optional[Iterable[str]] = None) -> List[str]:
+        """All unique media URLs in text, in order of first appearance"""
+        found: Dict[str, None] = {}
+        for match in self._pattern.finditer(text):
+            url = self._resolve(match, kinds)
+            if url:
+                found[url] = None
+        return list(found)
+
+    async def scan_stream(self, chunks: AsyncIterator[str], kinds: Optional[Iterable[str]] = None) -> List[str]:
+        """
+        Like scan() over a stream of decoded text chunks.
+        A match touching the end of the current buffer may continue in the next chunk,
+        so it is left in the carried-over tail and resolved once more text arrives.
+        """
+        found: Dict[str, None] = {}
+        tail = ""
+        async for chunk in chunks:
+            buffer = tail + chunk
+            last_end = 0
+            for match in self._pattern.finditer(buffer):
+                if match.end() >= len(buffer):
+                    break
+                url = self._resolve(match, kinds)
+                if url:
+                    found[url] = None
+                last_end = match.end()
+            tail = buffer[max(last_end, len(buffer) - self.max_url_length):]
+        for match in self._pattern.finditer(tail):
+            url = self._resolve(match, kinds)
+            if url:
+                found[url] = None
+        return list(found)
+
+# Global scanner instance
+media_url_scanner = MediaURLScanner()
@@ -0,0 +1,176 @@
+"""
+Process-wide download scheduler with a global cap and per-host caps
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Deque, Dict, Any
+from urllib.parse import urlsplit
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+# Page hosts mapped onto the CDN that actually serves their media, so all
+# downloads hitting the same CDN share one per-host limit
+HOST_GROUPS = {
+    'youtube.com': 'googlevideo.com',
+    'youtu.be': 'googlevideo.com',
+    'googlevideo.com': 'googlevideo.com',
+    'twitter.com': 'video.twimg.com',
+    'x.com': 'video.twimg.com',
+    'twimg.com': 'video.twimg.com',
+    'pbs.twimg.com': 'pbs.twimg.com',
+    'instagram.com': 'cdninstagram.com',
+    'cdninstagram.com': 'cdninstagram.com',
+    'facebook.com': 'fbcdn.net',
+    'fb.watch': 'fbcdn.net',
+    'fbcdn.net': 'fbcdn.net',
+}
+
+def parse_host_limits(value: str) -> Dict[str, int]:
+    """Parse "host=limit,host=limit" into a dict"""
+    limits = {}
+    for item in value.split(','):
+        host, _, limit = item.strip().partition('=')
+        if host and limit.strip().isdigit():
+            limits[host.strip().lower()] = int(limit)
+    return limits
+
+def host_key(url: str) -> str:
+    """Scheduling key for a URL: its CDN group when known, otherwise its hostname"""
+    host = (urlsplit(url).hostname or '').lower()
+    parts = host.split('.')
+    # Match the most specific registered suffix (e.g. rr3---sn-x.googlevideo.com -> googlevideo.com)
+    for i in range(len(parts) - 1):
+        group = HOST_GROUPS.get('.'.join(parts[i:]))
+        if group:
+            return group
+    return host or 'unknown'
+
+class _Waiter:
+    """A queued request for a download slot"""
+
+    __slots__ = ('host', 'future', 'enqueued_at')
+
+    def __init__(self, host: str, future: asyncio.Future):
+        self.host = host
+        self.future = future
+        self.enqueued_at = time.monotonic()
+
+class _HostStats:
+    """Wait-time counters for one host"""
+
+    __slots__ = ('granted', 'total_wait', 'max_wait')
+
+    def __init__(self):
+        self.granted = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+class DownloadScheduler:
+    """
+    Hands out download slots in FIFO order, bounded globally and per host.
+    A waiter is skipped only while its own host is saturated, so one busy CDN
+    does not hold up downloads from other hosts queued behind it.
+    """
+
+    def __init__(self, global_limit: int = settings.DOWNLOAD_GLOBAL_LIMIT,
+                 default_host_limit: int = settings.DOWNLOAD_HOST_LIMIT,
+                 host_limits: Dict[str, int] = None):
+        self.global_limit = max(1, global_limit)
+        self.default_host_limit = max(1, default_host_limit)
+        self.host_limits = host_limits if host_limits is not None else parse_host_limits(settings.DOWNLOAD_HOST_LIMITS)
+        self._waiters: Deque[_Waiter] = deque()
+        self._active = 0
+        self._active_by_host: Dict[str, int] = {}
+        self._stats: Dict[str, _HostStats] = {}
+
+    def limit_for(self, host: str) -> int:
+        return self.host_limits.get(host, self.default_host_limit)
+
+    @asynccontextmanager
+    async def slot(self, url: str) -> AsyncIterator[str]:
+        """Hold one download slot for url's host for the duration of the block"""
+        host = host_key(url)
+        await self._acquire(host)
+        try:
+            yield host
+        finally:
+            self._release(host)
+
+    async def _acquire(self, host: str) -> None:
+        waiter = _Waiter(host, asyncio.get_running_loop().create_future())
+        self._waiters.append(waiter)
+        self._dispatch()
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            if waiter.future.done() and not waiter.future.cancelled():
+                # Granted just before the cancellation landed: hand the slot on
+                self._release(host)
+            else:
+                try:
+                    self._waiters.remove(waiter)
+                except ValueError:
+                    pass
+            raise
+
+        waited = time.monotonic() - waiter.enqueued_at
+        stats = self._stats.setdefault(host, _HostStats())
+        stats.granted += 1
+        stats.total_wait += waited
+        stats.max_wait = max(stats.max_wait, waited)
+        if waited > 1:
+            logger.info(f"Download slot for {host} granted after {waited:.1f}s")
+
+    def _release(self, host: str) -> None:
+        self._active -= 1
+        self._active_by_host[host] -= 1
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        """Grant slots to queued waiters in arrival order while capacity remains"""
+        if not self._waiters:
+            return
+        for waiter in list(self._waiters):
+            if self._active >= self.global_limit:
+                break
+            if waiter.future.done():
+                continue
+            if self._active_by_host.get(waiter.host, 0) >= self.limit_for(waiter.host):
+                continue
+            self._waiters.remove(waiter)
+            self._active += 1
+            self._active_by_host[waiter.host] = self._active_by_host.get(waiter.host, 0) + 1
+            waiter.future.set_result(None)
+
+    def stats(self) -> Dict[str, Any]:
+        """Global and per-host active count, queue depth and wait times"""
+        queued: Dict[str, int] = {}
+        for waiter in self._waiters:
+            queued[waiter.host] = queued.get(waiter.host, 0) + 1
+
+        hosts = {}
+        for host in set(self._stats) | set(queued) | {h for h, n in self._active_by_host.items() if n}:
+            stats = self._stats.get(host) or _HostStats()
+            hosts[host] = {
+                "limit": self.limit_for(host),
+                "active": self._active_by_host.get(host, 0),
+                "queued": queued.get(host, 0),
+                "granted": stats.granted,
+                "avg_wait": round(stats.total_wait / stats.granted, 4) if stats.granted else 0.0,
+                "max_wait": round(stats.max_wait, 4),
+            }
+        return {
+            "global_limit": self.global_limit,
+            "active": self._active,
+            "queued": len(self._waiters),
+            "hosts": hosts,
+        }
+
+# Global scheduler instance
+download_scheduler = DownloadScheduler()
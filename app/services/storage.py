@@ -0,0 +1,184 @@
+"""
+Disk budget for DOWNLOAD_DIR: per-file size limit and least-recently-served eviction
+"""
+
+import logging
+import os
+import re
+import shutil
+import threading
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Any, Iterable, List, Optional
+
+from config import settings
+from app.services.files import file_registry, FileRegistry
+from app.services.lazy import yt_dlp
+
+logger = logging.getLogger(__name__)
+
+# Working files that are never indexed or evicted
+SKIPPED_SUFFIXES = ('.part', '.ytdl', '.temp', '.sqlite3', '.sqlite3-wal', '.sqlite3-shm')
+
+SIZE_RE = re.compile(r'(\d+(?:\.\d+)?)\s*([KMGTPEZY]?)', re.IGNORECASE)
+
+@lru_cache(maxsize=None)
+def _file_too_large_error() -> type:
+    class FileTooLargeError(yt_dlp.DownloadError):
+        """Raised when a download exceeds MAX_FILESIZE"""
+    FileTooLargeError.__module__ = __name__
+    FileTooLargeError.__qualname__ = "FileTooLargeError"
+    return FileTooLargeError
+
+def __getattr__(name: str):
+    # FileTooLargeError subclasses yt-dlp's DownloadError (so yt-dlp lets it propagate),
+    # which means it can only be created once yt-dlp is imported: build it on first access
+    if name == "FileTooLargeError":
+        return _file_too_large_error()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def _parse_size(value: str) -> Optional[int]:
+    """Parse a size like "500M" (binary multiples, as yt-dlp does); empty or 0 means unlimited"""
+    match = SIZE_RE.fullmatch(value.strip()) if value else None
+    if not match:
+        return None
+    number, unit = match.groups()
+    size = int(float(number) * 1024 ** ('KMGTPEZY'.find(unit.upper()) + 1 if unit else 0))
+    return size or None
+
+class StorageManager:
+    """
+    Tracks every file the service produces (through the file registry) and keeps
+    DOWNLOAD_DIR within a byte budget by deleting the least recently served files.
+    """
+
+    def __init__(self, registry: FileRegistry, download_dir: str,
+                 max_bytes: Optional[int], max_filesize: Optional[int]):
+        self.registry = registry
+        self.download_dir = Path(download_dir)
+        self.max_bytes = max_bytes
+        self.max_filesize = max_filesize
+        self._lock = threading.Lock()
+        self.evicted_files = 0
+        self.evicted_bytes = 0
+        self.rejected_downloads = 0
+
+    def size_filter(self, info: Dict[str, Any], incomplete: bool = False) -> None:
+        """
+        yt-dlp match_filter: refuse a download before it starts when the selected
+        format(s) report a size above MAX_FILESIZE
+        """
+        if incomplete or not self.max_filesize:
+            return None
+        formats = info.get('requested_formats') or [info]
+        sizes = [fmt.get('filesize') or fmt.get('filesize_approx') for fmt in formats]
+        if all(sizes) and sum(sizes) > self.max_filesize:
+            self.rejected_downloads += 1
+            raise _file_too_large_error()(
+                f"File is larger than the {settings.MAX_FILESIZE} limit ({int(sum(sizes))} bytes)"
+            )
+        return None
+
+    def size_guard(self, d: Dict[str, Any]) -> None:
+        """
+        yt-dlp progress hook: abort a running download once its size is known or seen to exceed
+        MAX_FILESIZE (covers streams without Content-Length and fragmented formats)
+        """
+        if not self.max_filesize or d.get('status') != 'downloading':
+            return
+        size = max(d.get('downloaded_bytes') or 0, d.get('total_bytes') or 0)
+        if size <= self.max_filesize:
+            return
+        self.rejected_downloads += 1
+        part_path = d.get('tmpfilename')
+        if part_path:
+            try:
+                os.remove(part_path)
+            except OSError:
+                pass
+        raise _file_too_large_error()(f"File is larger than the {settings.MAX_FILESIZE} limit, download aborted")
+
+    def scan(self) -> int:
+        """Index files already present in DOWNLOAD_DIR and apply the budget (blocking, run off the event loop)"""
+        indexed = 0
+        if not self.download_dir.exists():
+            return indexed
+        for root, _, names in os.walk(self.download_dir):
+            for name in names:
+                if name.startswith('.') or name.endswith(SKIPPED_SUFFIXES):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                if self.registry.register(path, last_access=max(stat.st_atime, stat.st_mtime)):
+                    indexed += 1
+        logger.info(f"Storage index built: {indexed} files, {self.used_bytes()} bytes")
+        self.enforce()
+        return indexed
+
+    def used_bytes(self) -> int:
+        return sum(entry.size for entry in self.registry.entries())
+
+    def enforce(self, keep: Iterable[str] = ()) -> List[str]:
+        """
+        Delete least recently served files until usage fits the budget (blocking).
+        Files whose IDs are in `keep` (e.g. the ones just produced) are never evicted.
+        Returns the evicted paths.
+        """
+        if not self.max_bytes:
+            return []
+        keep = set(keep)
+        evicted = []
+        with self._lock:
+            entries = sorted(self.registry.entries(), key=lambda entry: entry.last_access)
+            used = sum(entry.size for entry in entries)
+            for entry in entries:
+                if used <= self.max_bytes:
+                    break
+                if entry.id in keep:
+                    continue
+                try:
+                    os.remove(entry.path)
+                except FileNotFoundError:
+                    pass
+                except OSError as e:
+                    logger.warning(f"Could not evict {entry.path}: {e}")
+                    continue
+                self.registry.remove(entry.id)
+                used -= entry.size
+                self.evicted_files += 1
+                self.evicted_bytes += entry.size
+                evicted.append(entry.path)
+        if evicted:
+            logger.info(f"Evicted {len(evicted)} least recently served files, {used} bytes in use")
+        if used > self.max_bytes:
+            logger.warning(f"Storage budget exceeded: {used} of {self.max_bytes} bytes in use")
+        return evicted
+
+    def stats(self) -> Dict[str, Any]:
+        """Usage for health reporting"""
+        stats = {
+            "files": len(self.registry),
+            "used_bytes": self.used_bytes(),
+            "max_bytes": self.max_bytes,
+            "max_filesize": self.max_filesize,
+            "evicted_files": self.evicted_files,
+            "evicted_bytes": self.evicted_bytes,
+            "rejected_downloads": self.rejected_downloads,
+        }
+        try:
+            disk = shutil.disk_usage(self.download_dir)
+            stats["disk_free_bytes"] = disk.free
+        except OSError:
+            pass
+        return stats
+
+# Global storage manager instance
+storage_manager = StorageManager(
+    file_registry,
+    settings.DOWNLOAD_DIR,
+    max_bytes=_parse_size(settings.STORAGE_MAX_BYTES),
+    max_filesize=_parse_size(settings.MAX_FILESIZE)
+)
@@ -0,0 +1,93 @@
+"""
+Bridge blocking producers running on worker threads into bounded async iterators
+"""
+
+import asyncio
+import logging
+import threading
+from concurrent.futures import Executor, TimeoutError as FutureTimeoutError
+from typing import Any, AsyncIterator, Awaitable, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+_ITEM, _DONE, _ERROR = "item", "done", "error"
+
+class StreamCancelled(Exception):
+    """Raised inside a producer when its consumer has gone away"""
+
+async def iterate_in_thread(executor: Optional[Executor],
+                            produce: Callable[[Callable[[Any], None]], None],
+                            maxsize: int) -> AsyncIterator[Any]:
+    """
+    Run produce(emit) on a worker thread and yield every item it emits.
+
+    At most maxsize items are buffered: emit() blocks the producer thread until the
+    consumer catches up, so memory stays bounded regardless of stream length.
+    When the consumer stops iterating (e.g. the client disconnected), emit() raises
+    StreamCancelled so the producer can abort its upstream transfer.
+    """
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+    cancelled = threading.Event()
+
+    def put(message) -> None:
+        if cancelled.is_set():
+            raise StreamCancelled()
+        try:
+            future = asyncio.run_coroutine_threadsafe(queue.put(message), loop)
+        except RuntimeError:
+            # Event loop already closed
+            raise StreamCancelled()
+        while True:
+            try:
+                future.result(timeout=0.25)
+                return
+            except FutureTimeoutError:
+                if cancelled.is_set():
+                    future.cancel()
+                    raise StreamCancelled()
+
+    def run() -> None:
+        try:
+            produce(lambda item: put((_ITEM, item)))
+            final = (_DONE, None)
+        except StreamCancelled:
+            return
+        except BaseException as e:
+            final = (_ERROR, e)
+        try:
+            put(final)
+        except StreamCancelled:
+            pass
+
+    loop.run_in_executor(executor, run)
+    try:
+        while True:
+            kind, item = await queue.get()
+            if kind == _DONE:
+                return
+            if kind == _ERROR:
+                raise item
+            yield item
+    finally:
+        cancelled.set()
+
+class MediaStream:
+    """
+    A media file being relayed to the client without touching disk.
+    aclose() releases the upstream response and slots, whether or not chunks was ever iterated.
+    """
+
+    def __init__(self, filename: str, media_type: str, content_length: Optional[int],
+                 chunks: AsyncIterator[bytes], close: Optional[Callable[[], Awaitable[None]]] = None):
+        self.filename = filename
+        self.media_type = media_type
+        self.content_length = content_length
+        self.chunks = chunks
+        self._close = close
+
+    async def aclose(self) -> None:
+        """Release the stream's resources; safe to call more than once"""
+        close, self._close = self._close, None
+        if close is not None:
+            await close()
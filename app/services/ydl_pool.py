@@ -0,0 +1,140 @@
+"""
+Pool of warm YoutubeDL instances keyed by option profile
+"""
+
+import json
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Dict, Any, Iterable, Iterator, List, Tuple
+
+from config import settings
+from app.services.lazy import yt_dlp
+
+logger = logging.getLogger(__name__)
+
+# Options that vary per call and are applied to a pooled instance instead of being part of its profile
+PER_CALL_OPTIONS = (
+    'outtmpl', 'format', 'progress_hooks', 'playliststart', 'playlistend', 'playlist_items',
+    'max_filesize', 'continuedl',
+)
+
+class YoutubeDLPool:
+    """
+    Reuses YoutubeDL instances across calls so extractor classes, the HTTP opener,
+    the cookie jar and keep-alive connections survive between requests.
+    An instance is only ever used by one thread at a time.
+    """
+
+    def __init__(self, max_idle: int = settings.YDL_POOL_MAX_IDLE):
+        self.max_idle = max_idle
+        self._idle: Dict[Tuple[str, str], List["yt_dlp.YoutubeDL"]] = {}
+        self._lock = threading.Lock()
+        self.created = 0
+        self.reused = 0
+
+    @staticmethod
+    def _profile_key(profile: str, base_opts: Dict[str, Any]) -> Tuple[str, str]:
+        # Instances are only shared between calls with identical base options
+        return profile, json.dumps(base_opts, sort_keys=True, default=repr)
+
+    @contextmanager
+    def acquire(self, profile: str, ydl_opts: Dict[str, Any]) -> Iterator["yt_dlp.YoutubeDL"]:
+        """
+        Borrow an instance for the given profile with the per-call options from ydl_opts applied.
+        Usable as a drop-in replacement for `with yt_dlp.YoutubeDL(ydl_opts) as ydl:`.
+        """
+        base_opts = {k: v for k, v in ydl_opts.items() if k not in PER_CALL_OPTIONS}
+        overrides = {k: v for k, v in ydl_opts.items() if k in PER_CALL_OPTIONS}
+        key = self._profile_key(profile, base_opts)
+
+        ydl = None
+        with self._lock:
+            idle = self._idle.get(key)
+            if idle:
+                ydl = idle.pop()
+                self.reused += 1
+        if ydl is None:
+            ydl = yt_dlp.YoutubeDL(base_opts)
+            with self._lock:
+                self.created += 1
+
+        saved = self._apply(ydl, overrides)
+        try:
+            yield ydl
+        finally:
+            self._release(key, ydl, saved)
+
+    def _apply(self, ydl: "yt_dlp.YoutubeDL", overrides: Dict[str, Any]) -> Dict[str, Any]:
+        """Apply per-call options, returning the values needed to restore the instance"""
+        saved = {k: ydl.params.get(k) for k in overrides if k not in ('progress_hooks', 'outtmpl', 'format')}
+        saved['outtmpl'] = dict(ydl.params['outtmpl'])
+        saved['format'] = (ydl.params.get('format'), ydl.format_selector)
+
+        for option, value in overrides.items():
+            if option == 'outtmpl':
+                ydl.params['outtmpl'] = dict(value) if isinstance(value, dict) else {'default': value}
+                ydl._parse_outtmpl()
+            elif option == 'format':
+                ydl.params['format'] = value
+                ydl.format_selector = ydl.build_format_selector(value) if value not in (None, '-') else value
+            elif option == 'progress_hooks':
+                for hook in value:
+                    ydl.add_progress_hook(hook)
+            else:
+                ydl.params[option] = value
+        return saved
+
+    def _release(self, key: Tuple[str, str], ydl: "yt_dlp.YoutubeDL", saved: Dict[str, Any]) -> None:
+        """Restore an instance to its profile state and return it to the pool"""
+        try:
+            ydl.params['outtmpl'] = saved.pop('outtmpl')
+            ydl.params['format'], ydl.format_selector = saved.pop('format')
+            for option, value in saved.items():
+                if value is None:
+                    ydl.params.pop(option, None)
+                else:
+                    ydl.params[option] = value
+            ydl._progress_hooks.clear()
+            ydl._download_retcode = 0
+        except Exception as e:
+            logger.warning(f"Discarding YoutubeDL instance that could not be reset: {e}")
+            ydl.close()
+            return
+
+        with self._lock:
+            idle = self._idle.setdefault(key, [])
+            if len(idle) < self.max_idle:
+                idle.append(ydl)
+                return
+        ydl.close()
+
+    def warm_up(self, profile: str, ydl_opts: Dict[str, Any], extractors: Iterable[str] = ()) -> None:
+        """
+        Import yt-dlp, build one pooled instance for a profile and load the given
+        extractor classes, so the first real request skips that cost (blocking)
+        """
+        with self.acquire(profile, ydl_opts) as ydl:
+            for ie_key in extractors:
+                try:
+                    ydl.get_info_extractor(ie_key)
+                except Exception as e:
+                    logger.warning(f"Could not preload extractor {ie_key}: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            idle = {}
+            for (profile, _), instances in self._idle.items():
+                idle[profile] = idle.get(profile, 0) + len(instances)
+        return {"created": self.created, "reused": self.reused, "idle": idle}
+
+    def close(self) -> None:
+        """Close every idle instance"""
+        with self._lock:
+            instances = [ydl for idle in self._idle.values() for ydl in idle]
+            self._idle.clear()
+        for ydl in instances:
+            ydl.close()
+
+# Global pool instance
+ydl_pool = YoutubeDLPool()
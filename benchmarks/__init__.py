@@ -0,0 +1,3 @@
+"""
+Benchmarks for the Video Downloader API (run with `python -m benchmarks.<name>`)
+"""
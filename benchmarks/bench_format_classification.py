@@ -0,0 +1,212 @@
+"""
+Cost of turning a yt-dlp format list into classified VideoFormat models: the previous
+per-format if/elif classification and model construction versus the memoized lookup
+and one-pass bulk validation. Use recorded info dicts (yt-dlp -J output) where possible:
+
+    yt-dlp -J https://www.youtube.com/watch?v=... > video.info.json
+    python -m benchmarks.bench_format_classification --info video.info.json
+    python -m benchmarks.bench_format_classification --videos 200
+"""
+
+import argparse
+import json
+import random
+import statistics
+import time
+from typing import Any, Callable, Dict, List
+
+from app.models import VideoFormat
+from app.services.formats import build_formats, _classify
+
+def legacy_classify_format(fmt: dict) -> dict:
+    """The previous _classify_format, kept verbatim for comparison"""
+    vcodec = fmt.get('vcodec')
+    acodec = fmt.get('acodec')
+    height = fmt.get('height') or 0  # Handle None values properly
+    format_note = fmt.get('format_note', '').lower()
+
+    # Determine format type based on codec presence
+    if vcodec and vcodec != 'none' and acodec and acodec != 'none':
+        format_type = "combined"
+        visual_indicator = "🎬"  # Video + Audio
+    elif vcodec and vcodec != 'none' and (not acodec or acodec == 'none'):
+        format_type = "video-only"
+        visual_indicator = "📹"  # Video only
+    elif acodec and acodec != 'none' and (not vcodec or vcodec == 'none'):
+        format_type = "audio-only"
+        visual_indicator = "🎵"  # Audio only
+    else:
+        format_type = "unknown"
+        visual_indicator = "❓"
+
+    # Determine quality category based on resolution
+    if height and height >= 1080:
+        format_category = "best"
+    elif height and height >= 720:
+        format_category = "high"
+    elif height and height >= 480:
+        format_category = "medium"
+    elif height and height > 0:
+        format_category = "low"
+    elif format_type == "audio-only":
+        # For audio, use bitrate to determine quality
+        abr = fmt.get('abr') or 0  # Handle None values properly
+        if abr >= 256:
+            format_category = "best"
+        elif abr >= 192:
+            format_category = "high"
+        elif abr >= 128:
+            format_category = "medium"
+        else:
+            format_category = "low"
+    else:
+        format_category = "unknown"
+
+    # Generate human-readable codec information
+    codec_parts = []
+    if vcodec and vcodec != 'none':
+        if 'av01' in vcodec:
+            codec_parts.append("AV1")
+        elif 'vp9' in vcodec:
+            codec_parts.append("VP9")
+        elif 'h264' in vcodec or 'avc1' in vcodec:
+            codec_parts.append("H.264")
+        elif 'h265' in vcodec or 'hevc' in vcodec:
+            codec_parts.append("H.265")
+        else:
+            codec_parts.append(vcodec.upper()[:8])
+
+    if acodec and acodec != 'none':
+        if 'opus' in acodec:
+            codec_parts.append("Opus")
+        elif 'aac' in acodec:
+            codec_parts.append("AAC")
+        elif 'mp3' in acodec:
+            codec_parts.append("MP3")
+        elif 'vorbis' in acodec:
+            codec_parts.append("Vorbis")
+        else:
+            codec_parts.append(acodec.upper()[:6])
+
+    codec_info = " + ".join(codec_parts) if codec_parts else "Unknown"
+
+    return {
+        "format_type": format_type,
+        "format_category": format_category,
+        "visual_indicator": visual_indicator,
+        "codec_info": codec_info
+    }
+
+def legacy_build_formats(formats: List[Dict[str, Any]]) -> List[VideoFormat]:
+    """The previous per-format model construction"""
+    result = []
+    for fmt in formats:
+        format_classification = legacy_classify_format(fmt)
+        result.append(VideoFormat(
+            format_id=fmt.get('format_id', ''),
+            format_note=fmt.get('format_note'),
+            ext=fmt.get('ext', 'unknown'),
+            resolution=fmt.get('resolution'),
+            height=fmt.get('height'),
+            width=fmt.get('width'),
+            fps=fmt.get('fps'),
+            vcodec=fmt.get('vcodec'),
+            acodec=fmt.get('acodec'),
+            filesize=fmt.get('filesize'),
+            filesize_approx=fmt.get('filesize_approx'),
+            tbr=fmt.get('tbr'),
+            vbr=fmt.get('vbr'),
+            abr=fmt.get('abr'),
+            quality=fmt.get('quality'),
+            **format_classification
+        ))
+    return result
+
+# Rungs of a typical YouTube format ladder: (height, fps, [(ext, vcodec)])
+LADDER = [
+    (144, 30, [('mp4', 'avc1.4d400c'), ('webm', 'vp9'), ('mp4', 'av01.0.00M.08')]),
+    (240, 30, [('mp4', 'avc1.4d4015'), ('webm', 'vp9'), ('mp4', 'av01.0.00M.08')]),
+    (360, 30, [('mp4', 'avc1.4d401e'), ('webm', 'vp9'), ('mp4', 'av01.0.01M.08')]),
+    (480, 30, [('mp4', 'avc1.4d401f'), ('webm', 'vp9'), ('mp4', 'av01.0.04M.08')]),
+    (720, 60, [('mp4', 'avc1.64001F'), ('webm', 'vp09.00.40.08'), ('mp4', 'av01.0.08M.08')]),
+    (1080, 60, [('mp4', 'avc1.640028'), ('webm', 'vp09.00.41.08'), ('mp4', 'av01.0.09M.08')]),
+    (1440, 60, [('webm', 'vp09.00.50.08'), ('mp4', 'av01.0.12M.08')]),
+    (2160, 60, [('webm', 'vp09.00.51.08'), ('mp4', 'av01.0.13M.08')]),
+]
+
+def synthetic_info(rng: random.Random) -> Dict[str, Any]:
+    """A YouTube-like info dict: audio, storyboards, DASH video ladder and HLS combined formats"""
+    duration = rng.randint(60, 3600)
+    formats = [{'format_id': f'sb{i}', 'ext': 'mhtml', 'vcodec': 'none', 'acodec': 'none',
+                'format_note': 'storyboard', 'protocol': 'mhtml'} for i in range(4)]
+    for format_id, ext, acodec, abr in (('139', 'm4a', 'mp4a.40.5', 48.0), ('140', 'm4a', 'mp4a.40.2', 129.5),
+                                        ('249', 'webm', 'opus', 53.0), ('251', 'webm', 'opus', 135.0)):
+        formats.append({'format_id': format_id, 'ext': ext, 'vcodec': 'none', 'acodec': acodec, 'abr': abr,
+                        'tbr': abr, 'filesize': int(abr * 125 * duration), 'format_note': 'medium',
+                        'protocol': 'https', 'url': 'https://rr1---sn-x.googlevideo.com/videoplayback?' + 'x' * 900})
+    for height, fps, variants in LADDER:
+        for n, (ext, vcodec) in enumerate(variants):
+            tbr = height * rng.uniform(1.5, 4.5)
+            formats.append({
+                'format_id': str(100 + height + n), 'ext': ext, 'vcodec': vcodec, 'acodec': 'none',
+                'height': height, 'width': height * 16 // 9, 'fps': fps, 'tbr': tbr, 'vbr': tbr,
+                'filesize': int(tbr * 125 * duration), 'resolution': f'{height * 16 // 9}x{height}',
+                'format_note': f'{height}p', 'quality': float(height // 100), 'protocol': 'https',
+                'url': 'https://rr1---sn-x.googlevideo.com/videoplayback?' + 'x' * 900,
+                'http_headers': {'User-Agent': 'Mozilla/5.0', 'Accept': '*/*'},
+            })
+        if height <= 1080:
+            formats.append({
+                'format_id': f'hls-{height}', 'ext': 'mp4', 'vcodec': variants[0][1], 'acodec': 'mp4a.40.2',
+                'height': height, 'width': height * 16 // 9, 'fps': fps, 'tbr': height * 3.0,
+                'resolution': f'{height * 16 // 9}x{height}', 'format_note': None, 'protocol': 'm3u8_native',
+                'url': 'https://manifest.googlevideo.com/api/manifest/hls_playlist/' + 'x' * 600,
+            })
+    return {'id': f'{rng.getrandbits(48):012x}', 'duration': duration, 'formats': formats}
+
+def load_info(path: str) -> Dict[str, Any]:
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+def measure(funcs: Dict[str, Callable], infos: List[Dict[str, Any]], repeat: int) -> Dict[str, float]:
+    """Median microseconds per info dict for each function, with runs interleaved to even out noise"""
+    timings = {name: [] for name in funcs}
+    for _ in range(repeat):
+        for name, func in funcs.items():
+            start = time.perf_counter()
+            for info in infos:
+                func(info['formats'])
+            timings[name].append((time.perf_counter() - start) / len(infos))
+    return {name: statistics.median(samples) * 1e6 for name, samples in timings.items()}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--info", nargs="*", default=[], help="Recorded yt-dlp info JSON files")
+    parser.add_argument("--videos", type=int, default=100, help="Synthetic info dicts when no --info is given")
+    parser.add_argument("--repeat", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    infos = [load_info(path) for path in args.info] or [synthetic_info(rng) for _ in range(args.videos)]
+    infos = [info for info in infos if info.get('formats')]
+    if not infos:
+        parser.error("no info dicts with formats")
+
+    # The old classifier fails on an explicit format_note of None, so compare on formats it can handle
+    for info in infos:
+        info['formats'] = [f for f in info['formats'] if isinstance(f.get('format_note', ''), str)]
+        assert legacy_build_formats(info['formats']) == build_formats(info['formats']), \
+            f"output differs for {info.get('id')}"
+
+    format_count = sum(len(info['formats']) for info in infos) / len(infos)
+    print(f"{len(infos)} info dicts, {format_count:.0f} formats each on average")
+    _classify.cache_clear()
+    results = measure({"legacy": legacy_build_formats, "bulk": build_formats}, infos, args.repeat)
+    for name, micros in results.items():
+        print(f"  {name:>8}  {micros:9.1f} us per video  ({results['legacy'] / micros:.2f}x)")
+    info = _classify.cache_info()
+    print(f"  classification cache: {info.currsize} entries, "
+          f"{info.hits / max(1, info.hits + info.misses):.1%} hit ratio")
+
+if __name__ == "__main__":
+    main()
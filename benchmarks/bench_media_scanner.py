@@ -0,0 +1,122 @@
+"""
+Time and peak memory of the single-pass media URL scanner versus the previous
+three-regex HTML fallback, over saved or synthetic multi-megabyte pages:
+
+    python -m benchmarks.bench_media_scanner --size-mb 2 8
+    python -m benchmarks.bench_media_scanner --pages saved_tweet.html
+"""
+
+import argparse
+import asyncio
+import codecs
+import random
+import re
+import statistics
+import time
+import tracemalloc
+from typing import Callable, List
+
+from app.services.scanner import MediaURLScanner
+
+CHUNK_SIZE = 64 * 1024
+
+def legacy_extract(html_content: str) -> List[str]:
+    """The fallback's previous implementation, kept verbatim for comparison"""
+    image_patterns = [
+        r'https://pbs\.twimg\.com/media/[^"]+\.(jpg|jpeg|png|webp)',
+        r'https://ton\.twitter\.com/[^"]+\.(jpg|jpeg|png|webp)',
+        r'https://video\.twimg\.com/[^"]+\.(jpg|jpeg|png|webp)',
+    ]
+
+    images = []
+    for pattern in image_patterns:
+        matches = re.findall(pattern, html_content, re.IGNORECASE)
+        for match in matches:
+            if isinstance(match, tuple):
+                full_match = re.search(pattern, html_content, re.IGNORECASE)
+                if full_match:
+                    images.append(full_match.group(0))
+            else:
+                images.append(match)
+
+    unique_images = list(dict.fromkeys(images))
+    quality_images = []
+    for img in unique_images:
+        if ':small' in img:
+            img = img.replace(':small', ':large')
+        elif ':medium' in img:
+            img = img.replace(':medium', ':large')
+        elif '?format=' in img and '&name=' in img:
+            img = re.sub(r'&name=\w+', '&name=orig', img)
+        quality_images.append(img)
+    return quality_images
+
+def synthetic_page(size_mb: float, seed: int = 0) -> bytes:
+    """Markup and inline JSON padding with image URLs in the forms Twitter pages use"""
+    rng = random.Random(seed)
+    forms = [
+        '<img src="https://pbs.twimg.com/media/{id}.jpg:small" alt="">',
+        '<meta content="https://pbs.twimg.com/media/{id}?format=jpg&amp;name=small">',
+        '"media_url_https":"https:\\/\\/pbs.twimg.com\\/media\\/{id}.png"',
+        '<img src="https://ton.twitter.com/i/ton/data/{id}.jpg">',
+        '<video poster="https://video.twimg.com/ext_tw_video/{id}.jpg">',
+    ]
+    filler = '<div class="css-1dbjc4n r-18u37iz" data-testid="cellInnerDiv"><span>lorem ipsum dolor</span></div>\n'
+    parts, size = ['<html><head><title>Post</title></head><body>'], 0
+    target = int(size_mb * 1024 * 1024)
+    while size < target:
+        if rng.random() < 0.02:
+            part = rng.choice(forms).format(id=''.join(rng.choices('ABCDEFGHIJKLMNOPQRSTUVWXYZabcdef0123456789', k=15)))
+        else:
+            part = filler
+        parts.append(part)
+        size += len(part)
+    parts.append('</body></html>')
+    return ''.join(parts).encode()
+
+def run_legacy(page: bytes) -> List[str]:
+    return legacy_extract(page.decode('utf-8', errors='replace'))
+
+def run_scanner(scanner: MediaURLScanner) -> Callable[[bytes], List[str]]:
+    def run(page: bytes) -> List[str]:
+        async def chunks():
+            decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+            for offset in range(0, len(page), CHUNK_SIZE):
+                yield decoder.decode(page[offset:offset + CHUNK_SIZE])
+            yield decoder.decode(b'', final=True)
+        return asyncio.run(scanner.scan_stream(chunks(), kinds=("image",)))
+    return run
+
+def measure(func: Callable[[bytes], List[str]], page: bytes, repeat: int):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(page)
+        timings.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    func(page)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, statistics.median(timings), peak
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", nargs="*", default=[], help="Saved HTML pages to scan")
+    parser.add_argument("--size-mb", nargs="*", type=float, default=[1, 4], help="Synthetic page sizes")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    pages = [(path, open(path, "rb").read()) for path in args.pages]
+    pages += [(f"synthetic {size:g}MB", synthetic_page(size)) for size in args.size_mb]
+    scanner = MediaURLScanner()
+
+    for name, page in pages:
+        print(f"{name} ({len(page) / 1024 / 1024:.1f} MB)")
+        for label, func in (("legacy", run_legacy), ("scanner", run_scanner(scanner))):
+            urls, median, peak = measure(func, page, args.repeat)
+            print(f"  {label:>8}  {median * 1000:9.1f} ms  peak {peak / 1024 / 1024:7.2f} MB  "
+                  f"{len(urls)} urls")
+
+if __name__ == "__main__":
+    main()
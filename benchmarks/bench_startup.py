@@ -0,0 +1,106 @@
+"""
+Cold-start cost of the API process: `import main` measured with `python -X importtime`
+in fresh interpreters, plus the time until /health answers. Exits non-zero when the
+median import time exceeds the budget or a module that must stay lazy is imported:
+
+    python -m benchmarks.bench_startup
+    python -m benchmarks.bench_startup --runs 9 --max-import-ms 800 --top 15
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from typing import Dict, List, Tuple
+
+# Modules that must not be loaded by `import main`
+LAZY_MODULES = ("yt_dlp", "requests")
+
+HEALTH_SCRIPT = """
+import json, sys, time
+started = time.perf_counter()
+from fastapi.testclient import TestClient
+import main
+with TestClient(main.app) as client:
+    client.get("/health").raise_for_status()
+    ready = time.perf_counter() - started
+print(json.dumps({"ready_ms": ready * 1000}))
+"""
+
+LOADED_SCRIPT = """
+import json, sys
+import main
+print(json.dumps(sorted(name for name in %r if name in sys.modules)))
+"""
+
+def _env(download_dir: str) -> Dict[str, str]:
+    # Warm-up is off so the measurement is the cold path a request would hit
+    return {**os.environ, "DOWNLOAD_DIR": download_dir, "YTDLP_WARMUP": "false", "PYTHONWARNINGS": "ignore"}
+
+def parse_importtime(stderr: str) -> List[Tuple[str, int, int]]:
+    """(module, self us, cumulative us) for every line of -X importtime output"""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((name.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+def measure_import(env: Dict[str, str]) -> Tuple[float, List[Tuple[str, int, int]]]:
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", "import main"],
+                            env=env, capture_output=True, text=True, check=True)
+    rows = parse_importtime(result.stderr)
+    total = next(cumulative for name, _, cumulative in reversed(rows) if name == "main")
+    return total / 1000, rows
+
+def measure_ready(env: Dict[str, str]) -> float:
+    result = subprocess.run([sys.executable, "-c", HEALTH_SCRIPT], env=env, capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])["ready_ms"]
+
+def loaded_lazy_modules(env: Dict[str, str]) -> List[str]:
+    result = subprocess.run([sys.executable, "-c", LOADED_SCRIPT % (LAZY_MODULES,)],
+                            env=env, capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--max-import-ms", type=float, default=800, help="Budget for the median `import main` time")
+    parser.add_argument("--top", type=int, default=10, help="Show the modules with the highest self time")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as download_dir:
+        env = _env(download_dir)
+        # The first run also byte-compiles, keep it out of the numbers
+        measure_import(env)
+
+        imports, ready, rows = [], [], []
+        for _ in range(args.runs):
+            total, rows = measure_import(env)
+            imports.append(total)
+            ready.append(measure_ready(env))
+        loaded = loaded_lazy_modules(env)
+
+    import_ms = statistics.median(imports)
+    print(f"import main: median {import_ms:.0f} ms, min {min(imports):.0f} ms over {args.runs} runs "
+          f"(budget {args.max_import_ms:.0f} ms)")
+    print(f"/health ready: median {statistics.median(ready):.0f} ms")
+    print(f"top {args.top} modules by self time (last run):")
+    for name, self_us, cumulative_us in sorted(rows, key=lambda row: row[1], reverse=True)[:args.top]:
+        print(f"  {self_us / 1000:8.1f} ms  {name}")
+
+    failures = []
+    if loaded:
+        failures.append(f"modules that must stay lazy were imported: {', '.join(loaded)}")
+    if import_ms > args.max_import_ms:
+        failures.append(f"median import time {import_ms:.0f} ms exceeds {args.max_import_ms:.0f} ms")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    sys.exit(1 if failures else 0)
+
+if __name__ == "__main__":
+    main()
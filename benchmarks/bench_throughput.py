@@ -0,0 +1,307 @@
+"""
+End-to-end download throughput of the API, offline: the service runs under uvicorn in a
+subprocess and downloads from the local stand-in media server (benchmarks.media_server)
+through the public endpoints. Covers download_video over progressive MP4, HLS, DASH and
+generic web pages, plus batch_download and download_playlist, at several concurrency levels.
+
+Reports MB/s, p50/p99 request latency, and the service's peak RSS and thread count per
+level, and writes everything as JSON for comparison with earlier runs:
+
+    python -m benchmarks.bench_throughput
+    python -m benchmarks.bench_throughput --scenarios progressive hls --concurrency 1 8 32 \\
+        --size-mb 16 --latency-ms 40 --bandwidth-mbps 200 --output after.json --compare before.json
+
+The per-host and global download limits of the scheduler are raised to the highest
+concurrency level so the pipeline, not the politeness limits, is measured; pass
+--env DOWNLOAD_HOST_LIMIT=4 (any KEY=VALUE setting) to benchmark with production limits.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from importlib.metadata import PackageNotFoundError, version
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import httpx
+
+from benchmarks.media_server import MediaServer, MediaServerConfig
+from config import settings
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SCENARIOS = ("progressive", "hls", "dash", "page", "batch", "playlist")
+# Media server path of one stream for each single-download scenario
+STREAM_PATHS = {
+    "progressive": "/media/{id}.mp4",
+    "hls": "/hls/{id}.m3u8",
+    "dash": "/dash/{id}.mpd",
+    "page": "/page/{id}.html",
+}
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def _percentile(samples: List[float], fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))] if ordered else 0.0
+
+def _proc_status(pid: int) -> Tuple[Optional[int], Optional[int]]:
+    """(RSS bytes, thread count) of a process, from /proc on Linux"""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            fields = dict(line.split(":", 1) for line in f if ":" in line)
+    except OSError:
+        return None, None
+    rss = int(fields["VmRSS"].split()[0]) * 1024 if "VmRSS" in fields else None
+    threads = int(fields["Threads"]) if "Threads" in fields else None
+    return rss, threads
+
+class ServiceProcess:
+    """The API under uvicorn in a child process, with its own DOWNLOAD_DIR"""
+
+    def __init__(self, download_dir: str, env: Dict[str, str]):
+        self.port = _free_port()
+        self.base_url = f"http://127.0.0.1:{self.port}"
+        self.env = {**os.environ, "DOWNLOAD_DIR": download_dir, "PYTHONWARNINGS": "ignore", **env}
+        self.process: Optional[subprocess.Popen] = None
+
+    def start(self, timeout: float = 60) -> None:
+        self.process = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(self.port),
+             "--log-level", "warning", "--no-access-log"],
+            cwd=ROOT, env=self.env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                raise RuntimeError(f"Service exited with code {self.process.returncode}")
+            try:
+                if httpx.get(f"{self.base_url}/health", timeout=1).status_code == 200:
+                    return
+            except httpx.HTTPError:
+                pass
+            time.sleep(0.1)
+        raise RuntimeError("Service did not become ready")
+
+    def stop(self) -> None:
+        if self.process and self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=15)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+
+class ResourceSampler:
+    """Samples the service's RSS and thread count in the background and keeps the peaks"""
+
+    def __init__(self, pid: int, interval: float = 0.05):
+        self.pid = pid
+        self.interval = interval
+        self.peak_rss: Optional[int] = None
+        self.peak_threads: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def _sample(self) -> None:
+        rss, threads = _proc_status(self.pid)
+        if rss is not None:
+            self.peak_rss = max(self.peak_rss or 0, rss)
+        if threads is not None:
+            self.peak_threads = max(self.peak_threads or 0, threads)
+
+    async def _run(self) -> None:
+        while True:
+            self._sample()
+            await asyncio.sleep(self.interval)
+
+    async def __aenter__(self) -> "ResourceSampler":
+        self._task = asyncio.create_task(self._run())
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        self._task.cancel()
+        self._sample()
+
+def _response_bytes(body: Dict[str, Any]) -> int:
+    """Bytes a download response reports as stored, for single files and batch/playlist results"""
+    if body.get("results"):
+        return sum(result.get("file_size") or 0 for result in body["results"] if result.get("status") == "ok")
+    return body.get("file_size") or 0
+
+def _request_factory(scenario: str, media_url: str, level: int, batch_size: int) -> Callable[[], Tuple[str, Dict[str, Any]]]:
+    """Return a function producing (endpoint, JSON body) for one request with never-seen-before media IDs"""
+    def unique_id() -> str:
+        return f"{scenario}-{level}-{uuid.uuid4().hex[:10]}"
+
+    if scenario in STREAM_PATHS:
+        return lambda: ("/api/download/youtube", {
+            "url": media_url + STREAM_PATHS[scenario].format(id=unique_id()), "format_id": "best"})
+    if scenario == "batch":
+        return lambda: ("/api/download/batch", {
+            "urls": [media_url + STREAM_PATHS["progressive"].format(id=unique_id()) for _ in range(batch_size)],
+            "max_concurrent": min(level, settings.DOWNLOAD_MAX_PER_REQUEST)})
+    return lambda: ("/api/download/youtube/playlist", {
+        "url": f"{media_url}/feed/{unique_id()}.xml?count={batch_size}&kind=media",
+        "parallelism": min(level, settings.PLAYLIST_MAX_PARALLELISM)})
+
+async def run_level(client: httpx.AsyncClient, service: ServiceProcess, scenario: str,
+                    media_url: str, level: int, requests: int, batch_size: int) -> Dict[str, Any]:
+    """Send `requests` requests for one scenario, `level` at a time (or one at a time with `level` parallel entries)"""
+    make_request = _request_factory(scenario, media_url, level, batch_size)
+    # Batch and playlist parallelism lives inside one request
+    clients = 1 if scenario in ("batch", "playlist") else level
+    latencies: List[float] = []
+    stored_bytes = 0
+    errors = 0
+    remaining = requests
+
+    async def worker() -> None:
+        nonlocal remaining, stored_bytes, errors
+        while remaining > 0:
+            remaining -= 1
+            endpoint, body = make_request()
+            started = time.perf_counter()
+            response = await client.post(endpoint, json=body)
+            latencies.append(time.perf_counter() - started)
+            if response.status_code != 200:
+                errors += 1
+                continue
+            payload = response.json()
+            stored_bytes += _response_bytes(payload)
+            errors += payload.get("error_count") or 0
+
+    async with ResourceSampler(service.process.pid) as sampler:
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(clients)))
+        elapsed = time.perf_counter() - started
+
+    return {
+        "scenario": scenario,
+        "concurrency": level,
+        "requests": requests,
+        "errors": errors,
+        "bytes": stored_bytes,
+        "seconds": round(elapsed, 3),
+        "mb_per_s": round(stored_bytes / elapsed / 1e6, 2) if elapsed else 0.0,
+        "p50_ms": round(_percentile(latencies, 0.50) * 1000, 1),
+        "p99_ms": round(_percentile(latencies, 0.99) * 1000, 1),
+        "peak_rss_mb": round(sampler.peak_rss / 1e6, 1) if sampler.peak_rss else None,
+        "peak_threads": sampler.peak_threads,
+    }
+
+def _environment() -> Dict[str, Any]:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    try:
+        ytdlp_version = version("yt-dlp")
+    except PackageNotFoundError:
+        ytdlp_version = None
+    return {
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "yt_dlp": ytdlp_version,
+    }
+
+def compare(results: List[Dict[str, Any]], baseline_path: str) -> None:
+    """Print MB/s and p99 changes against an earlier results file"""
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = {(row["scenario"], row["concurrency"]): row for row in json.load(f)["results"]}
+    print(f"\ncompared with {baseline_path}:")
+    for row in results:
+        before = baseline.get((row["scenario"], row["concurrency"]))
+        if not before or not before["mb_per_s"]:
+            continue
+        print(f"  {row['scenario']:>11} x{row['concurrency']:<3} "
+              f"MB/s {before['mb_per_s']:8.2f} -> {row['mb_per_s']:8.2f} ({row['mb_per_s'] / before['mb_per_s'] - 1:+.1%})  "
+              f"p99 {before['p99_ms']:8.1f} -> {row['p99_ms']:8.1f} ms")
+
+async def run(args: argparse.Namespace, service: ServiceProcess, media_url: str) -> List[Dict[str, Any]]:
+    results = []
+    async with httpx.AsyncClient(base_url=service.base_url, timeout=None,
+                                 limits=httpx.Limits(max_connections=None)) as client:
+        # Load yt-dlp and the extractors before anything is timed
+        await client.post("/api/download/youtube", json={
+            "url": media_url + STREAM_PATHS["progressive"].format(id=f"warmup-{uuid.uuid4().hex[:10]}"),
+            "format_id": "best"})
+        for scenario in args.scenarios:
+            for level in args.concurrency:
+                # One untimed round fills the YoutubeDL pool and worker threads for this level
+                await run_level(client, service, scenario, media_url, level,
+                                1 if scenario in ("batch", "playlist") else level, args.batch_size)
+                row = await run_level(client, service, scenario, media_url, level, args.requests, args.batch_size)
+                results.append(row)
+                print(f"  {scenario:>11} x{level:<3} {row['mb_per_s']:8.2f} MB/s  p50 {row['p50_ms']:8.1f} ms  "
+                      f"p99 {row['p99_ms']:8.1f} ms  rss {row['peak_rss_mb']} MB  threads {row['peak_threads']}  "
+                      f"errors {row['errors']}")
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--concurrency", nargs="+", type=int, default=[1, 4, 8])
+    parser.add_argument("--requests", type=int, default=8, help="Requests per scenario and concurrency level")
+    parser.add_argument("--batch-size", type=int, default=8, help="URLs per batch request and entries per playlist")
+    parser.add_argument("--size-mb", type=float, default=8, help="Size of every synthetic video")
+    parser.add_argument("--segments", type=int, default=8, help="Fragments per HLS/DASH stream")
+    parser.add_argument("--latency-ms", type=float, default=0, help="Media server delay before every response")
+    parser.add_argument("--bandwidth-mbps", type=float, default=0, help="Media server rate limit per connection, 0 for none")
+    parser.add_argument("--storage-budget", default="2G", help="STORAGE_MAX_BYTES for the service's temporary DOWNLOAD_DIR")
+    parser.add_argument("--env", action="append", default=[], metavar="KEY=VALUE", help="Extra service setting")
+    parser.add_argument("--output", default=f"throughput-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    parser.add_argument("--compare", help="Earlier results file to compare with")
+    args = parser.parse_args()
+
+    highest = str(max(args.concurrency))
+    service_env = {
+        "STORAGE_MAX_BYTES": args.storage_budget,
+        "MAX_FILESIZE": "0",
+        "DOWNLOAD_HOST_LIMIT": highest,
+        "DOWNLOAD_GLOBAL_LIMIT": highest,
+        **dict(item.split("=", 1) for item in args.env),
+    }
+    config = MediaServerConfig(int(args.size_mb * 1024 * 1024), args.segments, args.latency_ms / 1000,
+                               args.bandwidth_mbps * 125_000 or None)
+
+    with tempfile.TemporaryDirectory() as download_dir, MediaServer(config) as media_server:
+        service = ServiceProcess(download_dir, service_env)
+        service.start()
+        try:
+            print(f"service {service.base_url}, media server {media_server.base_url}")
+            results = asyncio.run(run(args, service, media_server.base_url))
+        finally:
+            service.stop()
+
+    report = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "environment": _environment(),
+        "media_server": {
+            "size_mb": args.size_mb, "segments": args.segments,
+            "latency_ms": args.latency_ms, "bandwidth_mbps": args.bandwidth_mbps,
+        },
+        "service_env": service_env,
+        "requests": args.requests,
+        "batch_size": args.batch_size,
+        "results": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"results written to {args.output}")
+    if args.compare:
+        compare(results, args.compare)
+
+if __name__ == "__main__":
+    main()
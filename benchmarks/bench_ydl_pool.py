@@ -0,0 +1,99 @@
+"""
+Per-request overhead of building a YoutubeDL for every call versus borrowing one from the pool.
+
+Extraction runs against a local HTTP server so only yt-dlp overhead is measured:
+
+    python -m benchmarks.bench_ydl_pool --requests 200
+"""
+
+import argparse
+import functools
+import http.server
+import os
+import statistics
+import tempfile
+import threading
+import time
+
+import yt_dlp
+
+from app.services.ydl_pool import YoutubeDLPool
+
+YDL_OPTS = {
+    'quiet': True,
+    'no_warnings': True,
+    'noprogress': True,
+    'format': 'best',
+    'socket_timeout': 30,
+}
+
+class _QuietHandler(http.server.SimpleHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+def _serve(directory: str) -> http.server.ThreadingHTTPServer:
+    handler = functools.partial(_QuietHandler, directory=directory)
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def _summary(samples):
+    samples = sorted(samples)
+    return {
+        "mean_ms": round(statistics.mean(samples) * 1000, 3),
+        "p50_ms": round(samples[len(samples) // 2] * 1000, 3),
+        "p99_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.99))] * 1000, 3),
+    }
+
+def bench_construction(requests: int, pool: YoutubeDLPool):
+    fresh, pooled = [], []
+    for _ in range(requests):
+        start = time.perf_counter()
+        with yt_dlp.YoutubeDL(dict(YDL_OPTS)):
+            pass
+        fresh.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        with pool.acquire("bench", dict(YDL_OPTS)):
+            pass
+        pooled.append(time.perf_counter() - start)
+    return _summary(fresh), _summary(pooled)
+
+def bench_extract(requests: int, pool: YoutubeDLPool, url: str):
+    fresh, pooled = [], []
+    for _ in range(requests):
+        start = time.perf_counter()
+        with yt_dlp.YoutubeDL(dict(YDL_OPTS)) as ydl:
+            ydl.extract_info(url, download=False)
+        fresh.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        with pool.acquire("bench", dict(YDL_OPTS)) as ydl:
+            ydl.extract_info(url, download=False)
+        pooled.append(time.perf_counter() - start)
+    return _summary(fresh), _summary(pooled)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=100)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        with open(os.path.join(directory, "clip.mp4"), "wb") as f:
+            f.write(os.urandom(64 * 1024))
+        server = _serve(directory)
+        url = f"http://127.0.0.1:{server.server_address[1]}/clip.mp4"
+        pool = YoutubeDLPool(max_idle=1)
+
+        try:
+            for name, bench in (("construct", bench_construction),
+                                ("extract_info", functools.partial(bench_extract, url=url))):
+                fresh, pooled = bench(args.requests, pool)
+                print(f"{name:>12}  fresh  {fresh}")
+                print(f"{name:>12}  pooled {pooled}  speedup x{fresh['mean_ms'] / max(pooled['mean_ms'], 1e-6):.1f}")
+        finally:
+            pool.close()
+            server.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,506 @@
+"""
+Load test that looks for event-loop blocking in the routers. yt_dlp.YoutubeDL is replaced
+by a deterministic fake (configurable delay, format count and info dict size), media and
+images come from the local stand-in media server, and thousands of concurrent requests are
+sent to every router in-process, on the same event loop as the app.
+
+While a scenario runs, a heartbeat task measures event-loop lag, every callback the loop
+runs is timed against --max-block-ms, and a watchdog thread records the loop thread's
+stack while a callback overruns, so the blocking line is named. Exits non-zero when any
+callback keeps the loop thread busy for longer than the threshold; time the loop only spent
+waiting for the GIL while worker threads ran is reported as GIL wait and does not fail the run:
+
+    python -m benchmarks.load_test
+    python -m benchmarks.load_test --scenarios extract-youtube stream --requests 5000 --concurrency 1000
+    python -m benchmarks.load_test --delay-ms 50 --formats 120 --payload-kb 256 --output loop.json
+"""
+
+import argparse
+import asyncio
+import gc
+import hashlib
+import itertools
+import json
+import logging
+import multiprocessing
+import os
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+import httpx
+import yt_dlp
+
+from benchmarks.media_server import MediaServer, MediaServerConfig
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEIGHTS = (144, 240, 360, 480, 720, 1080, 1440, 2160)
+
+class FakeOptions:
+    """What the fake YoutubeDL returns, shared by every instance"""
+
+    def __init__(self, media_url: str = "", delay: float = 0.02, formats: int = 30, payload_size: int = 16 * 1024,
+                 download_size: int = 64 * 1024, images: int = 2, playlist_size: int = 50):
+        self.media_url = media_url
+        self.delay = delay
+        self.formats = formats
+        self.payload_size = payload_size
+        self.download_size = download_size
+        self.images = images
+        self.playlist_size = playlist_size
+
+class FakeYoutubeDL(yt_dlp.YoutubeDL):
+    """
+    YoutubeDL that answers from deterministic info dicts instead of contacting platforms.
+    Upstream work is modelled by sleeping for the configured delay on the calling worker
+    thread; format selection is a cheap stand-in for yt-dlp's, and "downloading" writes
+    download_size bytes and calls the progress hooks like the HTTP downloader would.
+    """
+
+    options = FakeOptions()
+
+    def extract_info(self, url, download=True, ie_key=None, extra_info=None, process=True,
+                     force_generic_extractor=False):
+        time.sleep(self.options.delay)
+        info = self._fake_info(url)
+        return self.process_ie_result(info, download=download) if process else info
+
+    def process_ie_result(self, ie_result, download=True, extra_info=None):
+        if ie_result.get('_type', 'video') != 'video':
+            return ie_result  # playlists stay flat, like extract_flat
+        fmt = self._select_format(ie_result['formats'], self.params.get('format') or 'best')
+        info = {**ie_result, **fmt}
+        if download:
+            self.process_info(info)
+            info['requested_downloads'] = [{**fmt, 'filepath': info['filepath']}]
+        return info
+
+    @staticmethod
+    def _select_format(formats: List[Dict[str, Any]], spec: str) -> Dict[str, Any]:
+        by_id = {fmt['format_id']: fmt for fmt in formats}
+        combined = [fmt for fmt in formats if fmt['vcodec'] != 'none' and fmt['acodec'] != 'none']
+        audio = [fmt for fmt in formats if fmt['vcodec'] == 'none']
+        for choice in spec.split('/'):
+            if choice in by_id:
+                return by_id[choice]
+            candidates = audio if choice.startswith(('bestaudio', 'ba')) else combined
+            if choice.startswith(('best', 'b')) and candidates:
+                return max(candidates, key=lambda fmt: (fmt.get('height') or 0, fmt['tbr']))
+        raise yt_dlp.utils.DownloadError(f'ERROR: Requested format is not available: {spec}')
+
+    def _fake_info(self, url: str) -> Dict[str, Any]:
+        options = self.options
+        media_id = hashlib.sha1(url.encode()).hexdigest()[:11]
+        host = urlsplit(url).hostname or ""
+        common = {
+            'id': media_id,
+            'extractor': 'fake',
+            'extractor_key': 'Fake',
+            'webpage_url': url,
+            'original_url': url,
+            'uploader': 'Load Test',
+            'description': 'x' * options.payload_size,
+        }
+        if 'list=' in url:
+            entries = [{
+                '_type': 'url', 'ie_key': 'Youtube', 'id': f'{media_id}{n:04d}', 'title': f'Entry {n}',
+                'url': f'https://www.youtube.com/watch?v={media_id}{n:04d}', 'duration': 60 + n,
+            } for n in range(options.playlist_size)]
+            return {**common, '_type': 'playlist', 'title': f'Playlist {media_id}', 'entries': entries,
+                    'playlist_count': options.playlist_size}
+
+        formats = []
+        for n in range(options.formats):
+            height = HEIGHTS[n % len(HEIGHTS)]
+            fmt = {
+                'format_id': str(100 + n), 'ext': 'mp4', 'protocol': 'http',
+                'url': f'{options.media_url}/media/{media_id}-{n}.mp4',
+                'tbr': height * 2.5, 'filesize': options.download_size,
+            }
+            if n % 3 != 2:
+                fmt.update({'vcodec': 'avc1.64001f', 'height': height, 'width': height * 16 // 9, 'fps': 30,
+                            'resolution': f'{height * 16 // 9}x{height}'})
+            else:
+                fmt.update({'vcodec': 'none', 'abr': 128.0, 'resolution': 'audio only'})
+            fmt['acodec'] = 'none' if n % 3 == 1 else 'mp4a.40.2'
+            formats.append(fmt)
+
+        info = {**common, 'title': f'Fake video {media_id}', 'duration': 120, 'formats': formats,
+                'thumbnail': f'{options.media_url}/image/{media_id}-0.jpg'}
+        if host.endswith(('twitter.com', 'x.com')):
+            info['thumbnails'] = [{'id': str(n), 'url': f'{options.media_url}/image/{media_id}-{n}.jpg'}
+                                  for n in range(options.images)]
+        return info
+
+    def process_info(self, info_dict):
+        """Write the "downloaded" file instead of fetching it"""
+        filename = self.prepare_filename(info_dict)
+        size = self.options.download_size
+        os.makedirs(os.path.dirname(filename) or ".", exist_ok=True)
+        status = {'filename': filename, 'tmpfilename': filename + '.part', 'total_bytes': size, 'info_dict': info_dict}
+        for hook in self._progress_hooks:
+            hook({**status, 'status': 'downloading', 'downloaded_bytes': 0})
+        with open(filename, 'wb') as f:
+            f.write(b'\0' * size)
+        for hook in self._progress_hooks:
+            hook({**status, 'status': 'finished', 'downloaded_bytes': size})
+        info_dict['filepath'] = filename
+
+def install_fake(options: FakeOptions) -> None:
+    """Route every yt_dlp.YoutubeDL(...) the app creates to the fake"""
+    FakeYoutubeDL.options = options
+    yt_dlp.YoutubeDL = FakeYoutubeDL
+
+def _app_frames(frame, limit: int = 6) -> List[str]:
+    """Innermost frames of a stack, keeping the first non-repo frame (e.g. the blocking call) for context"""
+    lines = []
+    while frame is not None and len(lines) < limit:
+        filename = frame.f_code.co_filename
+        in_repo = filename.startswith(ROOT) and os.sep + "benchmarks" + os.sep not in filename
+        if in_repo or not lines:
+            lines.append(f"{os.path.relpath(filename, ROOT) if in_repo else filename}:{frame.f_lineno} "
+                         f"in {frame.f_code.co_name}")
+        frame = frame.f_back
+    return lines
+
+class SlowCallbackRecorder:
+    """
+    Times every callback the event loop runs (task steps, I/O and timer callbacks) and
+    records those holding the loop longer than the threshold. Like asyncio's debug mode,
+    without the cost of capturing a traceback for every future it creates; a watchdog
+    thread captures the loop thread's stack while a callback overruns instead.
+
+    A callback is charged only the time the loop thread itself was busy: its own CPU time
+    (less collections it ran, reported separately), plus off-CPU time no other thread of the
+    process was running for, i.e. sleeps, lock waits and syscalls the loop made itself.
+    Off-CPU time while worker threads were running is the loop waiting for the GIL, which
+    no handler change can fix; it is reported as GIL wait and never fails the run. A
+    blocking wait that overlaps busy workers is therefore only caught for the part the
+    workers left idle.
+    The GIL switch interval is shortened while installed, so the loop thread losing the
+    GIL to busy workers costs a fraction of a millisecond per thread instead of 5 ms.
+    """
+
+    def __init__(self, threshold: float, interval: float = 0.005, switch_interval: float = 0.0005):
+        self.threshold = threshold
+        self.interval = interval
+        self.switch_interval = switch_interval
+        self._original_switch_interval = sys.getswitchinterval()
+        self.records: List[Dict[str, Any]] = []
+        self.gc_pauses: List[float] = []
+        self.gil_waits: List[float] = []
+        self._gc_time = 0.0
+        self._loop_gc_time = 0.0
+        self._gc_started = 0.0
+        self._running: Optional[Tuple[int, float]] = None  # (callback number, started)
+        self._stacks: Dict[int, List[str]] = {}
+        self._loop_thread: Optional[int] = None
+        self._stop = threading.Event()
+        self._original = asyncio.events.Handle._run
+
+    def reset(self) -> None:
+        self.records = []
+        self.gc_pauses = []
+        self.gil_waits = []
+
+    def _on_gc(self, phase: str, info: Dict[str, Any]) -> None:
+        # A collection on any thread holds the GIL, so it stalls the loop just the same
+        if phase == "start":
+            self._gc_started = time.perf_counter()
+        else:
+            pause = time.perf_counter() - self._gc_started
+            self._gc_time += pause
+            if threading.get_ident() == self._loop_thread:
+                self._loop_gc_time += pause
+            self.gc_pauses.append(pause)
+
+    def _watchdog(self) -> None:
+        while not self._stop.wait(self.interval):
+            running = self._running
+            if running is None or running[0] in self._stacks:
+                continue
+            if time.perf_counter() - running[1] > self.threshold:
+                frame = sys._current_frames().get(self._loop_thread)
+                if self._running is running:
+                    self._stacks[running[0]] = _app_frames(frame)
+
+    def install(self) -> None:
+        original, recorder = self._original, self
+        counter = itertools.count()
+
+        def _run(handle):
+            number = next(counter)
+            started, gc_before, loop_gc_before = time.perf_counter(), recorder._gc_time, recorder._loop_gc_time
+            cpu_started, process_started = time.thread_time(), time.process_time()
+            recorder._running = (number, started)
+            try:
+                original(handle)
+            finally:
+                recorder._running = None
+            elapsed = time.perf_counter() - started
+            cpu = time.thread_time() - cpu_started
+            others = time.process_time() - process_started - cpu
+            collecting = recorder._gc_time - gc_before
+            stack = recorder._stacks.pop(number, None)
+            waiting = max(0.0, elapsed - cpu)
+            idle = max(0.0, waiting - others)
+            gil_wait = waiting - idle
+            blocked = max(0.0, cpu - (recorder._loop_gc_time - loop_gc_before)) + idle
+            if gil_wait > recorder.threshold:
+                recorder.gil_waits.append(gil_wait)
+            if blocked > recorder.threshold:
+                recorder.records.append({
+                    "ms": round(blocked * 1000, 1),
+                    "wall_ms": round(elapsed * 1000, 1),
+                    "cpu_ms": round(cpu * 1000, 1),
+                    "gc_ms": round(collecting * 1000, 1),
+                    "gil_wait_ms": round(gil_wait * 1000, 1),
+                    "handle": repr(handle)[:300],
+                    "stack": stack or [],
+                })
+
+        self._loop_thread = threading.get_ident()
+        sys.setswitchinterval(self.switch_interval)
+        gc.callbacks.append(self._on_gc)
+        asyncio.events.Handle._run = _run
+        threading.Thread(target=self._watchdog, name="loop-watchdog", daemon=True).start()
+
+    def uninstall(self) -> None:
+        self._stop.set()
+        asyncio.events.Handle._run = self._original
+        sys.setswitchinterval(self._original_switch_interval)
+        gc.callbacks.remove(self._on_gc)
+
+class LoopMonitor:
+    """Heartbeat task measuring how late the event loop wakes it up"""
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.lags: List[float] = []
+        self._task: Optional[asyncio.Task] = None
+
+    def reset(self) -> None:
+        self.lags = []
+
+    async def _heartbeat(self) -> None:
+        while True:
+            expected = time.perf_counter() + self.interval
+            await asyncio.sleep(self.interval)
+            self.lags.append(max(0.0, time.perf_counter() - expected))
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._heartbeat())
+
+    def stop(self) -> None:
+        self._task.cancel()
+
+def start_media_server(config: MediaServerConfig) -> Tuple[str, multiprocessing.Process]:
+    """Serve media from a forked process, so its handler threads don't compete with the app for the GIL"""
+    server = MediaServer(config)
+    process = multiprocessing.get_context("fork").Process(target=server.serve_forever, name="media-server", daemon=True)
+    process.start()
+    server.server_close()  # the child keeps its own copy of the listening socket
+    return server.base_url, process
+
+def _unique() -> str:
+    return uuid.uuid4().hex[:11]
+
+def _tweet_id() -> str:
+    return str(uuid.uuid4().int)[:19]
+
+# name -> request factory returning (method, path, JSON body)
+SCENARIOS: Dict[str, Callable[[Dict[str, Any]], Tuple[str, str, Optional[Dict[str, Any]]]]] = {
+    "root": lambda ctx: ("GET", "/", None),
+    "health": lambda ctx: ("GET", "/health", None),
+    "metrics": lambda ctx: ("GET", "/metrics", None),
+    "extract-youtube": lambda ctx: ("POST", "/api/extract/youtube", {"url": f"https://www.youtube.com/watch?v={_unique()}"}),
+    "extract-instagram": lambda ctx: ("POST", "/api/extract/instagram", {"url": f"https://www.instagram.com/reel/{_unique()}/"}),
+    "extract-facebook": lambda ctx: ("POST", "/api/extract/facebook", {"url": f"https://www.facebook.com/watch/?v={_unique()}"}),
+    "extract-twitter": lambda ctx: ("POST", "/api/extract/twitter", {"url": f"https://x.com/user/status/{_tweet_id()}"}),
+    "extract-playlist": lambda ctx: ("POST", "/api/extract/youtube/playlist", {"url": f"https://www.youtube.com/playlist?list=PL{_unique()}"}),
+    "stream-playlist": lambda ctx: ("POST", "/api/extract/youtube/playlist/stream", {"url": f"https://www.youtube.com/playlist?list=PL{_unique()}"}),
+    "download-youtube": lambda ctx: ("POST", "/api/download/youtube", {"url": f"https://www.youtube.com/watch?v={_unique()}", "format_id": "best"}),
+    "download-twitter-images": lambda ctx: ("POST", "/api/download/twitter/images", {"url": f"https://x.com/user/status/{_tweet_id()}"}),
+    "download-batch": lambda ctx: ("POST", "/api/download/batch", {"urls": [f"https://www.youtube.com/watch?v={_unique()}" for _ in range(4)], "max_concurrent": 4}),
+    "stream": lambda ctx: ("POST", "/api/stream/youtube", {"url": f"https://www.youtube.com/watch?v={_unique()}", "format_id": "best"}),
+    "jobs": lambda ctx: ("POST", "/api/jobs/download/youtube", {"url": f"https://www.youtube.com/watch?v={_unique()}", "format_id": "best"}),
+    "files": lambda ctx: ("GET", f"/api/files/{ctx['file_id']}", None),
+}
+
+async def _setup(client: httpx.AsyncClient, scenario: str, ctx: Dict[str, Any]) -> None:
+    if scenario == "files":
+        # Downloaded fresh each time, earlier scenarios may have evicted the previous one
+        response = await client.post("/api/download/youtube", json={
+            "url": f"https://www.youtube.com/watch?v={_unique()}", "format_id": "best"})
+        ctx["file_id"] = response.json()["file_id"]
+
+async def _wait_for_jobs(job_manager) -> None:
+    while any(state in ("queued", "running") for state in job_manager.stats()["jobs"]):
+        await asyncio.sleep(0.05)
+
+async def _start_workers(executors) -> None:
+    """Start every pool thread, a thread started under load holds the loop until it gets the GIL"""
+    for name, size in executors.sizes.items():
+        await asyncio.gather(*(executors.run(name, time.sleep, 0.05) for _ in range(size)))
+
+def _blocking_sites(blocks: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Blocking callbacks grouped by the stack they were caught in, worst first"""
+    sites: Dict[Tuple[str, ...], Dict[str, Any]] = {}
+    for block in blocks:
+        site = sites.setdefault(tuple(block["stack"]), {"count": 0, "max_ms": 0.0, "stack": block["stack"]})
+        site["count"] += 1
+        if block["ms"] > site["max_ms"]:
+            site["max_ms"] = block["ms"]
+    return sorted(sites.values(), key=lambda site: site["max_ms"], reverse=True)
+
+def _ms(samples: List[float], fraction: float) -> float:
+    ordered = sorted(samples)
+    return round(ordered[min(len(ordered) - 1, int(len(ordered) * fraction))] * 1000, 1) if ordered else 0.0
+
+async def run_scenario(client: httpx.AsyncClient, scenario: str, requests: int, concurrency: int,
+                       monitor: LoopMonitor, slow: SlowCallbackRecorder, ctx: Dict[str, Any]) -> Dict[str, Any]:
+    await _setup(client, scenario, ctx)
+    make_request = SCENARIOS[scenario]
+    latencies: List[float] = []
+    errors: Dict[str, int] = {}
+    remaining = requests
+
+    async def worker() -> None:
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            method, path, body = make_request(ctx)
+            started = time.perf_counter()
+            try:
+                response = await client.request(method, path, json=body)
+                status = str(response.status_code)
+            except Exception as e:
+                status = type(e).__name__
+            latencies.append(time.perf_counter() - started)
+            if status not in ("200", "202"):
+                errors[status] = errors.get(status, 0) + 1
+            # Without a socket in between, a request that never suspends would keep this task
+            # running into the next one and its time would add up as one long callback
+            await asyncio.sleep(0)
+
+    monitor.reset()
+    slow.reset()
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(min(concurrency, requests))))
+    elapsed = time.perf_counter() - started
+
+    blocks = sorted(slow.records, key=lambda record: record["ms"], reverse=True)
+    return {
+        "scenario": scenario,
+        "requests": requests,
+        "errors": errors,
+        "seconds": round(elapsed, 2),
+        "requests_per_s": round(requests / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": _ms(latencies, 0.50),
+        "p99_ms": _ms(latencies, 0.99),
+        "loop_lag_p50_ms": _ms(monitor.lags, 0.50),
+        "loop_lag_p99_ms": _ms(monitor.lags, 0.99),
+        "loop_lag_max_ms": _ms(monitor.lags, 1.0),
+        "blocking_callbacks": len(blocks),
+        "max_block_ms": blocks[0]["ms"] if blocks else 0.0,
+        "worst_blocks": blocks[:5],
+        "gc_pause_total_ms": round(sum(slow.gc_pauses) * 1000, 1),
+        "gc_pause_max_ms": _ms(slow.gc_pauses, 1.0),
+        "gil_waits": len(slow.gil_waits),
+        "gil_wait_max_ms": _ms(slow.gil_waits, 1.0),
+        "blocking_sites": _blocking_sites(blocks)[:5],
+    }
+
+async def run(args: argparse.Namespace) -> List[Dict[str, Any]]:
+    import main
+    from app.services.downloader import downloader_service
+    from app.services.jobs import job_manager
+
+    slow = SlowCallbackRecorder(args.max_block_ms / 1000)
+    slow.install()
+
+    results = []
+    ctx: Dict[str, Any] = {}
+    transport = httpx.ASGITransport(app=main.app)
+    async with main.lifespan(main.app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://loadtest", timeout=None) as client:
+            monitor = LoopMonitor()
+            monitor.start()
+            try:
+                # Warm the pools and lazily created state outside the measurements
+                for scenario in args.scenarios:
+                    await run_scenario(client, scenario, 4, 4, monitor, slow, ctx)
+                await _wait_for_jobs(job_manager)
+                await _start_workers(downloader_service.executors)
+                for scenario in args.scenarios:
+                    row = await run_scenario(client, scenario, args.requests, args.concurrency, monitor, slow, ctx)
+                    if scenario == "jobs":
+                        await _wait_for_jobs(job_manager)
+                    results.append(row)
+                    verdict = "BLOCKS" if row["blocking_callbacks"] else "ok"
+                    print(f"  {scenario:>24}  {row['requests_per_s']:8.1f} req/s  p99 {row['p99_ms']:8.1f} ms  "
+                          f"loop lag p99 {row['loop_lag_p99_ms']:6.1f} max {row['loop_lag_max_ms']:6.1f} ms  "
+                          f"worst block {row['max_block_ms']:6.1f} ms  gc max {row['gc_pause_max_ms']:6.1f} ms  "
+                          f"gil wait max {row['gil_wait_max_ms']:6.1f} ms  errors {sum(row['errors'].values())}  {verdict}")
+            finally:
+                monitor.stop()
+                slow.uninstall()
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenarios", nargs="+", choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("--requests", type=int, default=2000, help="Requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=500, help="Requests in flight at once")
+    parser.add_argument("--max-block-ms", type=float, default=50, help="Longest a single callback may hold the loop")
+    parser.add_argument("--delay-ms", type=float, default=20, help="Fake extraction delay (on the worker thread)")
+    parser.add_argument("--formats", type=int, default=30, help="Formats per fake video")
+    parser.add_argument("--payload-kb", type=float, default=16, help="Extra info dict size (description) per video")
+    parser.add_argument("--download-kb", type=float, default=64, help="Size of every fake download and relayed stream")
+    parser.add_argument("--images", type=int, default=2, help="Images per fake tweet")
+    parser.add_argument("--output", help="Write the results as JSON")
+    args = parser.parse_args()
+
+    media_config = MediaServerConfig(media_size=int(args.download_kb * 1024), image_size=32 * 1024)
+    media_url, media_process = start_media_server(media_config)
+    with tempfile.TemporaryDirectory() as download_dir:
+        # Settings are read at import time, so configure them before the app is imported
+        os.environ.update({
+            "DOWNLOAD_DIR": download_dir,
+            "EXECUTOR_BACKEND": "thread",
+            "YTDLP_WARMUP": "false",
+            "STORAGE_MAX_BYTES": "512M",
+            "DOWNLOAD_GLOBAL_LIMIT": "64",
+            "DOWNLOAD_HOST_LIMIT": "64",
+            "DOWNLOAD_HOST_LIMITS": "",
+        })
+        logging.basicConfig(level=logging.WARNING)
+        install_fake(FakeOptions(
+            media_url=media_url, delay=args.delay_ms / 1000, formats=args.formats,
+            payload_size=int(args.payload_kb * 1024), download_size=int(args.download_kb * 1024), images=args.images,
+        ))
+        print(f"{args.requests} requests per scenario, {args.concurrency} in flight, "
+              f"failing on callbacks over {args.max_block_ms:.0f} ms")
+        try:
+            results = asyncio.run(run(args))
+        finally:
+            media_process.terminate()
+
+    failures = [row for row in results if row["blocking_callbacks"]]
+    for row in failures:
+        print(f"\n{row['scenario']}: {row['blocking_callbacks']} callbacks blocked the loop, worst {row['max_block_ms']} ms")
+        for site in row["blocking_sites"][:3]:
+            print(f"  {site['count']} x up to {site['max_ms']} ms at")
+            for line in site["stack"] or ["(finished before its stack was captured)"]:
+                print(f"      {line}")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"args": vars(args), "results": results}, f, indent=2)
+    sys.exit(1 if failures else 0)
+
+if __name__ == "__main__":
+    main()
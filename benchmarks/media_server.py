@@ -0,0 +1,277 @@
+"""
+Local stand-in for media hosts, so download benchmarks run offline and in CI.
+
+Serves synthetic content that yt-dlp's generic extractor understands:
+
+    /media/<id>.mp4              progressive file (Range requests supported)
+    /hls/<id>.m3u8               HLS media playlist of /hls/<id>/<n>.ts fragments
+    /dash/<id>.mpd               DASH manifest of /dash/<id>/init.mp4 and <n>.m4s fragments
+    /page/<id>.html              web page embedding /media/<id>.mp4 in a <video> tag
+    /image/<id>.jpg              image of `image_size` bytes
+    /feed/<id>.xml?count=N&kind=media|hls|dash|page
+                                 RSS feed (a playlist for yt-dlp) of N entries
+
+Every response waits `latency` seconds before the headers and is throttled to
+`bandwidth` bytes per second per connection. Run standalone for manual testing:
+
+    python -m benchmarks.media_server --port 8765 --size-mb 8 --latency-ms 50 --bandwidth-mbps 100
+"""
+
+import argparse
+import math
+import os
+import re
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+# Bytes every synthetic file is cut from
+BLOCK_SIZE = 1024 * 1024
+WRITE_SIZE = 64 * 1024
+SEGMENT_SECONDS = 4
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+# yt-dlp names files after the last path component, so every stream is named after its own ID
+PATH_RE = re.compile(r'^/(?:(media)/([\w-]+)\.mp4|(hls)/([\w-]+)(\.m3u8|/\d+\.ts)'
+                     r'|(dash)/([\w-]+)(\.mpd|/init\.mp4|/\d+\.m4s)|(page)/([\w-]+)\.html'
+                     r'|(image)/([\w-]+)\.jpg|(feed)/([\w-]+)\.xml)$')
+
+class MediaServerConfig:
+    """Content size and network shaping shared by all handler threads"""
+
+    def __init__(self, media_size: int = 8 * 1024 * 1024, segments: int = 8,
+                 latency: float = 0.0, bandwidth: Optional[float] = None, image_size: int = 200 * 1024):
+        self.media_size = media_size
+        self.image_size = image_size
+        self.segments = max(1, segments)
+        self.latency = latency
+        self.bandwidth = bandwidth  # bytes per second per connection, None for unthrottled
+        self.block = os.urandom(BLOCK_SIZE)
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.bytes_sent = 0
+
+    @property
+    def segment_size(self) -> int:
+        return math.ceil(self.media_size / self.segments)
+
+    def count(self, sent: int) -> None:
+        with self.lock:
+            self.requests += 1
+            self.bytes_sent += sent
+
+def hls_playlist(config: MediaServerConfig, media_id: str) -> bytes:
+    lines = ["#EXTM3U", "#EXT-X-VERSION:3", f"#EXT-X-TARGETDURATION:{SEGMENT_SECONDS}",
+             "#EXT-X-MEDIA-SEQUENCE:0", "#EXT-X-PLAYLIST-TYPE:VOD"]
+    for n in range(config.segments):
+        lines += [f"#EXTINF:{SEGMENT_SECONDS}.0,", f"{media_id}/{n}.ts"]
+    lines.append("#EXT-X-ENDLIST")
+    return ("\n".join(lines) + "\n").encode()
+
+def dash_manifest(config: MediaServerConfig, media_id: str) -> bytes:
+    duration = config.segments * SEGMENT_SECONDS
+    bandwidth = config.media_size * 8 // duration
+    return f"""<?xml version="1.0" encoding="UTF-8"?>
+<MPD xmlns="urn:mpeg:dash:schema:mpd:2011" type="static" profiles="urn:mpeg:dash:profile:isoff-live:2011"
+     mediaPresentationDuration="PT{duration}S" minBufferTime="PT2S">
+  <Period id="0" start="PT0S">
+    <AdaptationSet mimeType="video/mp4" segmentAlignment="true">
+      <Representation id="combined" bandwidth="{bandwidth}" codecs="avc1.64001f,mp4a.40.2" width="1280" height="720">
+        <SegmentTemplate timescale="1" duration="{SEGMENT_SECONDS}" initialization="{media_id}/init.mp4"
+                         media="{media_id}/$Number$.m4s" startNumber="1"/>
+      </Representation>
+    </AdaptationSet>
+  </Period>
+</MPD>
+""".encode()
+
+def web_page(media_id: str) -> bytes:
+    return f"""<!DOCTYPE html>
+<html><head><title>{media_id}</title><meta property="og:title" content="{media_id}"></head>
+<body><video controls width="1280" height="720"><source src="/media/{media_id}.mp4" type="video/mp4"></video></body></html>
+""".encode()
+
+def rss_feed(feed_id: str, count: int, kind: str) -> bytes:
+    links = {
+        "media": "/media/{id}.mp4", "hls": "/hls/{id}.m3u8",
+        "dash": "/dash/{id}.mpd", "page": "/page/{id}.html",
+    }
+    template = links.get(kind, links["media"])
+    items = "".join(
+        f"<item><title>{feed_id}-{n}</title><guid>{feed_id}-{n}</guid>"
+        f"<link>{{base}}{template.format(id=f'{feed_id}-{n}')}</link></item>"
+        for n in range(1, count + 1)
+    )
+    return (f'<?xml version="1.0"?><rss version="2.0"><channel><title>{feed_id}</title>'
+            f'<link>{{base}}/</link>{items}</channel></rss>').encode()
+
+class MediaRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: "MediaServer"
+
+    def log_message(self, *args):
+        pass
+
+    def do_HEAD(self):
+        self._handle(head=True)
+
+    def do_GET(self):
+        self._handle(head=False)
+
+    def _handle(self, head: bool) -> None:
+        config = self.server.config
+        parts = urlsplit(self.path)
+        match = PATH_RE.match(parts.path)
+        if config.latency:
+            time.sleep(config.latency)
+        if not match:
+            self._send_bytes(404, "text/plain", b"not found", head)
+            return
+
+        groups = [group for group in match.groups() if group is not None]
+        kind, media_id, resource = groups[0], groups[1], groups[2] if len(groups) > 2 else None
+        if kind == "media":
+            self._send_media(config.media_size, "video/mp4", head)
+        elif kind == "hls":
+            if resource == ".m3u8":
+                self._send_bytes(200, "application/vnd.apple.mpegurl", hls_playlist(config, media_id), head)
+            else:
+                self._send_media(config.segment_size, "video/mp2t", head)
+        elif kind == "dash":
+            if resource == ".mpd":
+                self._send_bytes(200, "application/dash+xml", dash_manifest(config, media_id), head)
+            elif resource == "/init.mp4":
+                self._send_media(1024, "video/mp4", head)
+            else:
+                self._send_media(config.segment_size, "video/iso.segment", head)
+        elif kind == "page":
+            self._send_bytes(200, "text/html; charset=utf-8", web_page(media_id), head)
+        elif kind == "image":
+            self._send_media(config.image_size, "image/jpeg", head)
+        else:
+            query = parse_qs(parts.query)
+            count = int(query.get("count", ["10"])[0])
+            body = rss_feed(media_id, count, query.get("kind", ["media"])[0])
+            base = f"http://{self.headers.get('Host') or '%s:%d' % self.server.server_address[:2]}"
+            self._send_bytes(200, "application/rss+xml", body.replace(b"{base}", base.encode()), head)
+
+    def _send_bytes(self, status: int, content_type: str, body: bytes, head: bool) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if not head:
+            self.wfile.write(body)
+        self.server.config.count(0 if head else len(body))
+
+    def _range(self, size: int) -> Optional[Tuple[int, int]]:
+        match = RANGE_RE.match(self.headers.get("Range", ""))
+        if not match or not any(match.groups()):
+            return None
+        first, last = match.groups()
+        if not first:
+            return max(0, size - int(last)), size - 1
+        return int(first), min(size - 1, int(last)) if last else size - 1
+
+    def _send_media(self, size: int, content_type: str, head: bool) -> None:
+        byte_range = self._range(size)
+        start, end = byte_range or (0, size - 1)
+        if start >= size:
+            self.send_response(416)
+            self.send_header("Content-Range", f"bytes */{size}")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self.send_response(206 if byte_range else 200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Accept-Ranges", "bytes")
+        self.send_header("Content-Length", str(end - start + 1))
+        if byte_range:
+            self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+        self.end_headers()
+        if head:
+            self.server.config.count(0)
+            return
+        self.server.config.count(self._write_throttled(start, end + 1))
+
+    def _write_throttled(self, start: int, stop: int) -> int:
+        """Write bytes [start, stop) of the synthetic content, paced to the configured bandwidth"""
+        config = self.server.config
+        began = time.monotonic()
+        sent = 0
+        position = start
+        try:
+            while position < stop:
+                offset = position % BLOCK_SIZE
+                chunk = config.block[offset:offset + min(WRITE_SIZE, stop - position, BLOCK_SIZE - offset)]
+                self.wfile.write(chunk)
+                position += len(chunk)
+                sent += len(chunk)
+                if config.bandwidth:
+                    ahead = sent / config.bandwidth - (time.monotonic() - began)
+                    if ahead > 0:
+                        time.sleep(ahead)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        return sent
+
+class MediaServer(ThreadingHTTPServer):
+    """Threaded server on 127.0.0.1 (port 0 picks a free one), run on a daemon thread"""
+
+    daemon_threads = True
+
+    def __init__(self, config: MediaServerConfig, port: int = 0):
+        super().__init__(("127.0.0.1", port), MediaRequestHandler)
+        self.config = config
+        self._thread: Optional[threading.Thread] = None
+
+    def handle_error(self, request, client_address) -> None:
+        # Clients (yt-dlp probing a URL, cancelled downloads) hang up mid-response all the time
+        if isinstance(sys.exc_info()[1], ConnectionError):
+            return
+        super().handle_error(request, client_address)
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def start(self) -> "MediaServer":
+        self._thread = threading.Thread(target=self.serve_forever, name="media-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+
+    def __enter__(self) -> "MediaServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--size-mb", type=float, default=8, help="Size of every progressive file and HLS/DASH stream")
+    parser.add_argument("--segments", type=int, default=8, help="Fragments per HLS/DASH stream")
+    parser.add_argument("--latency-ms", type=float, default=0, help="Delay before every response")
+    parser.add_argument("--bandwidth-mbps", type=float, default=0, help="Per-connection rate limit, 0 for none")
+    args = parser.parse_args()
+
+    config = MediaServerConfig(int(args.size_mb * 1024 * 1024), args.segments, args.latency_ms / 1000,
+                               args.bandwidth_mbps * 125_000 or None)
+    server = MediaServer(config, args.port)
+    print(f"Serving synthetic media on {server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+if __name__ == "__main__":
+    main()
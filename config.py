@@ -3,7 +3,6 @@ Configuration settings for the Video Downloader API
 """
 
 import os
-from pathlib import Path
 
 class Settings:
     """Application settings"""
@@ -11,19 +10,81 @@ class Settings:
     # Download configuration
     DOWNLOAD_DIR = os.getenv("DOWNLOAD_DIR", "./downloads")
     DOWNLOAD_TIMEOUT = int(os.getenv("DOWNLOAD_TIMEOUT", "300"))  # 5 minutes
+    FILE_CHUNK_SIZE = int(os.getenv("FILE_CHUNK_SIZE", str(256 * 1024)))  # Read size when serving downloaded files
+    
+    # Shared HTTP client for requests made outside yt-dlp
+    HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "100"))
+    HTTP_MAX_KEEPALIVE = int(os.getenv("HTTP_MAX_KEEPALIVE", "20"))
+    HTTP_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "30"))  # seconds
+    HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "10"))
+    HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", "30"))  # read/write/pool timeout
+    HTTP2_ENABLED = os.getenv("HTTP2_ENABLED", "true").lower() == "true"  # Used when the h2 package is installed
+    
+    IMAGE_DOWNLOAD_CONCURRENCY = int(os.getenv("IMAGE_DOWNLOAD_CONCURRENCY", "6"))  # Parallel image fetches per post
+    
+    # Pass-through streaming (memory per stream is STREAM_CHUNK_SIZE * STREAM_BUFFER_CHUNKS)
+    STREAM_CHUNK_SIZE = int(os.getenv("STREAM_CHUNK_SIZE", str(256 * 1024)))
+    STREAM_BUFFER_CHUNKS = int(os.getenv("STREAM_BUFFER_CHUNKS", "8"))
     
     # yt-dlp configuration
     MAX_FILESIZE = os.getenv("MAX_FILESIZE", "500M")  # 500MB max
+    STORAGE_MAX_BYTES = os.getenv("STORAGE_MAX_BYTES", "10G")  # Total DOWNLOAD_DIR budget, 0 for unlimited
+    YDL_POOL_MAX_IDLE = int(os.getenv("YDL_POOL_MAX_IDLE", "4"))  # Warm YoutubeDL instances kept per option profile
+    YTDLP_WARMUP = os.getenv("YTDLP_WARMUP", "true").lower() == "true"  # Load yt-dlp in the background after startup
+    
+    # API responses
+    RESPONSE_COMPRESSION_MIN_SIZE = int(os.getenv("RESPONSE_COMPRESSION_MIN_SIZE", "1024"))  # bytes, 0 disables compression
+    RESPONSE_GZIP_LEVEL = int(os.getenv("RESPONSE_GZIP_LEVEL", "6"))
+    RESPONSE_BROTLI_QUALITY = int(os.getenv("RESPONSE_BROTLI_QUALITY", "5"))  # Used when the brotli package is installed
+    
+    # Frontend assets (served from memory, precompressed)
+    STATIC_DIR = os.getenv("STATIC_DIR", "static")
+    STATIC_RELOAD = os.getenv("STATIC_RELOAD", "false").lower() == "true"  # Poll for changed files, for development
+    STATIC_RELOAD_INTERVAL = float(os.getenv("STATIC_RELOAD_INTERVAL", "1"))  # seconds
     
     # API configuration
     MAX_CONCURRENT_DOWNLOADS = int(os.getenv("MAX_CONCURRENT_DOWNLOADS", "3"))
+    PLAYLIST_PAGE_SIZE = int(os.getenv("PLAYLIST_PAGE_SIZE", "50"))  # Default entries per playlist page
+    PLAYLIST_MAX_PAGE_SIZE = int(os.getenv("PLAYLIST_MAX_PAGE_SIZE", "500"))
+    PLAYLIST_PARALLELISM = int(os.getenv("PLAYLIST_PARALLELISM", "3"))  # Default entries downloaded at once
+    PLAYLIST_MAX_PARALLELISM = int(os.getenv("PLAYLIST_MAX_PARALLELISM", "8"))
+    JOB_RETENTION = int(os.getenv("JOB_RETENTION", "3600"))  # Keep finished jobs for 1 hour
+    JOB_JOURNAL = os.getenv("JOB_JOURNAL", "jobs.sqlite3")  # SQLite file under DOWNLOAD_DIR, empty to disable
+    MEDIA_INDEX = os.getenv("MEDIA_INDEX", "media.sqlite3")  # Stored media by post ID, empty to disable
+    
+    # Download scheduling (shared by every download path)
+    DOWNLOAD_GLOBAL_LIMIT = int(os.getenv("DOWNLOAD_GLOBAL_LIMIT", "12"))  # Concurrent downloads process-wide
+    DOWNLOAD_HOST_LIMIT = int(os.getenv("DOWNLOAD_HOST_LIMIT", "4"))  # Default concurrent downloads per host
+    DOWNLOAD_HOST_LIMITS = os.getenv("DOWNLOAD_HOST_LIMITS", "googlevideo.com=4,video.twimg.com=4,pbs.twimg.com=8,cdninstagram.com=3,fbcdn.net=3")
+    DOWNLOAD_MAX_PER_REQUEST = int(os.getenv("DOWNLOAD_MAX_PER_REQUEST", "8"))  # Upper bound for batch max_concurrent
     
-    # Logging
+    # Executor configuration (separate pools so downloads cannot starve extraction)
+    EXTRACT_WORKERS = int(os.getenv("EXTRACT_WORKERS", "8"))
+    DOWNLOAD_WORKERS = int(os.getenv("DOWNLOAD_WORKERS", "16"))
+    POSTPROCESS_WORKERS = int(os.getenv("POSTPROCESS_WORKERS", "4"))
+    SERVE_WORKERS = int(os.getenv("SERVE_WORKERS", "8"))  # File reads and response compression
+    EXECUTOR_BACKEND = os.getenv("EXECUTOR_BACKEND", "thread")  # "thread" or "process" for extraction
+    PROCESS_POOL_WORKERS = int(os.getenv("PROCESS_POOL_WORKERS", "0"))  # 0 = one per CPU
+    
+    # Live progress streaming (SSE / WebSocket)
+    PROGRESS_UPDATE_HZ = float(os.getenv("PROGRESS_UPDATE_HZ", "4"))  # Max updates per second per job, 0 = unthrottled
+    PROGRESS_SUBSCRIBER_BUFFER = int(os.getenv("PROGRESS_SUBSCRIBER_BUFFER", "8"))
+    PROGRESS_HEARTBEAT = float(os.getenv("PROGRESS_HEARTBEAT", "15"))  # seconds
+    
+    # Metadata cache configuration
+    METADATA_CACHE_TTL = int(os.getenv("METADATA_CACHE_TTL", "300"))  # 5 minutes
+    METADATA_CACHE_MAX_ENTRIES = int(os.getenv("METADATA_CACHE_MAX_ENTRIES", "512"))
+    METADATA_CACHE_MAX_BYTES = int(os.getenv("METADATA_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))  # 64MB
+    
+    # Extraction tokens (info dicts reused by the download phase)
+    EXTRACTION_TOKEN_TTL = int(os.getenv("EXTRACTION_TOKEN_TTL", "1800"))  # 30 minutes
+    EXTRACTION_STORE_MAX_ENTRIES = int(os.getenv("EXTRACTION_STORE_MAX_ENTRIES", "256"))
+    EXTRACTION_STORE_MAX_BYTES = int(os.getenv("EXTRACTION_STORE_MAX_BYTES", str(256 * 1024 * 1024)))  # 256MB
+    FORMAT_URL_EXPIRY_MARGIN = int(os.getenv("FORMAT_URL_EXPIRY_MARGIN", "120"))  # seconds
+    
+    # Logging and metrics
     LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+    METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"  # Prometheus /metrics endpoint
     
-    def __init__(self):
-        # Ensure download directory exists
-        Path(self.DOWNLOAD_DIR).mkdir(parents=True, exist_ok=True)
-
 # Global settings instance
 settings = Settings()
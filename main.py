@@ -3,14 +3,25 @@ FastAPI Video Downloader - Two-Phase API
 Supports metadata extraction and selective downloads using yt-dlp
 """
 
-import os
+import asyncio
 import logging
-from fastapi import FastAPI, HTTPException
-from fastapi.staticfiles import StaticFiles
-from fastapi.responses import HTMLResponse
+import os
+from fastapi import FastAPI
 from contextlib import asynccontextmanager
 
-from app.routers import youtube, instagram, facebook, twitter
+from app.routers import youtube, instagram, facebook, twitter, jobs, files, stream, metrics, frontend
+from app.services.downloader import downloader_service
+from app.services.jobs import job_manager
+from app.services.ydl_pool import ydl_pool
+from app.services.scheduler import download_scheduler
+from app.services.journal import job_journal
+from app.services.storage import storage_manager
+from app.services.media_index import media_index
+from app.services.http_client import http_client
+from app.services.assets import asset_store
+from app.services.lazy import yt_dlp
+from app.responses import FastJSONResponse
+from app.middleware import CompressionMiddleware, MetricsMiddleware
 from config import settings
 
 # Configure logging
@@ -24,13 +35,30 @@ logger = logging.getLogger(__name__)
 async def lifespan(app: FastAPI):
     """Application lifespan management"""
     # Startup
-    os.makedirs(settings.DOWNLOAD_DIR, exist_ok=True)
+    downloader_service.ensure_directories()
     logger.info(f"Download directory created/verified: {settings.DOWNLOAD_DIR}")
+    # Index existing downloads in the background so large directories do not delay startup
+    scan = asyncio.create_task(downloader_service.executors.run("postprocess", storage_manager.scan))
+    # yt-dlp is imported lazily; load it and the platform extractors while the app already serves
+    warmup = asyncio.create_task(downloader_service.executors.run("extract", downloader_service.warm_up)) if settings.YTDLP_WARMUP else None
+    await http_client.start()
+    await job_manager.start()
+    # The frontend is served from memory; read and compress it once, and again on change in development
+    await downloader_service.executors.run("postprocess", asset_store.load)
+    reloader = asyncio.create_task(asset_store.watch(settings.STATIC_RELOAD_INTERVAL)) if settings.STATIC_RELOAD else None
     logger.info("FastAPI Video Downloader API started")
     
     yield
     
     # Shutdown
+    if reloader is not None:
+        reloader.cancel()
+    await job_manager.shutdown()
+    await http_client.close()
+    downloader_service.executors.shutdown()
+    ydl_pool.close()
+    job_journal.close()
+    media_index.close()
     logger.info("FastAPI Video Downloader API shutting down")
 
 # Initialize FastAPI app
@@ -38,26 +66,28 @@ app = FastAPI(
     title="Video Downloader API",
     description="Two-phase video downloader: extract metadata first, then download selected formats",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse
 )
 
+# Compress large JSON/text responses (gzip, or brotli when installed)
+app.add_middleware(CompressionMiddleware, minimum_size=settings.RESPONSE_COMPRESSION_MIN_SIZE)
+# Outermost, so request latency includes serialization and compression
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
 # Include platform routers
 app.include_router(youtube.router, prefix="/api", tags=["YouTube"])
 app.include_router(instagram.router, prefix="/api", tags=["Instagram"])
 app.include_router(facebook.router, prefix="/api", tags=["Facebook"])
 app.include_router(twitter.router, prefix="/api", tags=["Twitter"])
-
-# Mount static files
-app.mount("/static", StaticFiles(directory="static"), name="static")
-
-@app.get("/", response_class=HTMLResponse)
-async def root():
-    """Serve the main HTML interface"""
-    try:
-        with open("static/index.html", "r", encoding="utf-8") as f:
-            return HTMLResponse(content=f.read())
-    except FileNotFoundError:
-        raise HTTPException(status_code=404, detail="Frontend interface not found")
+app.include_router(jobs.router, prefix="/api", tags=["Jobs"])
+app.include_router(files.router, prefix="/api", tags=["Files"])
+app.include_router(stream.router, prefix="/api", tags=["Streaming"])
+if settings.METRICS_ENABLED:
+    app.include_router(metrics.router, tags=["Metrics"])
+# Main HTML interface and /static assets
+app.include_router(frontend.router, tags=["Frontend"])
 
 @app.get("/health")
 async def health_check():
@@ -66,11 +96,21 @@ async def health_check():
         "status": "ok",
         "message": "Video Downloader API is running",
         "download_dir": settings.DOWNLOAD_DIR,
-        "supported_platforms": ["youtube", "instagram", "facebook", "twitter"]
+        "supported_platforms": ["youtube", "instagram", "facebook", "twitter"],
+        "metadata_cache": downloader_service.metadata_cache.stats(),
+        "jobs": job_manager.stats(),
+        "executors": downloader_service.executors.stats(),
+        "ydl_pool": {**ydl_pool.stats(), "yt_dlp_loaded": yt_dlp.loaded},
+        "scheduler": download_scheduler.stats(),
+        "storage": storage_manager.stats(),
+        "http_client": http_client.stats(),
+        "static_assets": asset_store.stats()
     }
 
 if __name__ == "__main__":
     import uvicorn
+    # Code reloads restart the server, edits to the frontend are picked up in place
+    os.environ.setdefault("STATIC_RELOAD", "true")
     uvicorn.run(
         "main:app",
         host="0.0.0.0",